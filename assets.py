@@ -0,0 +1,164 @@
+"""Process wide cache of every texture and sound the game uses.
+
+Everything in images/ and sounds/ is loaded once and shared by all
+sprites afterwards. The game only loads what its first frame shows before
+that frame, and streams the rest of the images in on a worker thread
+after it, most needed first, so building a level rarely touches the disk.
+Sounds are loaded through pyglet, which is not thread-safe, so they are
+left to the main thread; audio.Mixer loads them a frame at a time. Images packed
+into the texture atlas by build_atlas.py are cut from the one atlas image
+instead of being decoded file by file.
+
+    $ python assets.py
+
+loads the lot and reports how long it took.
+"""
+import json
+import os
+import threading
+import time
+
+import arcade
+from PIL import Image
+
+from constants import IMAGE_DIR, SOUND_DIR, ATLAS_IMAGE, ATLAS_TABLE
+
+
+class Assets:
+    """Loads textures and sounds once and hands out the shared objects.
+
+    Paths are matched case-insensitively, so 'images/ball.png' finds
+    images/Ball.png on any file system. Anything requested that was not
+    preloaded is loaded on demand and counted in disk_loads.
+    """
+
+    def __init__(self):
+        self.textures = {}
+        self.sounds = {}
+        self.files = {}
+        self.atlas = None
+        self.regions = {}
+        self.disk_loads = 0
+        self.load_seconds = 0.0
+        # Seconds each asset took and whether the main thread loaded it
+        self.load_times = {}
+        # One lock per asset, so waiting for one never waits on another
+        self.locks = {}
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def index(self):
+        """Map lower-cased asset paths to the files on disk."""
+        for directory in (IMAGE_DIR, SOUND_DIR):
+            for name in os.listdir(directory):
+                path = f'{directory}/{name}'
+                self.files[path.lower()] = path
+        if os.path.exists(ATLAS_TABLE):
+            with open(ATLAS_TABLE) as table_file:
+                self.regions = json.load(table_file)
+
+    def preload(self, background=False, first=()):
+        """Load every image, and every sound unless in the background.
+
+        Arguments:
+            background {bool} -- Load the images on a worker thread and
+                                 return at once, leaving the sounds to
+                                 the main thread
+            first {[str]} -- Paths to load before the rest
+        """
+        if not self.files:
+            self.index()
+        if background:
+            self.thread = threading.Thread(target=self.load_all,
+                                           args=(first, False), daemon=True)
+            self.thread.start()
+        else:
+            self.load_all(first)
+
+    def load_all(self, first=(), sounds=True):
+        for key in [*(path.lower() for path in first), *sorted(self.files)]:
+            if key == ATLAS_IMAGE:
+                continue
+            if key.endswith('.png'):
+                self.texture(key)
+            elif key.endswith('.wav') and sounds:
+                self.sound(key)
+
+    def wait(self):
+        """Block until a background preload has finished."""
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+    def texture(self, path):
+        """Get the shared texture for an image.
+
+        Arguments:
+            path {str} -- Path of the image
+
+        Returns:
+            arcade.Texture -- The loaded texture
+
+        """
+        return self.get(self.textures, path, self.load_texture)
+
+    def sound(self, path):
+        """Get the shared sound for an audio file.
+
+        Arguments:
+            path {str} -- Path of the audio file
+
+        Returns:
+            arcade.Sound -- The loaded sound
+
+        """
+        return self.get(self.sounds, path, arcade.load_sound)
+
+    def load_texture(self, path):
+        """Cut a texture out of the atlas, or load it from its own file.
+
+        Arguments:
+            path {str} -- Path of the image
+
+        Returns:
+            arcade.Texture -- The loaded texture
+
+        """
+        region = self.regions.get(path.lower())
+        if region is None:
+            return arcade.load_texture(path)
+        if self.atlas is None:
+            self.atlas = Image.open(ATLAS_IMAGE).convert('RGBA')
+        x, y, width, height = region
+        image = self.atlas.crop((x, y, x + width, y + height))
+        return arcade.Texture(path.lower(), image)
+
+    def get(self, cache, path, load):
+        key = path.lower()
+        asset = cache.get(key)
+        if asset is None:
+            with self.lock:
+                lock = self.locks.setdefault(key, threading.Lock())
+            with lock:
+                asset = cache.get(key)
+                if asset is None:
+                    start = time.perf_counter()
+                    asset = load(self.files.get(key, path))
+                    seconds = time.perf_counter() - start
+                    with self.lock:
+                        self.load_seconds += seconds
+                        self.load_times[key] = (
+                            seconds, threading.current_thread()
+                            is threading.main_thread())
+                        self.disk_loads += 1
+                    cache[key] = asset
+        return asset
+
+
+assets = Assets()
+
+
+if __name__ == "__main__":
+    assets.preload()
+    print(f'Loaded {len(assets.textures)} textures and '
+          f'{len(assets.sounds)} sounds in {assets.load_seconds:.3f}s')
@@ -0,0 +1,88 @@
+"""Play each frame's sounds together.
+
+The simulation reports a sound for every bounce, so several balls and
+lasers can ask for dozens of the same sound in one frame. A Mixer queues
+sound events as steps produce them and flushes them once per frame:
+repeats of a sound within the frame are played once and a sound never
+has more than MAX_VOICES copies playing at the same time, so a frame
+makes at most one playback call per sound. Loading and playback both
+stay on the main thread, as pyglet is not thread-safe. The game has the
+mixer load one sound a frame from the shared assets after its first
+frame; one asked for before then is loaded when first played.
+"""
+import time
+
+import arcade
+
+from assets import assets
+
+# Copies of one sound allowed to play at the same time
+MAX_VOICES = 3
+
+
+class Mixer:
+    """Coalesces, rate limits and plays sound events."""
+
+    def __init__(self, sounds, max_voices=MAX_VOICES):
+        """Initialize the mixer.
+
+        Arguments:
+            sounds {{str: str}} -- Path of the sound for each event name
+            max_voices {int} -- Copies of a sound allowed at once
+        """
+        self.paths = sounds
+        self.max_voices = max_voices
+        # Length of each sound, once it has been loaded
+        self.lengths = {}
+        # Event names queued this frame, in the order they first came
+        self.pending = {}
+        # When each playing copy of a sound finishes
+        self.voices = {name: [] for name in sounds}
+        self.dropped = 0
+
+    def add(self, events):
+        """Queue sound events for the end of the frame.
+
+        Arguments:
+            events {[str]} -- Names of the sounds to play
+        """
+        for name in events:
+            self.pending[name] = None
+
+    def load(self, name):
+        """Get a sound, loading it first if it is not loaded yet.
+
+        Arguments:
+            name {str} -- The sound's event name
+
+        Returns:
+            arcade.Sound -- The loaded sound
+
+        """
+        sound = assets.sound(self.paths[name])
+        if name not in self.lengths:
+            self.lengths[name] = sound.get_length()
+        return sound
+
+    def load_next(self):
+        """Load one sound that is not loaded yet, if any is left."""
+        for name in self.paths:
+            if name not in self.lengths:
+                self.load(name)
+                return
+
+    def flush(self):
+        """Play the sounds queued this frame that have a free voice."""
+        if not self.pending:
+            return
+        now = time.perf_counter()
+        for name in self.pending:
+            voices = [end for end in self.voices[name] if end > now]
+            if len(voices) < self.max_voices:
+                sound = self.load(name)
+                voices.append(now + self.lengths[name])
+                arcade.play_sound(sound)
+            else:
+                self.dropped += 1
+            self.voices[name] = voices
+        self.pending = {}
@@ -0,0 +1,135 @@
+"""Play many autopilot games per level across every CPU core.
+
+Each game starts on one level with its own seed and runs until the level
+is cleared, the game is lost or the step limit is reached. Games are
+independent, so they are spread over a process pool and throughput grows
+with the number of cores. A summary per level is printed and one row per
+game is written to a compressed NumPy archive with a column per field:
+
+    $ python balance.py --games 200 --levels 1 2 3 --out balance.npz
+    >>> columns = numpy.load('balance.npz')
+    >>> columns['clear_seconds'][columns['level'] == 2]
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from constants import PHYSICS_HZ
+from player import Autopilot
+from simulation import Simulation
+
+# Ten minutes of play is plenty for any level
+MAX_STEPS = 10 * 60 * PHYSICS_HZ
+
+COLUMNS = ('level', 'seed', 'cleared', 'steps', 'clear_seconds', 'score',
+           'bounces', 'power_ups', 'lives_lost', 'bricks_left')
+
+
+def play(task):
+    """Play one game of one level.
+
+    Arguments:
+        task {(int, int, int)} -- Level, seed and step limit
+
+    Returns:
+        tuple -- One value for each of COLUMNS
+
+    """
+    level, seed, max_steps = task
+    simulation = Simulation(seed)
+    simulation.setup(level)
+    autopilot = Autopilot(seed)
+    step_time = 1 / PHYSICS_HZ
+    while (simulation.steps < max_steps and not simulation.game_over
+           and simulation.level == level):
+        autopilot.update(simulation, simulation)
+        simulation.step(step_time)
+
+    cleared = simulation.level != level
+    return (level, seed, cleared, simulation.steps,
+            simulation.steps * step_time if cleared else np.nan,
+            simulation.score, simulation.bounces,
+            simulation.power_ups_dropped, simulation.lives_lost,
+            0 if cleared else simulation.bricks.breakable_count)
+
+
+def run(levels, games, seed=0, max_steps=MAX_STEPS, workers=None):
+    """Play games on every level in a process pool.
+
+    Arguments:
+        levels {[int]} -- The levels to play
+        games {int} -- Games per level
+        seed {int} -- Seed of the first game. Game i uses seed + i.
+        max_steps {int} -- Step limit per game
+        workers {int} -- Processes to use. Defaults to one per core.
+
+    Returns:
+        {str: np.ndarray} -- One array per name in COLUMNS
+
+    """
+    workers = workers or os.cpu_count()
+    tasks = [(level, seed + game, max_steps)
+             for level in levels for game in range(games)]
+    # Several games per hand off keeps the pipes quiet
+    chunksize = max(1, len(tasks) // (workers * 8))
+    if workers == 1:
+        rows = [play(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(workers) as executor:
+            rows = list(executor.map(play, tasks, chunksize=chunksize))
+
+    columns = list(zip(*rows)) if rows else [()] * len(COLUMNS)
+    return {name: np.array(values)
+            for name, values in zip(COLUMNS, columns)}
+
+
+def summarize(columns):
+    """Print the spread of each statistic, level by level."""
+    for level in np.unique(columns['level']):
+        games = columns['level'] == level
+        cleared = columns['cleared'][games]
+        clear_seconds = columns['clear_seconds'][games][cleared]
+        p10, p50, p90 = np.percentile(columns['score'][games], (10, 50, 90))
+        print(f'Level {level}: {games.sum()} games, '
+              f'{cleared.mean():.0%} cleared')
+        if cleared.any():
+            c50, c90 = np.percentile(clear_seconds, (50, 90))
+            print(f'  clear time  p50 {c50:.1f}s  p90 {c90:.1f}s')
+        print(f'  score       p10 {p10:.0f}  p50 {p50:.0f}  p90 {p90:.0f}')
+        print(f'  per game    {columns["bounces"][games].mean():.0f} bounces'
+              f'  {columns["power_ups"][games].mean():.1f} power ups'
+              f'  {columns["lives_lost"][games].mean():.2f} lives lost')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--levels', type=int, nargs='+',
+                        default=[1, 2, 3, 4, 5])
+    parser.add_argument('--games', type=int, default=100,
+                        help='games per level')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-steps', type=int, default=MAX_STEPS)
+    parser.add_argument('--workers', type=int,
+                        help='processes to use, defaults to one per core')
+    parser.add_argument('--out', default='balance.npz',
+                        help='where to write the per game columns')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    columns = run(args.levels, args.games, args.seed, args.max_steps,
+                  args.workers)
+    elapsed = time.perf_counter() - start
+
+    steps = columns['steps'].sum()
+    print(f'{len(columns["level"])} games, {steps} steps in {elapsed:.1f}s '
+          f'({steps / elapsed:.0f} steps/s)')
+    summarize(columns)
+    np.savez_compressed(args.out, **columns)
+    print(f'Wrote {args.out}')
+
+
+if __name__ == "__main__":
+    main()
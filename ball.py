@@ -1,14 +1,13 @@
-import arcade
-
+from body import Body
 from utils import Vector, reflect
-from constants import SCALING
 from player import Player
 from power_up import PowerUpType
 
 BALL_SPEED = 400
+BALL_SIZE = 10
 
 
-class Ball(arcade.Sprite):
+class Ball(Body):
 
     # Keep track of which object the ball is stuck to
     # stuck_on[0] = sprite
@@ -22,24 +21,33 @@ class Ball(arcade.Sprite):
 
     def __init__(self, filename, scale, player, power_up=None):
         """Initialize the Ball sprite."""
-        super().__init__(f'images/ball.png', scale)
+        super().__init__('images/ball.png', BALL_SIZE, BALL_SIZE, scale)
 
         self.player = player
         if power_up is None:
             self.set_ball()
 
-        # Initialize collision check counters
-        # Prevents consecutive collisions within several frames between
-        # player, ball and walls
-        self.player_collision_counter = 0
-        self.top_wall_collision_counter = 0
-        self.side_wall_collision_counter = 0
-
-    def copy(self):
-        c_ball = Ball(f'images/ball',
-                      SCALING,
-                      self.player,
-                      power_up=PowerUpType.DISRUPT)
+    def reset(self):
+        """Put the ball back on the player, at rest, as if newly made."""
+        self.change_x = 0
+        self.change_y = 0
+        self.set_ball()
+
+    def copy(self, c_ball):
+        """Turn another ball into a free copy of this one.
+
+        The copy flies from the same place at the same velocity, without
+        this ball's power up or speed modifier.
+
+        Arguments:
+            c_ball {Ball} -- The ball to overwrite
+
+        Returns:
+            Ball -- The copy
+        """
+        c_ball.stick(None)
+        c_ball.clear_power_up()
+        c_ball.mod = 1.0
         c_ball.center_x = self.center_x
         c_ball.center_y = self.center_y
         c_ball.change_x = self.change_x
@@ -47,28 +55,29 @@ class Ball(arcade.Sprite):
         return c_ball
 
     def on_update(self, delta_time: float):
-        """Update the positions and statuses of the ball game object.
+        """Follow the object the ball is stuck to.
+
+        A free ball is moved by Simulation.move_ball, which sweeps it
+        through everything in its path.
 
         Arguments:
             delta_time {float} -- Time since the last update
         """
-        # Follow object position if ball is stuck
         if self.stuck_on[0]:
             self.center_x = self.stuck_on[0].left + self.stuck_on[1]
-        else:
-            self.center_x = self.center_x + self.change_x * delta_time * self.mod
-            self.center_y = self.center_y + self.change_y * delta_time * self.mod
 
-        # Decrement collision counters
-        # Counters prevent consecutive bounces within 20 frames
-        if self.player_collision_counter > 0:
-            self.player_collision_counter -= 1
+    def displacement(self, delta_time):
+        """Distance the ball would travel in a given time.
+
+        Arguments:
+            delta_time {float} -- Time to travel for
 
-        if self.top_wall_collision_counter > 0:
-            self.top_wall_collision_counter -= 1
+        Returns:
+            Vector -- The displacement
 
-        if self.side_wall_collision_counter > 0:
-            self.side_wall_collision_counter -= 1
+        """
+        return Vector(x=self.change_x * delta_time * self.mod,
+                      y=self.change_y * delta_time * self.mod)
 
     def collides_with_player(self):
         """Update the velocity when a collision with the player occurs."""
@@ -77,16 +86,10 @@ class Ball(arcade.Sprite):
             self.bottom = self.player.top
         else:
             v = Vector(x=self.change_x, y=self.change_y)
-            location = self.player.collision_location(self)
-            normal = Vector(0, 1)
 
-            # Determine where the ball collided to "enhance" angle of reflection
-            if location == Player.LEFT:
-                normal = Vector(0.196, -0.981)
-            elif location == Player.RIGHT:
-                normal = Vector(-0.196, -0.981)
-
-            new_v = reflect(v, normal)
+            # Where the ball collided "enhances" the angle of reflection
+            location = self.player.collision_location(self)
+            new_v = reflect(v, Player.NORMALS[location])
             self.change_x = new_v.x
             self.change_y = new_v.y
 
@@ -94,13 +97,26 @@ class Ball(arcade.Sprite):
             # SLOW power up is picked up
             self.increase_speed_mod()
 
-    def collides_with_brick(self, brick):
-        """Update the velocity when a collision with a brick occurs."""
-        if brick.side_collision(self):
+    def collides_with_wall(self, normal):
+        """Bounce off a wall face.
+
+        Arguments:
+            normal {Vector} -- Normal of the face that was hit
+        """
+        if normal.x:
             self.change_x = self.change_x * -1
         else:
             self.change_y = self.change_y * -1
 
+    def collides_with_brick(self, brick, normal):
+        """Update the velocity when a collision with a brick occurs.
+
+        Arguments:
+            brick {Brick} -- The brick that was hit
+            normal {Vector} -- Normal of the face that was hit
+        """
+        self.collides_with_wall(normal)
+
         # Increase the speed modifier on each collision when the
         # SLOW power up is picked up
         self.increase_speed_mod()
@@ -119,7 +135,7 @@ class Ball(arcade.Sprite):
         Most likely this is the player game object.
 
         Arguments:
-            sprite {arcade.Sprite} -- The sprite for the ball to stick to
+            sprite {Body} -- The body for the ball to stick to
         """
         diff = 0
         if sprite:
@@ -153,8 +169,16 @@ class Ball(arcade.Sprite):
         if self.mod > 1.0:
             self.mod = 1.0
 
+    def shot_velocity(self):
+        """The velocity shoot sends the ball off with.
+
+        Returns:
+            Vector -- The ball's change_x and change_y once shot
+        """
+        return Vector(self.change_x, BALL_SPEED)
+
     def shoot(self):
         """Shoot the ball with it's initial velocity."""
         if self.stuck_on[0]:
             self.stick(None)
-            self.change_y = BALL_SPEED
+            self.change_y = self.shot_velocity().y
@@ -0,0 +1,345 @@
+"""Benchmark the game rules without a window.
+
+Times level building and parsing, whole simulation steps with few and
+many balls and on a level far taller than the screen, brick collision
+queries and a cold start, then writes the
+results to JSON. Given the results of an earlier run, every benchmark
+that got worse by more than the tolerance is listed and the exit status
+is 1, so a slowdown fails the build:
+
+    $ python benchmark.py --out baseline.json
+    $ python benchmark.py --baseline baseline.json --tolerance 0.2
+
+Cold start is timed in a fresh interpreter, from launch to the end of the
+first simulation step.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+from ball import BALL_SPEED
+from constants import SCREEN_WIDTH, WALL_WIDTH
+from level_pack import LevelFiles, LevelPack, write_pack
+from simulation import Simulation
+
+# Seconds each rate is measured over, best of REPEAT runs
+MIN_TIME = 0.5
+REPEAT = 3
+
+# Ball counts for the step benchmarks
+BALL_COUNTS = (1, 10, 500)
+
+# Size and fill of the synthetic level
+SYNTHETIC_SIZE = 100
+SYNTHETIC_FILL = 0.8
+
+# Rows in the tall level, which is as wide as the real ones
+TALL_ROWS = 1000
+TALL_COLUMNS = 13
+
+COLD_START = ('from simulation import Simulation; '
+              'simulation = Simulation(); simulation.setup(1); '
+              'simulation.step(1 / 60)')
+
+
+def rate(func, min_time=MIN_TIME, repeat=REPEAT):
+    """Find how many times a second a function can be called.
+
+    Arguments:
+        func -- Called with no arguments
+        min_time {float} -- Seconds to keep calling for in each run
+        repeat {int} -- Runs to take the best of
+
+    Returns:
+        float -- Calls per second in the fastest run
+
+    """
+    best = 0.0
+    for _ in range(repeat):
+        calls = 0
+        start = time.perf_counter()
+        while True:
+            func()
+            calls += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        best = max(best, calls / elapsed)
+    return best
+
+
+def synthetic_map(rows=SYNTHETIC_SIZE, cols=SYNTHETIC_SIZE,
+                  fill=SYNTHETIC_FILL, seed=0):
+    """Make a level map of random bricks.
+
+    Arguments:
+        rows {int} -- Rows in the map
+        cols {int} -- Columns in the map
+        fill {float} -- Fraction of cells with a brick
+        seed {int} -- Seed for the layout
+
+    Returns:
+        [[str]] -- A map like the ones get_level_map returns
+
+    """
+    generator = random.Random(seed)
+    return [[str(generator.randrange(10)) if generator.random() < fill
+             else '-' for _ in range(cols)] for _ in range(rows)]
+
+
+def build_fresh(simulation, map_array):
+    """Build a level into an emptied field, so no cell can be kept.
+
+    Arguments:
+        simulation {Simulation} -- The game to build the level in
+        map_array {[[str]]} -- The level map
+    """
+    simulation.bricks.load([])
+    simulation.build_level(map_array)
+
+
+def serve(simulation, ball, generator):
+    """Launch a ball from a random spot below the bricks.
+
+    Arguments:
+        simulation {Simulation} -- The game the ball is in
+        ball {Ball} -- A ball that is not in play
+        generator {random.Random} -- Picks the spot and direction
+    """
+    ball.reset()
+    ball.stick(None)
+    ball.center_x = generator.uniform(WALL_WIDTH + 10,
+                                      SCREEN_WIDTH - WALL_WIDTH - 10)
+    ball.center_y = generator.uniform(100, 250)
+    angle = generator.uniform(0.2, math.pi - 0.2)
+    ball.change_x = BALL_SPEED * math.cos(angle)
+    ball.change_y = BALL_SPEED * math.sin(angle)
+    simulation.balls.append(ball)
+
+
+def steps_per_second(balls, min_time=MIN_TIME, level_map=None):
+    """Time simulation steps on level 1 with a number of balls in play.
+
+    Balls that are lost, or come back stuck to the paddle, are served
+    again between steps, outside the timing, so the count of moving balls
+    holds for the whole run.
+
+    Arguments:
+        balls {int} -- Balls to keep in play
+        min_time {float} -- Seconds of steps to time
+        level_map {[[str]]} -- Bricks to play on instead of level 1's
+
+    Returns:
+        float -- Steps per second
+
+    """
+    simulation = Simulation(0)
+    simulation.setup(1)
+    if level_map is not None:
+        simulation.build_level(level_map)
+    generator = random.Random(0)
+
+    steps = 0
+    elapsed = 0.0
+    while elapsed < min_time:
+        for ball in simulation.balls:
+            if ball.stuck_on[0]:
+                simulation.ball_pool.release(ball)
+        while len(simulation.balls) < balls:
+            serve(simulation, simulation.ball_pool.take(), generator)
+        start = time.perf_counter()
+        simulation.step(1 / 60)
+        elapsed += time.perf_counter() - start
+        steps += 1
+        simulation.lives = 2
+    return steps / elapsed
+
+
+def collision_queries(seed=0, count=1000):
+    """Make the queries for the collision benchmarks.
+
+    Arguments:
+        seed {int} -- Seed for the query boxes
+        count {int} -- Number of queries
+
+    Returns:
+        (Simulation, [(float, float, float, float)]) -- A game on a dense
+            synthetic level, and (x, y, dx, dy) for balls over it
+
+    """
+    simulation = Simulation(seed)
+    simulation.setup(1)
+    simulation.build_level(synthetic_map(fill=1.0))
+    generator = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        angle = generator.uniform(0, 2 * math.pi)
+        queries.append((generator.uniform(WALL_WIDTH, SCREEN_WIDTH),
+                        generator.uniform(-1400, 560),
+                        BALL_SPEED / 60 * math.cos(angle),
+                        BALL_SPEED / 60 * math.sin(angle)))
+    return simulation, queries
+
+
+def run_benchmarks(pattern=None, min_time=MIN_TIME):
+    """Run every benchmark whose name matches a pattern.
+
+    Arguments:
+        pattern {str} -- Regular expression names must contain
+        min_time {float} -- Seconds each rate is measured over
+
+    Returns:
+        {str: dict} -- value, unit and higher_is_better for each benchmark
+
+    """
+    benchmarks = {}
+
+    def add(name, unit, measure, higher_is_better=True):
+        benchmarks[name] = (unit, measure, higher_is_better)
+
+    simulation = Simulation()
+    files = LevelFiles()
+    scratch = tempfile.TemporaryDirectory(ignore_cleanup_errors=True)
+    pack_name = os.path.join(scratch.name, 'levels.pack')
+    write_pack({level: files.types(level) for level in files.numbers()},
+               pack_name)
+    pack = LevelPack(pack_name)
+    for level in files.numbers():
+        map_array = simulation.get_level_map(level)
+        add(f'get_level_map/level_{level}', 'parses/s',
+            lambda level=level: rate(
+                lambda: simulation.get_level_map(level), min_time))
+        add(f'build_level/level_{level}', 'builds/s',
+            lambda map_array=map_array: rate(
+                lambda: build_fresh(simulation, map_array), min_time))
+        add(f'build_level/pack_level_{level}', 'builds/s',
+            lambda level=level: rate(
+                lambda: build_fresh(simulation, pack.types(level)),
+                min_time))
+
+    synthetic = synthetic_map()
+    add(f'build_level/synthetic_{SYNTHETIC_SIZE}x{SYNTHETIC_SIZE}',
+        'builds/s',
+        lambda: rate(lambda: build_fresh(simulation, synthetic), min_time))
+
+    for balls in BALL_COUNTS:
+        add(f'step/balls_{balls}', 'steps/s',
+            lambda balls=balls: steps_per_second(balls, min_time))
+
+    tall = synthetic_map(TALL_ROWS, TALL_COLUMNS)
+    add(f'step/tall_{TALL_ROWS}_rows_balls_10', 'steps/s',
+        lambda: steps_per_second(10, min_time, tall))
+
+    def in_box():
+        dense, queries = collision_queries()
+        bricks = dense.bricks
+
+        def query():
+            for x, y, _, _ in queries:
+                bricks.in_box(x - 5, x + 5, y - 5, y + 5)
+        return rate(query, min_time) * len(queries)
+
+    def ball_impact():
+        dense, queries = collision_queries()
+        ball = dense.balls[0]
+        ball.stick(None)
+
+        def query():
+            for x, y, dx, dy in queries:
+                ball.center_x = x
+                ball.center_y = y
+                dense.ball_impact(ball, dx, dy)
+        return rate(query, min_time) * len(queries)
+
+    add('collision/in_box_dense', 'queries/s', in_box)
+    add('collision/ball_impact_dense', 'queries/s', ball_impact)
+
+    def cold_start():
+        best = math.inf
+        for _ in range(REPEAT):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, '-c', COLD_START], check=True)
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    add('startup/cold', 's', cold_start, higher_is_better=False)
+
+    results = {}
+    for name, (unit, measure, higher_is_better) in benchmarks.items():
+        if pattern and not re.search(pattern, name):
+            continue
+        value = measure()
+        results[name] = {'value': value, 'unit': unit,
+                         'higher_is_better': higher_is_better}
+        print(f'{name:<36} {value:>14,.3f} {unit}')
+    scratch.cleanup()
+    return results
+
+
+def regressions(results, baseline, tolerance):
+    """Find the benchmarks that got worse than a baseline allows.
+
+    Arguments:
+        results {{str: dict}} -- This run's results
+        baseline {{str: dict}} -- An earlier run's results
+        tolerance {float} -- Fraction a result may get worse by
+
+    Returns:
+        [str] -- A description of each regression
+
+    """
+    found = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old = baseline[name]['value']
+        new = result['value']
+        if result['higher_is_better']:
+            worse = new < old * (1 - tolerance)
+        else:
+            worse = new > old * (1 + tolerance)
+        if worse:
+            found.append(f'{name}: {new:,.3f} {result["unit"]}, '
+                         f'baseline {old:,.3f}')
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--out', default='benchmark.json',
+                        help='where to write the results')
+    parser.add_argument('--baseline',
+                        help='results of an earlier run to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='fraction a result may get worse by before '
+                             'it fails (default 0.2)')
+    parser.add_argument('--only', metavar='PATTERN',
+                        help='run only benchmarks matching a regex')
+    parser.add_argument('--min-time', type=float, default=MIN_TIME,
+                        help='seconds each rate is measured over')
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.only, args.min_time)
+    with open(args.out, 'w') as out_file:
+        json.dump(results, out_file, indent=1)
+    print(f'Wrote {args.out}')
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        found = regressions(results, baseline, args.tolerance)
+        for regression in found:
+            print(f'REGRESSION {regression}')
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+import math
+
+from constants import SCALING
+from utils import Vector
+
+
+class Body:
+    """A pure-Python axis-aligned box with a position and a velocity.
+
+    Mirrors the parts of arcade.Sprite the game rules rely on so the
+    simulation can run without a window or a GL context. The texture is
+    only a name the renderer uses to pick an image for the body.
+    """
+
+    def __init__(self, texture, width, height, scale=SCALING):
+        """Initialize the Body.
+
+        Arguments:
+            texture {str} -- Path of the image the renderer draws
+            width {float} -- Unscaled width of the body
+            height {float} -- Unscaled height of the body
+            scale {float} -- Scale applied to width and height
+        """
+        self.texture = texture
+        self.scale = scale
+        self.width = width * scale
+        self.height = height * scale
+        self.center_x = 0.0
+        self.center_y = 0.0
+        self.change_x = 0.0
+        self.change_y = 0.0
+        self.sprite_lists = []
+
+    @property
+    def left(self):
+        return self.center_x - self.width / 2
+
+    @left.setter
+    def left(self, value):
+        self.center_x = value + self.width / 2
+
+    @property
+    def right(self):
+        return self.center_x + self.width / 2
+
+    @right.setter
+    def right(self, value):
+        self.center_x = value - self.width / 2
+
+    @property
+    def bottom(self):
+        return self.center_y - self.height / 2
+
+    @bottom.setter
+    def bottom(self, value):
+        self.center_y = value + self.height / 2
+
+    @property
+    def top(self):
+        return self.center_y + self.height / 2
+
+    @top.setter
+    def top(self, value):
+        self.center_y = value - self.height / 2
+
+    def collides_with_sprite(self, other):
+        """Check if this body overlaps another body.
+
+        Arguments:
+            other {Body} -- The body to test against
+
+        Returns:
+            bool -- True if the two boxes overlap
+
+        """
+        return (abs(self.center_x - other.center_x) * 2 < self.width + other.width
+                and abs(self.center_y - other.center_y) * 2 < self.height + other.height)
+
+    def collides_with_list(self, bodies):
+        """Find all bodies in a list that overlap this body.
+
+        Arguments:
+            bodies {BodyList} -- The bodies to test against
+
+        Returns:
+            [Body] -- The overlapping bodies, in list order
+
+        """
+        return [body for body in bodies.near(self)
+                if self.collides_with_sprite(body)]
+
+    def time_of_impact(self, dx, dy, other):
+        """Sweep this body along a displacement and find when it hits another.
+
+        The other body is treated as standing still. The sweep is a ray
+        cast of this body's center against the other box grown by this
+        body's half size.
+
+        Arguments:
+            dx {float} -- Horizontal displacement over the sweep
+            dy {float} -- Vertical displacement over the sweep
+            other {Body} -- The body to test against
+
+        Returns:
+            (float, Vector) -- The fraction of the displacement travelled
+                               before the boxes touch, and the normal of
+                               the face that was hit. Boxes that already
+                               overlap give 0 and the face of least
+                               penetration. None if they never touch.
+
+        """
+        half_width = (self.width + other.width) / 2
+        half_height = (self.height + other.height) / 2
+        x_slab = slab(self.center_x, dx, other.center_x - half_width,
+                      other.center_x + half_width)
+        y_slab = slab(self.center_y, dy, other.center_y - half_height,
+                      other.center_y + half_height)
+        if x_slab is None or y_slab is None:
+            return None
+
+        entry = max(x_slab[0], y_slab[0])
+        exit = min(x_slab[1], y_slab[1])
+        if entry >= exit or exit <= 0 or entry > 1:
+            return None
+
+        if entry < 0:
+            # Already overlapping, push out through the shallowest side
+            offset_x = self.center_x - other.center_x
+            offset_y = self.center_y - other.center_y
+            if half_width - abs(offset_x) < half_height - abs(offset_y):
+                return 0.0, Vector(math.copysign(1, offset_x), 0)
+            return 0.0, Vector(0, math.copysign(1, offset_y))
+
+        # On an exact corner hit, prefer the top or bottom face
+        if x_slab[0] > y_slab[0]:
+            return entry, Vector(-math.copysign(1, dx), 0)
+        return entry, Vector(0, -math.copysign(1, dy))
+
+    def remove_from_sprite_lists(self):
+        """Remove the body from every list it belongs to."""
+        for body_list in list(self.sprite_lists):
+            body_list.remove(self)
+
+    def on_update(self, delta_time: float):
+        """Update the position of the body.
+
+        Arguments:
+            delta_time {float} -- Time since the last update
+        """
+        self.center_x = self.center_x + self.change_x * delta_time
+        self.center_y = self.center_y + self.change_y * delta_time
+
+
+def slab(position, displacement, low, high):
+    """Find when a point moving along one axis is between two bounds.
+
+    Arguments:
+        position {float} -- Starting position of the point
+        displacement {float} -- Distance moved over the sweep
+        low {float} -- Lower bound
+        high {float} -- Upper bound
+
+    Returns:
+        (float, float) -- Entry and exit times as fractions of the
+                          displacement, or None if never inside
+
+    """
+    if displacement == 0:
+        if low < position < high:
+            return -math.inf, math.inf
+        return None
+    t1 = (low - position) / displacement
+    t2 = (high - position) / displacement
+    return min(t1, t2), max(t1, t2)
+
+
+class BodyList:
+    """An ordered collection of bodies, the headless twin of SpriteList."""
+
+    def __init__(self):
+        self.bodies = []
+
+    def __len__(self):
+        return len(self.bodies)
+
+    def __getitem__(self, index):
+        return self.bodies[index]
+
+    def __iter__(self):
+        # Iterate over a snapshot so bodies can remove themselves mid-loop
+        return iter(tuple(self.bodies))
+
+    def append(self, body):
+        self.bodies.append(body)
+        body.sprite_lists.append(self)
+
+    def remove(self, body):
+        self.bodies.remove(body)
+        body.sprite_lists.remove(self)
+
+    def pop(self, index=-1):
+        body = self.bodies.pop(index)
+        body.sprite_lists.remove(self)
+        return body
+
+    def near(self, body):
+        """Find the bodies that could collide with a body.
+
+        A plain list has no index, so every body is a candidate. Indexed
+        lists such as BrickGrid narrow this down.
+
+        Arguments:
+            body {Body} -- The body to look around
+
+        Returns:
+            The candidate bodies
+
+        """
+        return self
+
+    def on_update(self, delta_time: float):
+        """Call on_update on every body in the list.
+
+        Arguments:
+            delta_time {float} -- Time since the last update
+        """
+        for body in self:
+            body.on_update(delta_time)
@@ -1,10 +1,25 @@
-import arcade
+from constants import SCREEN_HEIGHT, SCALING, WALL_WIDTH
 
 BRICK_WIDTH = 34
 BRICK_HEIGHT = 20
 
+# Top left corner of the brick field, as laid out by build_level
+GRID_LEFT = WALL_WIDTH
+GRID_TOP = SCREEN_HEIGHT - 40
 
-class Brick(arcade.Sprite):
+SILVER = 8
+GOLD = 9
+
+
+class Brick:
+    """One cell of a BrickField, seen as a brick.
+
+    Bricks are not stored as objects. A Brick is a small view that reads
+    and writes the field's arrays, made on demand for the few bricks a
+    collision test or a hit needs.
+    """
+
+    __slots__ = ('field', 'row', 'col')
 
     clrs = [('white', 50),
             ('orange', 60),
@@ -16,41 +31,66 @@ class Brick(arcade.Sprite):
             ('yellow', 120),
             ('silver', 50),
             ('gold', 0)]
-    hit_points = 1
 
-    def __init__(self, type, scale, x, y):
-        """Initialize the Brick sprite."""
-        super().__init__(f'images/brick_{self.clrs[type][0]}.png', scale)
+    width = BRICK_WIDTH * SCALING
+    height = BRICK_HEIGHT * SCALING
 
-        self.type = type
-        self.left = x
-        self.top = y
+    def __init__(self, field, row, col):
+        """Initialize the Brick view.
 
-        if self.type == 8:
-            texture = arcade.load_texture('images/brick_silver_broken.png')
-            self.append_texture(texture)
-            self.hit_points = 2
+        Arguments:
+            field {BrickField} -- The field the brick lives in
+            row {int} -- Row of the brick's cell
+            col {int} -- Column of the brick's cell
+        """
+        self.field = field
+        self.row = row
+        self.col = col
 
-    def side_collision(self, ball):
-        """Determine if ball is near the brick's left or right sides.
+    def __eq__(self, other):
+        return (isinstance(other, Brick) and self.field is other.field
+                and self.row == other.row and self.col == other.col)
 
-        Arguments:
-            ball {Ball} -- The ball sprite
+    def __hash__(self):
+        return hash((id(self.field), self.row, self.col))
 
-        Returns:
-            bool -- True if the ball is near the sides of the brick. False
-                    if the ball is near the top or bottome of the brick.
+    @property
+    def type(self):
+        return int(self.field.types[self.row, self.col])
 
-        """
-        if (ball.center_x >= self.right
-           and ball.center_y >= self.bottom
-           and ball.center_y <= self.top):
-            return True
-        elif (ball.center_x <= self.left
-              and ball.center_y >= self.bottom
-              and ball.center_y <= self.top):
-            return True
-        return False
+    @property
+    def hit_points(self):
+        return int(self.field.hit_points[self.row, self.col])
+
+    @property
+    def left(self):
+        return GRID_LEFT + BRICK_WIDTH * self.col
+
+    @property
+    def right(self):
+        return self.left + self.width
+
+    @property
+    def top(self):
+        return GRID_TOP - BRICK_HEIGHT * (self.row - self.field.top_row)
+
+    @property
+    def bottom(self):
+        return self.top - self.height
+
+    @property
+    def center_x(self):
+        return self.left + self.width / 2
+
+    @property
+    def center_y(self):
+        return self.top - self.height / 2
+
+    @property
+    def texture(self):
+        if self.type == SILVER and self.hit_points <= 1:
+            return 'images/brick_silver_broken.png'
+        return f'images/brick_{self.clrs[self.type][0]}.png'
 
     def hit(self):
         """Reduce hit points of brick by 1.
@@ -58,7 +98,6 @@ class Brick(arcade.Sprite):
         A silver brick will switch to a broken texture with 1 hit point left.
         A gold brick cannot be damaged.
         """
-        if self.type != 9:
-            self.hit_points -= 1
-        if self.type == 8 and self.hit_points <= 1:
-            self.set_texture(1)
+        if self.type != GOLD:
+            self.field.hit_points[self.row, self.col] -= 1
+            self.field.dirty[self.row, self.col] = True
@@ -0,0 +1,283 @@
+import math
+
+import numpy as np
+
+from brick import (Brick, BRICK_WIDTH, BRICK_HEIGHT, GRID_LEFT, GRID_TOP,
+                   SILVER, GOLD)
+
+# Type code of a cell with no brick
+EMPTY = -1
+
+# Rows that fit between the top wall and the bottom of the brick area.
+# Taller levels scroll, showing this many rows at a time.
+VISIBLE_ROWS = 18
+FIELD_BOTTOM = GRID_TOP - BRICK_HEIGHT * VISIBLE_ROWS
+
+# Points for destroying each brick type, for vectorised scoring
+POINTS = np.array([points for _, points in Brick.clrs])
+
+
+def cell_span(start, end):
+    """Convert a span measured in cells to the range of cells it covers.
+
+    Edges that only touch a cell do not count, matching the strict overlap
+    test bodies use for collisions.
+
+    Arguments:
+        start {float} -- Start of the span in cell units
+        end {float} -- End of the span in cell units
+
+    Returns:
+        range -- Indices of the covered cells
+
+    """
+    first = math.floor(start)
+    last = max(first, math.ceil(end) - 1)
+    return range(first, last + 1)
+
+
+def map_types(map_array):
+    """Convert a level map to an array of brick type codes.
+
+    Arguments:
+        map_array {[[str]]} -- A 2D array representing the brick pattern
+
+    Returns:
+        np.ndarray -- Brick type per cell, EMPTY for none
+
+    """
+    rows = len(map_array)
+    cols = max((len(row) for row in map_array), default=0)
+    types = np.full((rows, cols), EMPTY, dtype=np.int8)
+    for i, row in enumerate(map_array):
+        for j, type in enumerate(row):
+            if type != '-':
+                types[i, j] = int(type)
+    return types
+
+
+class BrickField:
+    """Every brick of a level, held as arrays over the level grid.
+
+    Levels are laid out on a fixed grid of BRICK_WIDTH x BRICK_HEIGHT
+    cells. Each cell has a type, hit points and an alive flag, three bytes
+    in all. A moving body only has to be tested against the few cells its
+    box overlaps, and running counts make completion checks O(1).
+
+    Cells whose brick changed are flagged in dirty so a renderer only has
+    to update those. When a level of a different size is loaded every
+    cell is new, and generation goes up so a renderer knows to start over.
+
+    A level taller than VISIBLE_ROWS starts scrolled to its bottom rows.
+    top_row is the row shown just under the top wall, and rows above it
+    are out of sight and out of reach. Scrolling lowers every brick by a
+    row. Rows below the visible ones never hold a live brick, so bounds
+    and collision tests only ever look at the visible rows.
+    """
+
+    def __init__(self):
+        self.types = np.full((0, 0), EMPTY, dtype=np.int8)
+        self.hit_points = np.zeros((0, 0), dtype=np.int8)
+        self.alive = np.zeros((0, 0), dtype=bool)
+        self.alive_count = 0
+        self.breakable_count = 0
+        self.dirty = np.zeros((0, 0), dtype=bool)
+        self.generation = 0
+        self.bounds_cache = None
+        self.top_row = 0
+
+    def __len__(self):
+        return self.alive_count
+
+    def __iter__(self):
+        for row, col in zip(*np.nonzero(self.alive)):
+            yield Brick(self, int(row), int(col))
+
+    @property
+    def gold_count(self):
+        return self.alive_count - self.breakable_count
+
+    def load(self, map_array):
+        """Lay out the bricks of a level.
+
+        Cells that already hold an undamaged brick of the type the level
+        wants are left as they are, and are not marked dirty.
+
+        Arguments:
+            map_array {[[str]]} -- A 2D array representing the brick pattern
+        """
+        self.load_types(map_types(map_array))
+
+    def load_types(self, types):
+        """Lay out the bricks of a level from an array of type codes.
+
+        Arguments:
+            types {np.ndarray} -- Brick type per cell, EMPTY for none
+        """
+        alive = types != EMPTY
+        hit_points = np.where(types == SILVER, 2, 1).astype(np.int8) * alive
+        self.set_state(types, hit_points, alive,
+                       max(len(types) - VISIBLE_ROWS, 0))
+
+    def set_state(self, types, hit_points, alive, top_row):
+        """Replace every cell of the field, as a level load or a restore.
+
+        Arguments:
+            types {np.ndarray} -- Brick type per cell, EMPTY for none
+            hit_points {np.ndarray} -- Hits left per cell
+            alive {np.ndarray} -- Whether each cell holds a brick
+            top_row {int} -- The row shown just under the top wall
+        """
+        if types.shape == self.types.shape:
+            self.dirty |= ((types != self.types)
+                           | (hit_points != self.hit_points)
+                           | (alive != self.alive))
+        else:
+            self.dirty = alive.copy()
+            self.generation += 1
+
+        self.types = types
+        self.hit_points = hit_points
+        self.alive = alive
+        self.bounds_cache = None
+        self.top_row = top_row
+        self.alive_count = int(alive.sum())
+        self.breakable_count = int((alive & (types != GOLD)).sum())
+
+    def remove(self, brick):
+        """Take a brick out of the field.
+
+        Arguments:
+            brick {Brick} -- The brick to remove
+        """
+        row, col = brick.row, brick.col
+        if not self.alive[row, col]:
+            return
+        self.alive[row, col] = False
+        self.bounds_cache = None
+        self.alive_count -= 1
+        if self.types[row, col] != GOLD:
+            self.breakable_count -= 1
+        self.dirty[row, col] = True
+
+    @property
+    def visible_rows(self):
+        """The rows between the top wall and the bottom of the brick area."""
+        return range(self.top_row,
+                     min(self.top_row + VISIBLE_ROWS, len(self.alive)))
+
+    def lowest_breakable(self):
+        """Find the bottom edge of the lowest breakable brick in sight.
+
+        Returns:
+            float -- Its y, or None if no breakable brick is in sight
+
+        """
+        rows = self.visible_rows
+        breakable = (self.alive[rows.start:rows.stop]
+                     & (self.types[rows.start:rows.stop] != GOLD))
+        found = np.flatnonzero(breakable.any(axis=1))
+        if len(found) == 0:
+            return None
+        return GRID_TOP - BRICK_HEIGHT * found[-1] - Brick.height
+
+    def scroll(self):
+        """Bring the row above the visible ones into sight.
+
+        Every brick moves down a row, so the caller makes sure nothing is
+        in the way and that the lowest breakable bricks have room to move
+        into. Gold bricks left on the bottom visible row cannot be broken
+        and would hold the level up, so they are taken out instead.
+        """
+        bottom = self.top_row + VISIBLE_ROWS - 1
+        if bottom < len(self.alive):
+            for col in np.flatnonzero(self.alive[bottom]):
+                self.remove(Brick(self, bottom, int(col)))
+        self.top_row -= 1
+        self.bounds_cache = None
+
+    def take_dirty(self, rows=None):
+        """Get and forget the cells changed since the last call.
+
+        Arguments:
+            rows {range} -- Only look at these rows. Changes elsewhere
+                            are kept for a later call.
+
+        Returns:
+            [(int, int)] -- Row and column of each changed cell
+
+        """
+        if rows is None:
+            rows = range(len(self.dirty))
+        dirty = self.dirty[rows.start:rows.stop]
+        found_rows, found_cols = np.nonzero(dirty)
+        dirty[:] = False
+        return list(zip((found_rows + rows.start).tolist(),
+                        found_cols.tolist()))
+
+    def remaining_points(self):
+        """Total points still standing in the field."""
+        return int(POINTS[self.types[self.alive]].sum())
+
+    def bounds(self):
+        """Find the box around every live brick in sight.
+
+        Returns:
+            np.ndarray -- A single (left, right, bottom, top) row, or no
+                          rows if the field is empty
+
+        """
+        if self.bounds_cache is None:
+            visible = self.alive[self.top_row:self.top_row + VISIBLE_ROWS]
+            rows = np.flatnonzero(visible.any(axis=1))
+            cols = np.flatnonzero(visible.any(axis=0))
+            if len(rows) == 0:
+                self.bounds_cache = np.zeros((0, 4))
+            else:
+                self.bounds_cache = np.array([[
+                    GRID_LEFT + BRICK_WIDTH * cols[0],
+                    GRID_LEFT + BRICK_WIDTH * cols[-1] + Brick.width,
+                    GRID_TOP - BRICK_HEIGHT * rows[-1] - Brick.height,
+                    GRID_TOP - BRICK_HEIGHT * rows[0],
+                ]], dtype=float)
+        return self.bounds_cache
+
+    def near(self, body):
+        """Find the bricks sharing a cell with a body.
+
+        Arguments:
+            body {Body} -- The body to look around
+
+        Returns:
+            [Brick] -- Candidate bricks for a collision test
+
+        """
+        return self.in_box(body.left, body.right, body.bottom, body.top)
+
+    def in_box(self, left, right, bottom, top):
+        """Find the bricks in the cells a box overlaps.
+
+        Bricks are returned row by row, left to right.
+
+        Arguments:
+            left {float} -- Left edge of the box
+            right {float} -- Right edge of the box
+            bottom {float} -- Bottom edge of the box
+            top {float} -- Top edge of the box
+
+        Returns:
+            [Brick] -- Candidate bricks for a collision test
+
+        """
+        rows_count, cols_count = self.alive.shape
+        rows = cell_span((GRID_TOP - top) / BRICK_HEIGHT + self.top_row,
+                         (GRID_TOP - bottom) / BRICK_HEIGHT + self.top_row)
+        cols = cell_span((left - GRID_LEFT) / BRICK_WIDTH,
+                         (right - GRID_LEFT) / BRICK_WIDTH)
+        found = []
+        for row in range(max(rows.start, self.top_row),
+                         min(rows.stop, rows_count)):
+            for col in range(max(cols.start, 0), min(cols.stop, cols_count)):
+                if self.alive[row, col]:
+                    found.append(Brick(self, row, col))
+        return found
@@ -0,0 +1,72 @@
+"""Pack every image in images/ into a single texture atlas.
+
+Writes images/atlas.png and a lookup table, images/atlas.json, that maps
+each original image path to its (x, y, width, height) region in the
+atlas. Run it again whenever an image is added or changed:
+
+    $ python build_atlas.py
+"""
+import json
+import os
+
+from PIL import Image
+
+from constants import IMAGE_DIR, ATLAS_IMAGE, ATLAS_TABLE
+
+ATLAS_WIDTH = 256
+
+# Gap left around each image so neighbours never bleed into each other
+PADDING = 1
+
+
+def pack(sizes, width=ATLAS_WIDTH):
+    """Lay out rectangles in shelves, tallest first.
+
+    Arguments:
+        sizes {{str: (int, int)}} -- Width and height of each image
+        width {int} -- Width of the atlas
+
+    Returns:
+        ({str: (int, int)}, int) -- Top left corner of each image and the
+                                    height of the atlas
+
+    """
+    positions = {}
+    x = y = shelf_height = 0
+    for name in sorted(sizes, key=lambda name: (-sizes[name][1], name)):
+        w, h = sizes[name]
+        if x + w + PADDING > width:
+            x = 0
+            y = y + shelf_height
+            shelf_height = 0
+        positions[name] = (x, y)
+        x = x + w + PADDING
+        shelf_height = max(shelf_height, h + PADDING)
+    return positions, y + shelf_height
+
+
+def build_atlas():
+    images = {}
+    for name in sorted(os.listdir(IMAGE_DIR)):
+        path = f'{IMAGE_DIR}/{name}'
+        if name.endswith('.png') and path != ATLAS_IMAGE:
+            images[path.lower()] = Image.open(path).convert('RGBA')
+
+    sizes = {path: image.size for path, image in images.items()}
+    positions, height = pack(sizes)
+
+    atlas = Image.new('RGBA', (ATLAS_WIDTH, height))
+    table = {}
+    for path, (x, y) in positions.items():
+        atlas.paste(images[path], (x, y))
+        table[path] = [x, y, *sizes[path]]
+
+    atlas.save(ATLAS_IMAGE)
+    with open(ATLAS_TABLE, 'w') as table_file:
+        json.dump(table, table_file, indent=1, sort_keys=True)
+    print(f'Packed {len(table)} images into {ATLAS_WIDTH}x{height} '
+          f'{ATLAS_IMAGE}')
+
+
+if __name__ == "__main__":
+    build_atlas()
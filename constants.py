@@ -4,3 +4,10 @@ SCREEN_TITLE = 'Brick Breaker'
 SCALING = 1.0
 WALL_WIDTH = 20
 TOP_WALL_WIDTH = 40
+PHYSICS_HZ = 60
+IMAGE_DIR = 'images'
+SOUND_DIR = 'sounds'
+ATLAS_IMAGE = 'images/atlas.png'
+ATLAS_TABLE = 'images/atlas.json'
+LEVEL_DIR = 'levels'
+LEVEL_PACK = 'levels/levels.pack'
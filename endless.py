@@ -0,0 +1,149 @@
+"""Endless mode: levels made up on the fly from seeded streams of rows.
+
+EndlessLevels is a level source like LevelPack and LevelFiles, except
+every level number exists, so next_level never wraps back to level 1.
+Each level is cut from its own seeded stream of brick rows, written in
+the same '-' and 0-9 codes as the csv files. Rows are only generated as
+a level is built, and a level never holds more rows than the tallest
+hand-made one, so memory and the work per step stay the same however
+long a session goes on.
+
+    $ python endless.py --seed 7 --level 12
+
+prints a generated level.
+"""
+import argparse
+import itertools
+import random
+
+from brick import SILVER, GOLD
+from brick_field import map_types, EMPTY
+
+ENDLESS_COLUMNS = 13
+ENDLESS_MIN_ROWS = 6
+ENDLESS_MAX_ROWS = 18
+
+# Brick colours a row is painted in, silver and gold are placed apart
+COLOURS = 8
+
+# Chance of a row with no bricks, and of a filled cell in other rows
+GAP_CHANCE = 0.15
+FILL_CHANCE = 0.7
+
+# Chance of a silver or gold brick, rising by STEP each level up to MAX
+SILVER_STEP = 0.02
+SILVER_MAX = 0.3
+GOLD_STEP = 0.005
+GOLD_MAX = 0.08
+
+
+def brick_rows(generator, level, columns=ENDLESS_COLUMNS):
+    """Yield rows of bricks forever, each mirrored about the middle.
+
+    Arguments:
+        generator {random.Random} -- Source of every choice
+        level {int} -- How hard the rows should be
+        columns {int} -- Cells in a row
+
+    Yields:
+        [str] -- A row of brick codes, '-' for no brick
+    """
+    silver = min(SILVER_STEP * level, SILVER_MAX)
+    gold = min(GOLD_STEP * level, GOLD_MAX)
+    half = (columns + 1) // 2
+    while True:
+        if generator.random() < GAP_CHANCE:
+            yield ['-'] * columns
+            continue
+        colour = str(generator.randrange(COLOURS))
+        row = []
+        for _ in range(half):
+            chance = generator.random()
+            if chance >= FILL_CHANCE:
+                row.append('-')
+                continue
+            chance = generator.random()
+            if chance < gold:
+                row.append(str(GOLD))
+            elif chance < gold + silver:
+                row.append(str(SILVER))
+            else:
+                row.append(colour)
+        yield row + row[columns - half - 1::-1]
+
+
+def level_rows(level):
+    """Number of rows in a level, more the further in it is."""
+    return min(ENDLESS_MIN_ROWS + level // 2, ENDLESS_MAX_ROWS)
+
+
+class EndlessLevels:
+    """Every level number, each generated from the game's seed."""
+
+    def __init__(self, seed=None):
+        """Initialize the generator.
+
+        Arguments:
+            seed {int} -- Seed of the whole run. Picked at random if not
+                          given.
+        """
+        if seed is None:
+            seed = random.getrandbits(64)
+        self.seed = seed
+
+    def __contains__(self, level):
+        return level >= 1
+
+    def prefetch(self, level):
+        """Do nothing. Wrap in a prefetch.LevelPrefetcher to read ahead."""
+
+    def map(self, level):
+        """Generate the map of a level.
+
+        The level takes as many rows as it needs from the start of its
+        stream, skipping on past rows until at least one brick can be
+        broken, so the level can always be cleared.
+
+        Arguments:
+            level {int} -- The level number
+
+        Returns:
+            map_array {[[str]]} -- A 2D array representing the brick pattern
+
+        """
+        generator = random.Random(f'{self.seed}:{level}')
+        rows = brick_rows(generator, level)
+        map_array = list(itertools.islice(rows, level_rows(level)))
+        while not any(code not in ('-', str(GOLD))
+                      for row in map_array for code in row):
+            map_array = map_array[1:] + [next(rows)]
+        return map_array
+
+    def types(self, level):
+        """Get the brick type codes of a level.
+
+        Arguments:
+            level {int} -- The level number
+
+        Returns:
+            np.ndarray -- Brick type per cell, EMPTY for none
+
+        """
+        return map_types(self.map(level))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--level', type=int, default=1)
+    args = parser.parse_args()
+
+    levels = EndlessLevels(args.seed)
+    types = levels.types(args.level)
+    for row in types:
+        print(' '.join('.' if code == EMPTY else str(code) for code in row))
+    print(f'Level {args.level}: {int((types != EMPTY).sum())} bricks')
+
+
+if __name__ == "__main__":
+    main()
@@ -1,136 +1,219 @@
-import arcade
+import argparse
 import random
+import sys
+import time
+
+import arcade
 
+from assets import assets
+from audio import Mixer
+from brick_field import EMPTY, VISIBLE_ROWS
 from constants import (SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE,
-                       SCALING, WALL_WIDTH, TOP_WALL_WIDTH)
-from player import Player
-from ball import Ball
-from brick import Brick, BRICK_WIDTH, BRICK_HEIGHT
-from power_up import PowerUp, PowerUpType
-from laser import Laser, Side
+                       SCALING, WALL_WIDTH, PHYSICS_HZ)
+from hud import Hud
+from player import Action, Autopilot
+from prefetch import LevelPrefetcher
+from profiler import Profiler, NULL_PROFILER
+from replay import Recording, Recorder, ReplayDriver, parse_seed
+from simulation import (Simulation, BALL_POOL_SIZE, LASER_POOL_SIZE,
+                        POWER_UP_POOL_SIZE)
+from sprite_layer import (SpriteLayer, BrickFieldLayer, StaticLayer,
+                          MATERIALISE_ROWS)
+from timestep import FixedTimestep
+
+# New brick sprites made per frame while getting the next level ready
+BRICK_RESERVE_PER_FRAME = 16
+
+# Sound src: https://www.sounds-resource.com/nes/arkanoid/sound/3698/
+SOUNDS = {
+    'sbrick': 'sounds/sbrick_bounce.wav',
+    'brick': 'sounds/brick_bounce.wav',
+    'player': 'sounds/player_bounce.wav',
+}
+
+KEY_ACTIONS = {
+    arcade.key.LEFT: Action.LEFT,
+    arcade.key.RIGHT: Action.RIGHT,
+    arcade.key.SPACE: Action.SHOOT,
+    arcade.key.P: Action.PAUSE,
+}
 
 
 class BrickBreaker(arcade.Window):
+    """Draws a Simulation and feeds it keyboard input.
+
+    Every action is recorded along with the game's seed, so the game can
+    be saved and replayed exactly. Given a recording, the window plays it
+    back instead of listening to the keyboard. Given a controller, the
+    controller plays alongside the keyboard.
+
+    F shows frame timings and sprite counts. Profiling starts the first
+    time it is shown, or from the start when the game is profiled.
+    """
 
-    def __init__(self, width, height, title):
-        """Initialize the game."""
+    def __init__(self, width, height, title, physics_hz=PHYSICS_HZ,
+                 seed=None, recording=None, controller=None, profile=False,
+                 endless=False, startup=None):
+        """Initialize the game.
+
+        Arguments:
+            width {int} -- Window width
+            height {int} -- Window height
+            title {str} -- Window title
+            physics_hz {int} -- Simulation steps per second
+            seed {int} -- Random seed. Picked at random if not given.
+            recording {Recording} -- A game to play back
+            controller {Controller} -- Plays the game, such as an Autopilot
+            profile {bool} -- Time every frame from the start
+            endless {bool} -- Play generated levels that never run out
+            startup {StartupProfile} -- Report the startup and quit after
+                                        the first frame
+        """
         super().__init__(width, height, title)
 
-        # Initialize score
-        self.score = 0
-        self.lives = 2
+        self.replay = None
+        if recording is not None:
+            seed = recording.seed
+            physics_hz = recording.physics_hz
+            endless = recording.endless
+        elif seed is None:
+            seed = random.getrandbits(64)
+
+        self.simulation = Simulation(seed, endless)
+        self.simulation.levels = LevelPrefetcher(self.simulation.levels)
+        self.timestep = FixedTimestep(physics_hz)
+
+        # The walls never move, so they are drawn once, here
+        self.static = StaticLayer([*self.simulation.top_walls,
+                                   *self.simulation.side_walls],
+                                  arcade.color.GRAY)
+
+        if recording is not None:
+            self.recording = recording
+            self.replay = ReplayDriver(self.simulation, recording)
+        else:
+            self.recording = Recording(seed, physics_hz=physics_hz,
+                                       endless=endless)
+        self.input = Recorder(self.simulation, self.recording)
+        self.controller = controller
+        self.mixer = Mixer(SOUNDS)
+
+        self.profiler = NULL_PROFILER
+        self.show_profile = False
+        if profile:
+            self.start_profiling()
+
+        self.startup = startup
+        self.first_frame = True
 
     def setup(self, level):
         """Get the game ready to play."""
         arcade.set_background_color(arcade.color.GRAY)
-        self.pause = False
-
-        # Initialize level
-        self.level = level
-        self.break_out = False
-
-        # Initialize power up counter
-        self.pup_counter = 5
-
-        # Initialize sprite lists
-        self.side_wall_sprites = arcade.SpriteList()
-        self.top_wall_sprites = arcade.SpriteList()
-        self.balls = arcade.SpriteList()
-        self.bricks = arcade.SpriteList()
-        self.extra_lives = arcade.SpriteList()
-        self.power_ups = arcade.SpriteList()
-        self.lasers = arcade.SpriteList()
-        self.all_sprites = arcade.SpriteList()
-
-        # Load sounds
-        # Sound src: https://www.sounds-resource.com/nes/arkanoid/sound/3698/
-        self.sbrick_sound = arcade.load_sound('sounds/sbrick_bounce.wav')
-        self.brick_sound = arcade.load_sound('sounds/brick_bounce.wav')
-        self.player_sound = arcade.load_sound('sounds/player_bounce.wav')
-
-        # Set up the walls
-        for i in range(8):
-            new_left_wall = arcade.Sprite('images/wall_left.png', SCALING)
-            new_left_wall.left = 0
-            new_left_wall.bottom = i * 100
-            self.side_wall_sprites.append(new_left_wall)
-            self.all_sprites.append(new_left_wall)
-
-            new_right_wall = arcade.Sprite('images/wall_right.png', SCALING)
-            new_right_wall.right = SCREEN_WIDTH
-            new_right_wall.bottom = i * 100
-            if i == 0:
-                self.break_out_wall = new_right_wall
-            else:
-                self.side_wall_sprites.append(new_right_wall)
-            self.all_sprites.append(new_right_wall)
-
-        for i in range(6):
-            new_top_wall = arcade.Sprite('images/wall_top.png', SCALING)
-            new_top_wall.top = SCREEN_HEIGHT
-            new_top_wall.left = i * 100
-            self.top_wall_sprites.append(new_top_wall)
-            self.all_sprites.append(new_top_wall)
-
-        # Set up the extra lives sprites
-        for i in range(self.lives):
-            life = arcade.Sprite('images/player_life.png', SCALING)
-            life.bottom = 10
-            life.left = WALL_WIDTH + (30 * i)
-            self.extra_lives.append(life)
-            self.all_sprites.append(life)
-
-        # Retrieve the level pattern and build the current level
-        self.build_level(self.get_level_map(self.level))
-
-        # Set up the player
-        self.player = Player('images/player.png', SCALING)
-        self.all_sprites.append(self.player)
-
-        # Set up the ball
-        ball = Ball('images/ball.png', SCALING, self.player)
-        self.balls.append(ball)
-        self.all_sprites.append(ball)
-
-    def get_level_map(self, level):
-        """Retrieve the given level map from csv file.
+
+        self.simulation.setup(level)
+        if self.replay is None:
+            self.recording.level = level
+
+        # Initialize sprite layers
+        self.balls = SpriteLayer(BALL_POOL_SIZE, 'images/ball.png')
+        self.bricks = BrickFieldLayer()
+        self.power_ups = SpriteLayer(POWER_UP_POOL_SIZE,
+                                     'images/pup_catch.png')
+        self.lasers = SpriteLayer(LASER_POOL_SIZE, 'images/laser.png')
+        self.player = SpriteLayer()
+        self.hud = Hud()
+
+        self.drawn_level = level
+        self.reserved_level = None
+        self.sync_sprites()
+
+    def remember_positions(self):
+        """Record moving body positions ahead of a simulation step."""
+        simulation = self.simulation
+        self.balls.remember(simulation.balls)
+        self.power_ups.remember(simulation.power_ups)
+        self.lasers.remember(simulation.lasers)
+        self.player.remember([simulation.player])
+
+    def sync_sprites(self, alpha=1.0):
+        """Bring every sprite in line with the simulation state.
 
         Arguments:
-            level {int} -- The level ID to fetch
+            alpha {float} -- Fraction of a step to interpolate moving
+                             sprites by
+        """
+        simulation = self.simulation
+        # The break out gate is only drawn while it is closed
+        self.static.sync([] if simulation.player.break_out
+                         else [simulation.break_out_wall])
+        self.balls.sync(simulation.balls, alpha)
+        self.bricks.sync(simulation.bricks)
+        self.power_ups.sync(simulation.power_ups, alpha)
+        self.lasers.sync(simulation.lasers, alpha)
+        self.player.sync([simulation.player], alpha)
+
+        self.hud.update(simulation.score, simulation.level, simulation.lives)
+
+    def prepare_next_level(self):
+        """Make brick sprites for the next level before it starts.
+
+        Once the next level has been prefetched, enough parked brick
+        sprites are made for it a few per frame, so the change of level
+        only has to re-texture and place them.
+        """
+        level = self.simulation.next_level()
+        if level == self.reserved_level:
+            return
+        types = self.simulation.levels.peek(level)
+        if types is None:
+            return
+        # A tall level starts on its bottom rows, only those get sprites
+        shown = types[-(VISIBLE_ROWS + MATERIALISE_ROWS):]
+        if self.bricks.reserve(int((shown != EMPTY).sum()),
+                               'images/brick_white.png',
+                               BRICK_RESERVE_PER_FRAME):
+            self.reserved_level = level
+
+    def sync_new_level(self):
+        """Bring in the sprites for a new level.
+
+        The time it takes is its own profiler phase and, while profiling,
+        is reported along with the assets it had to load from disk.
+        """
+        disk_loads = assets.disk_loads
+        start = time.perf_counter()
+        with self.profiler.phase('new level'):
+            self.sync_sprites(self.timestep.alpha)
+        elapsed = time.perf_counter() - start
+        self.drawn_level = self.simulation.level
+        if self.profiler is not NULL_PROFILER:
+            print(f'Level {self.drawn_level} built in {elapsed * 1000:.1f}ms '
+                  f'with {assets.disk_loads - disk_loads} disk loads')
+
+    def start_profiling(self):
+        """Time the phases of every frame from now on."""
+        self.profiler = Profiler()
+        self.simulation.profiler = self.profiler
+
+    def profile_lines(self):
+        """Frame timings and sprite counts for the profile overlay.
 
         Returns:
-            map_array {[[str]]} -- A 2D array representing the brick pattern
-
-        """
-        filename = f'levels/level_{level}.csv'
-        with open(filename) as map_file:
-            map_array = []
-            for line in map_file:
-                line = line.strip()
-                map_row = line.split(',')
-                map_array.append(map_row)
-        return map_array
-
-    def build_level(self, map_array):
-        """Build the brick pattern given a map array of the level.
+            [str] -- Lines of text, top first
 
-        Arguments:
-            map_array {[[str]]} -- A 2D array representing the brick pattern
         """
-        for i, row in enumerate(map_array):
-            for j, type in enumerate(row):
-                if type != '-':
-                    brick = Brick(int(type),
-                                  SCALING,
-                                  WALL_WIDTH + (BRICK_WIDTH * j),
-                                  SCREEN_HEIGHT - 40 - (BRICK_HEIGHT * i))
-                    self.bricks.append(brick)
-                    self.all_sprites.append(brick)
+        layers = (('bricks', self.bricks), ('balls', self.balls),
+                  ('lasers', self.lasers), ('power ups', self.power_ups))
+        sprites = '  '.join(f'{name} {len(layer.sprites)}/'
+                            f'{len(layer.sprite_list)}'
+                            for name, layer in layers)
+        return [*self.profiler.report(), f'sprites {sprites}']
 
     def on_key_press(self, symbol: int, modifiers: int):
         """Handle user keyboard input.
 
         Q: Quit the game
+        F: Show/hide frame timings
         P: Pause/Unpause the game
         Arrows: Move Left or Right
         Space: Shoot the ball from initial position
@@ -143,16 +226,13 @@ class BrickBreaker(arcade.Window):
             # Quit immediately
             arcade.close_window()
 
-        if symbol == arcade.key.P:
-            self.pause = not self.pause
+        if symbol == arcade.key.F:
+            if self.profiler is NULL_PROFILER:
+                self.start_profiling()
+            self.show_profile = not self.show_profile
 
-        if symbol == arcade.key.SPACE:
-            # Shoot the ball!
-            self.balls[0].shoot()
-            if self.player.current_power_up == PowerUpType.LASER:
-                self.shoot_lasers()
-
-        self.player.on_key_press(symbol, modifiers)
+        if symbol in KEY_ACTIONS and self.replay is None:
+            self.input.on_action_press(KEY_ACTIONS[symbol])
 
     def on_key_release(self, symbol: int, modifiers: int):
         """Undo movement vectors when movement keys are released.
@@ -161,216 +241,141 @@ class BrickBreaker(arcade.Window):
             symbol {int} -- Which key was pressed
             modifiers {int} -- Which modifiers were pressed
         """
-        self.player.on_key_release(symbol, modifiers)
+        if symbol in KEY_ACTIONS and self.replay is None:
+            self.input.on_action_release(KEY_ACTIONS[symbol])
 
     def on_update(self, delta_time: float):
-        """Update the positions and statuses of all game objects.
+        """Step the simulation and play the sounds it produced.
 
-        If paused, do nothing
-        Check ball collisions with bricks, walls, and player. Update
-        ball vector on each collision. Remove bricks when collision
-        detected with ball.
+        The simulation always moves in fixed steps. However much time the
+        frame took is banked and spent in as many whole steps as fit. The
+        sounds of all the steps go to the mixer together.
 
         Arguments:
             delta_time {float} -- Time since the last update
         """
-        if self.pause:
-            return
-
-        self.player.on_update(delta_time)
-        self.player.update_animation(delta_time)
-        self.power_ups.on_update(delta_time)
-        self.balls.on_update(delta_time)
-        self.lasers.on_update(delta_time)
-
-        for laser in self.lasers:
-            bricks = laser.collides_with_list(self.bricks)
-            if bricks:
-                # Limit to one brick collision at a time
-                brick = bricks[0]
-
-                brick.hit()
-                if brick.type == 9 or brick.type == 8:
-                    arcade.play_sound(self.sbrick_sound)
-                else:
-                    arcade.play_sound(self.brick_sound)
-
-                laser.remove_from_sprite_lists()
-
-                # If brick reaches 0 hp, destroy brick and increase score
-                if brick.hit_points == 0:
-                    if brick.type == 8:
-                        self.score += (Brick.clrs[brick.type][1] * self.level)
-                    else:
-                        self.score += Brick.clrs[brick.type][1]
-                    # If enough non-gold/silver bricks have been destroyed,
-                    # drop a power up
-                    if brick.type != 9 and brick.type != 8 and self.pup_counter <= 0:
-                        self.drop_power_up(brick)
-                    else:
-                        self.pup_counter = self.pup_counter - 1
-                    brick.remove_from_sprite_lists()
-            if laser.top > self.height - TOP_WALL_WIDTH:
-                laser.remove_from_sprite_lists()
-
-        for ball in self.balls:
-            bricks = ball.collides_with_list(self.bricks)
-            if bricks:
-                # Limit to one brick collision at a time
-                brick = bricks[0]
-                ball.collides_with_brick(brick)
-
-                brick.hit()
-                if brick.type == 9 or brick.type == 8:
-                    arcade.play_sound(self.sbrick_sound)
-                else:
-                    arcade.play_sound(self.brick_sound)
-
-                # If brick reaches 0 hp, destroy brick and increase score
-                if brick.hit_points == 0:
-                    if brick.type == 8:
-                        self.score += (Brick.clrs[brick.type][1] * self.level)
-                    else:
-                        self.score += Brick.clrs[brick.type][1]
-                    # If enough non-gold/silver bricks have been destroyed,
-                    # drop a power up
-                    if brick.type != 9 and brick.type != 8 and self.pup_counter <= 0:
-                        self.drop_power_up(brick)
-                    else:
-                        self.pup_counter = self.pup_counter - 1
-                    brick.remove_from_sprite_lists()
-
-            if (ball.collides_with_list(self.side_wall_sprites)
-                    and ball.side_wall_collision_counter == 0):
-                ball.change_x = ball.change_x * -1
-                ball.side_wall_collision_counter = 20
-
-            if (ball.collides_with_list(self.top_wall_sprites)
-                    and ball.top_wall_collision_counter == 0):
-                ball.change_y = ball.change_y * -1
-                ball.top_wall_collision_counter = 20
-
-            if (ball.collides_with_sprite(self.player)
-                    and ball.player_collision_counter == 0):
-                ball.player_collision_counter = 20
-                ball.collides_with_player()
-                arcade.play_sound(self.player_sound)
-
-            pup = self.player.collides_with_list(self.power_ups)
-            if pup:
-                pup[0].remove_from_sprite_lists()
-                if pup[0].type == PowerUpType.EXTRA:
-                    self.add_life()
-                elif pup[0].type == PowerUpType.DISRUPT:
-                    new_ball = ball.copy()
-                    new_ball.change_x = new_ball.change_x * 0.90
-                    self.balls.append(new_ball)
-                    self.all_sprites.append(new_ball)
-                pup[0].on_collide(self.player, ball)
-
-            if ball.top <= 0:
-                ball.remove_from_sprite_lists()
-
-        if self.level_completed():
-            self.setup(self.level + 1)
-
-        if len(self.balls) <= 0:
-            if len(self.extra_lives) == 0:
+        for _ in range(self.timestep.advance(delta_time)):
+            if self.replay:
+                self.replay.feed()
+            elif self.controller:
+                self.controller.update(self.simulation, self.input)
+            self.remember_positions()
+            with self.profiler.phase('step'):
+                self.simulation.step(self.timestep.step_time)
+
+            self.mixer.add(self.simulation.sound_events)
+
+            if self.simulation.game_over:
                 print('Game Over')
                 arcade.close_window()
-            else:
-                self.lives = self.lives - 1
-                self.extra_lives.pop()
-                ball = Ball('images/ball.png', SCALING, self.player)
-                ball.set_ball()
-                self.balls.append(ball)
-                self.all_sprites.append(ball)
-                self.player.clear_power_up()
-
-    def level_completed(self):
-        """Check if the level has been completed.
-
-        If the number of bricks is 0, the level has been completed. If the
-        only remaining bricks are gold, the level is completed.
-
-        If the player received breakout power up, check to see if the player
-        sprite moved beyond the right wall boundary.
-
-        Returns:
-            bool -- True if level is completed. False otherwise.
+                break
 
-        """
-        if self.player.left >= self.width and self.player.break_out:
-            self.score = self.score + 10000
-            return True
-        if len(self.bricks) == 0:
-            return True
-        for brick in self.bricks:
-            if brick.type != 9:
-                return False
-        return True
-
-    def add_life(self):
-        self.lives = self.lives + 1
-        life = arcade.Sprite('images/player_life.png', SCALING)
-        life.bottom = 10
-        life.left = WALL_WIDTH + (30 * (self.lives - 1))
-        self.extra_lives.append(life)
-        self.all_sprites.append(life)
-
-    def shoot_lasers(self):
-        left_laser = Laser(Side.LEFT, self.player)
-        right_laser = Laser(Side.RIGHT, self.player)
-        self.lasers.append(left_laser)
-        self.lasers.append(right_laser)
-        self.all_sprites.append(left_laser)
-        self.all_sprites.append(right_laser)
-
-    def drop_power_up(self, brick):
-        """Create a new random power up.
-
-        The power up is created where the brick sprite was located. A new
-        pup_counter value is randomly assigned for the next power up.
-
-        Arguments:
-            brick -- The brick the power up is spawning from.
-        """
-        new_pup = PowerUp(brick.center_x, brick.center_y)
-        self.power_ups.append(new_pup)
-        self.pup_counter = random.randrange(3, 8)
+        with self.profiler.phase('sounds'):
+            self.mixer.flush()
+            if not self.first_frame:
+                self.mixer.load_next()
 
     def on_draw(self):
-        """Draw all game objects."""
+        """Draw all game objects, part way between the last two steps."""
+        profiler = self.profiler
+        with profiler.phase('sync'):
+            if self.simulation.level != self.drawn_level:
+                self.sync_new_level()
+            else:
+                self.sync_sprites(self.timestep.alpha)
+                self.prepare_next_level()
+
         arcade.start_render()  # Needs to be called before drawing
-        self.top_wall_sprites.draw()
-        if not self.player.break_out:
-            self.break_out_wall.draw()
-        self.side_wall_sprites.draw()
-        self.extra_lives.draw()
-        self.power_ups.draw()
-        self.bricks.draw()
-        self.lasers.draw()
-        self.player.draw()
-        self.balls.draw()
-
-        # Display score
-        arcade.draw_text(f'Score: {self.score}',
-                         50,
-                         SCREEN_HEIGHT - 30,
-                         arcade.color.BLACK,
-                         12)
-
-        # Display Level
-        arcade.draw_text(f'Level: {self.level}',
-                         SCREEN_WIDTH - 100,
-                         SCREEN_HEIGHT - 30,
-                         arcade.color.BLACK,
-                         12)
+        with profiler.phase('draw'):
+            self.static.draw()
+            self.power_ups.draw()
+            self.bricks.draw()
+            self.lasers.draw()
+            self.player.draw()
+            self.balls.draw()
+            self.hud.draw()
+
+        if self.show_profile:
+            for i, line in enumerate(self.profile_lines()):
+                arcade.draw_text(line,
+                                 WALL_WIDTH + 10,
+                                 SCREEN_HEIGHT - 60 - 14 * i,
+                                 arcade.color.BLACK,
+                                 10,
+                                 font_name='courier')
+        profiler.end_frame()
+
+        if self.first_frame:
+            self.first_frame = False
+            self.on_first_frame()
+
+    def on_first_frame(self):
+        """Stream in the images the first frame did not need.
+
+        The paddle's next animation frames are wanted soonest, so they go
+        first. The mixer loads the sounds on the main thread meanwhile.
+        When profiling startup, report it and quit instead.
+        """
+        if self.startup:
+            self.startup.mark('first frame')
+            for line in self.startup.report(assets.load_times):
+                print(line)
+            self.close()
+            return
+        assets.preload(background=True,
+                       first=self.simulation.player.anim_textures)
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=SCREEN_TITLE)
+    parser.add_argument('--seed', type=parse_seed,
+                        help='random seed for the game')
+    parser.add_argument('--record', metavar='FILE',
+                        help='save a replay of the game to FILE on exit')
+    parser.add_argument('--replay', metavar='FILE',
+                        help='play back a replay saved with --record')
+    parser.add_argument('--autopilot', action='store_true',
+                        help='let the autopilot move the paddle')
+    parser.add_argument('--profile', metavar='FILE',
+                        help='time every frame and write a Chrome trace '
+                             'to FILE on exit')
+    parser.add_argument('--endless', action='store_true',
+                        help='play generated levels that never run out')
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='report the time to the first frame by '
+                             'stage, asset and import, then quit')
+    args = parser.parse_args()
+
+    startup_profile = None
+    if args.profile_startup:
+        import startup
+        if not startup.timing_imports():
+            sys.exit(startup.run_profiled(sys.argv))
+        startup_profile = startup.StartupProfile()
+
+    # Only what the first frame shows is loaded before it, the rest is
+    # streamed in once it is up
+    assets.index()
+    if startup_profile:
+        startup_profile.mark('index assets')
+
+    recording = Recording.load(args.replay) if args.replay else None
     brick_breaker = BrickBreaker(
-        int(SCREEN_WIDTH * SCALING), int(SCREEN_HEIGHT * SCALING), SCREEN_TITLE
+        int(SCREEN_WIDTH * SCALING), int(SCREEN_HEIGHT * SCALING), SCREEN_TITLE,
+        seed=args.seed, recording=recording,
+        controller=Autopilot(args.seed) if args.autopilot else None,
+        profile=bool(args.profile), endless=args.endless,
+        startup=startup_profile
     )
-    brick_breaker.setup(level=1)
+    if startup_profile:
+        startup_profile.mark('window, walls and level source')
+    brick_breaker.setup(level=recording.level if recording else 1)
+    if startup_profile:
+        startup_profile.mark('setup')
     arcade.run()
+
+    brick_breaker.simulation.levels.close()
+    if args.record:
+        brick_breaker.recording.save(args.record)
+    if args.profile:
+        brick_breaker.profiler.save_trace(args.profile)
@@ -0,0 +1,157 @@
+"""Run brick breaker simulations without a window.
+
+Steps a Simulation as fast as the CPU allows and reports how far the game
+got and how many steps per second were reached.
+
+    $ python headless.py --level 1 --steps 100000
+
+With --endless, generated levels are played instead of the level files,
+so there is always a next level.
+
+With --soak, autopilot games are played back to back for as long as
+--steps allows, each on the level after the one the last ended on,
+reporting step times and live object counts as it goes so slow creep and
+leaks show up:
+
+    $ python headless.py --soak --steps 1000000
+"""
+import argparse
+import gc
+import time
+
+import numpy as np
+
+from player import Action, Autopilot
+from simulation import Simulation
+
+# Steps between soak reports, a minute of play at 60Hz
+SOAK_REPORT_STEPS = 3600
+# Steps a soak game may go without scoring before the next one starts,
+# five minutes of play at 60Hz
+SOAK_STALL_STEPS = 18000
+
+
+def run(level=1, steps=10000, delta_time=1/60, seed=None, controller=None,
+        endless=False):
+    """Play a game headlessly.
+
+    Without a controller the ball is relaunched whenever it is stuck and
+    the paddle never moves.
+
+    Arguments:
+        level {int} -- The level to start on
+        steps {int} -- Maximum number of steps to run
+        delta_time {float} -- Simulated time per step
+        seed {int} -- Random seed for the game
+        controller {Controller} -- Plays the game
+        endless {bool} -- Play generated levels
+
+    Returns:
+        (Simulation, int) -- The finished simulation and the steps taken
+
+    """
+    simulation = Simulation(seed, endless)
+    simulation.setup(level)
+    step = 0
+    while step < steps and not simulation.game_over:
+        if controller:
+            controller.update(simulation, simulation)
+        elif simulation.balls and simulation.balls[0].stuck_on[0]:
+            simulation.on_action_press(Action.SHOOT)
+        simulation.step(delta_time)
+        step += 1
+    return simulation, step
+
+
+def soak(steps, delta_time=1/60, seed=0, report_steps=SOAK_REPORT_STEPS,
+         endless=False, stall_steps=SOAK_STALL_STEPS):
+    """Play autopilot games back to back and report how each stretch went.
+
+    The autopilot clears most levels, but it still loses some games, and
+    can keep a ball bouncing between gold bricks without ever scoring. So
+    a game also ends once it has gone stall_steps without scoring, and
+    each game starts on the level after the one the last game ended on,
+    which is how a long run reaches every level.
+
+    Arguments:
+        steps {int} -- Total steps to run
+        delta_time {float} -- Simulated time per step
+        seed {int} -- Seed of the first game. Each new game adds one.
+        report_steps {int} -- Steps between reports
+        endless {bool} -- Play generated levels
+        stall_steps {int} -- Steps a game may go without scoring
+    """
+    games = 0
+    level = 1
+    simulation = None
+    score = scored = 0
+    timings = []
+    baseline = None
+    for step in range(1, steps + 1):
+        if (simulation is None or simulation.game_over
+                or step - scored > stall_steps):
+            if simulation is not None:
+                level = simulation.next_level()
+            simulation = Simulation(seed + games, endless)
+            simulation.setup(level)
+            autopilot = Autopilot(seed + games)
+            games += 1
+            score = simulation.score
+            scored = step
+        elif simulation.score != score:
+            score = simulation.score
+            scored = step
+
+        start = time.perf_counter()
+        autopilot.update(simulation, simulation)
+        simulation.step(delta_time)
+        timings.append(time.perf_counter() - start)
+
+        if step % report_steps == 0 or step == steps:
+            # Collect first so only objects that are really kept count
+            gc.collect()
+            objects = len(gc.get_objects())
+            if baseline is None:
+                baseline = objects
+            p50, p99 = np.percentile(timings, (50, 99)) * 1000
+            print(f'{step:>9} steps  game {games:<4} level '
+                  f'{simulation.level}  step p50 {p50:.3f}ms '
+                  f'p99 {p99:.3f}ms max {max(timings) * 1000:.3f}ms  '
+                  f'objects {objects} ({objects - baseline:+d})')
+            timings = []
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--level', type=int, default=1)
+    parser.add_argument('--steps', type=int, default=10000)
+    parser.add_argument('--dt', type=float, default=1/60,
+                        help='simulated seconds per step')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--autopilot', action='store_true',
+                        help='let the autopilot move the paddle')
+    parser.add_argument('--soak', action='store_true',
+                        help='play autopilot games back to back, '
+                             'reporting step times and object counts')
+    parser.add_argument('--endless', action='store_true',
+                        help='play generated levels instead of the files')
+    args = parser.parse_args()
+
+    if args.soak:
+        soak(args.steps, args.dt, args.seed or 0, endless=args.endless)
+        return
+
+    controller = Autopilot(args.seed) if args.autopilot else None
+    start = time.perf_counter()
+    simulation, steps = run(args.level, args.steps, args.dt, args.seed,
+                            controller, args.endless)
+    elapsed = time.perf_counter() - start
+
+    print(f'Steps: {steps} in {elapsed:.3f}s '
+          f'({steps / elapsed:.0f} steps/s)')
+    print(f'Level: {simulation.level} Score: {simulation.score} '
+          f'Lives: {simulation.lives} Game over: {simulation.game_over}')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""The score, level and lives display, kept as one SpriteList.
+
+arcade.draw_text lays out and rasterises its text on every call. The Hud
+instead renders the labels and each digit into a texture once, spells
+out the score and level with sprites of those glyphs, and only touches
+them when a number changes. The extra lives share the same SpriteList,
+so the whole HUD is a single draw.
+"""
+import math
+
+import arcade
+from PIL import Image, ImageDraw, ImageFont
+
+from assets import assets
+from constants import SCREEN_WIDTH, SCREEN_HEIGHT, SCALING, WALL_WIDTH
+
+# Tried in order, Pillow's built in font is used if none are installed
+HUD_FONTS = ('arial.ttf', 'Arial.ttf', 'DejaVuSans.ttf')
+HUD_FONT_SIZE = 12
+HUD_COLOR = arcade.color.BLACK
+
+
+def load_font(size=HUD_FONT_SIZE):
+    for name in HUD_FONTS:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            pass
+    return ImageFont.load_default(size)
+
+
+def render_text(text, font):
+    """Rasterise a piece of text into a texture.
+
+    Arguments:
+        text {str} -- The text to render
+        font {ImageFont} -- The font to render it in
+
+    Returns:
+        arcade.Texture -- The text, on a transparent background
+
+    """
+    ascent, descent = font.getmetrics()
+    width = max(1, math.ceil(font.getlength(text)))
+    image = Image.new('RGBA', (width, ascent + descent))
+    ImageDraw.Draw(image).text((0, 0), text, font=font, fill=HUD_COLOR)
+    return arcade.Texture(f'hud:{text}', image)
+
+
+class Readout:
+    """A label followed by a number, spelled out with glyph sprites."""
+
+    def __init__(self, sprite_list, label, left, bottom, font, glyphs):
+        """Initialize the readout.
+
+        Arguments:
+            sprite_list {arcade.SpriteList} -- Where the sprites are drawn
+            label {str} -- Text in front of the number
+            left {float} -- Left edge of the label
+            bottom {float} -- Bottom edge of the text
+            font {ImageFont} -- Font to render the label in
+            glyphs {{str: arcade.Texture}} -- Texture of each digit
+        """
+        self.sprite_list = sprite_list
+        self.glyphs = glyphs
+        self.bottom = bottom
+        self.value = None
+        self.digits = []
+
+        self.label = arcade.Sprite()
+        self.label.texture = render_text(label, font)
+        self.label.left = left
+        self.label.bottom = bottom
+        sprite_list.append(self.label)
+
+    def set(self, value):
+        """Show a new number, if it changed.
+
+        Arguments:
+            value {int} -- The number to show
+        """
+        if value == self.value:
+            return
+        self.value = value
+
+        text = str(value)
+        while len(self.digits) < len(text):
+            digit = arcade.Sprite()
+            self.digits.append(digit)
+            self.sprite_list.append(digit)
+        while len(self.digits) > len(text):
+            self.digits.pop().remove_from_sprite_lists()
+
+        left = self.label.right
+        for digit, character in zip(self.digits, text):
+            digit.texture = self.glyphs[character]
+            digit.left = left
+            digit.bottom = self.bottom
+            left = digit.right
+
+
+class Hud:
+    """Score, level and extra lives, drawn as one SpriteList."""
+
+    def __init__(self):
+        self.sprite_list = arcade.SpriteList()
+        font = load_font()
+        glyphs = {digit: render_text(digit, font) for digit in '0123456789'}
+        self.score = Readout(self.sprite_list, 'Score: ', 50,
+                             SCREEN_HEIGHT - 30, font, glyphs)
+        self.level = Readout(self.sprite_list, 'Level: ', SCREEN_WIDTH - 100,
+                             SCREEN_HEIGHT - 30, font, glyphs)
+        self.lives = []
+
+    def update(self, score, level, lives):
+        """Bring the HUD up to date, changing only what differs.
+
+        Arguments:
+            score {int} -- The player's score
+            level {int} -- The current level
+            lives {int} -- Extra lives left
+        """
+        self.score.set(score)
+        self.level.set(level)
+
+        while len(self.lives) < lives:
+            life = arcade.Sprite(scale=SCALING)
+            life.texture = assets.texture('images/player_life.png')
+            life.bottom = 10
+            life.left = WALL_WIDTH + (30 * len(self.lives))
+            self.lives.append(life)
+            self.sprite_list.append(life)
+        while len(self.lives) > lives:
+            self.lives.pop().remove_from_sprite_lists()
+
+    def draw(self):
+        self.sprite_list.draw()
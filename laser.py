@@ -1,21 +1,32 @@
-import arcade
-
 from enum import Enum
 
+from body import Body
 from constants import SCALING
 
+LASER_WIDTH = 2
+LASER_HEIGHT = 20
+LASER_SPEED = 300
+
 
 class Side(Enum):
     LEFT = 'left'
     RIGHT = 'right'
 
 
-class Laser(arcade.Sprite):
+class Laser(Body):
 
     def __init__(self, side, player):
         """Initialize the Laser sprite."""
-        super().__init__(f'images/laser.png', SCALING)
+        super().__init__('images/laser.png', LASER_WIDTH, LASER_HEIGHT, SCALING)
+        self.reset(side, player)
+
+    def reset(self, side, player):
+        """Place the laser at one of the player's guns, ready to fire.
 
+        Arguments:
+            side {Side} -- Which gun the laser leaves from
+            player {Player} -- The player firing the laser
+        """
         self.bottom = player.bottom
 
         if side == Side.LEFT:
@@ -23,7 +34,7 @@ class Laser(arcade.Sprite):
         elif side == Side.RIGHT:
             self.center_x = player.right - player.width / 4
 
-        self.change_y = 300
+        self.change_y = LASER_SPEED
 
     def on_update(self, delta_time: float):
         self.center_y = self.center_y + self.change_y * delta_time
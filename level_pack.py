@@ -0,0 +1,257 @@
+"""Compile level maps into one binary level pack, and load levels fast.
+
+A level pack holds every level as a grid of ready made brick type codes,
+one byte per cell, behind a small index. The pack is memory-mapped, so
+opening it only reads the index and loading a level is a copy of its
+cells, however many levels the pack holds.
+
+    $ python level_pack.py
+
+compiles levels/level_*.csv into levels/levels.pack. Run it again after
+changing or adding a level. Until then the game sees that the pack was
+built from different CSV files and reads those instead. The pack records
+a digest of the files' contents rather than relying on modification
+times, which a git checkout does not keep. Each process only digests the
+files once, and again if the pack or the level directory changes. A pack
+shipped without its CSV files is used as it is.
+
+Layout, little endian:
+
+    header  magic b'BBLP', version u8, level count u32, source digest
+            of DIGEST_SIZE bytes
+    index   per level: level number u32, rows u16, columns u16, offset u64
+    cells   rows x columns u8 per level, row by row, 255 for no brick
+"""
+import argparse
+import glob
+import hashlib
+import os
+import re
+import struct
+
+import numpy as np
+
+from brick_field import map_types
+from constants import LEVEL_DIR, LEVEL_PACK
+
+MAGIC = b'BBLP'
+VERSION = 2
+
+# Bytes of the digest of the csv files a pack was built from
+DIGEST_SIZE = 16
+
+# Magic, version, level count, source digest
+HEADER = struct.Struct(f'<4sBI{DIGEST_SIZE}s')
+
+# Level number, rows, columns, offset of the cells from the file start
+ENTRY = struct.Struct('<IHHQ')
+
+
+def read_level_map(filename):
+    """Read a level map from a csv file.
+
+    Arguments:
+        filename {str} -- Path of the csv file
+
+    Returns:
+        map_array {[[str]]} -- A 2D array representing the brick pattern
+
+    """
+    with open(filename) as map_file:
+        map_array = []
+        for line in map_file:
+            line = line.strip()
+            map_row = line.split(',')
+            map_array.append(map_row)
+    return map_array
+
+
+class LevelFiles:
+    """Levels read from the csv files in a directory."""
+
+    def __init__(self, directory=LEVEL_DIR):
+        self.directory = directory
+
+    def filename(self, level):
+        return f'{self.directory}/level_{level}.csv'
+
+    def __contains__(self, level):
+        return os.path.exists(self.filename(level))
+
+    def numbers(self):
+        """Every level number with a file, in order."""
+        names = glob.glob(f'{self.directory}/level_*.csv')
+        return sorted(int(re.search(r'level_(\d+)\.csv$', name).group(1))
+                      for name in names)
+
+    def map(self, level):
+        return read_level_map(self.filename(level))
+
+    def digest(self):
+        """Digest of every level file's number and contents.
+
+        Returns:
+            bytes -- DIGEST_SIZE bytes, the same for the same levels
+        """
+        digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+        for level in self.numbers():
+            with open(self.filename(level), 'rb') as level_file:
+                contents = level_file.read()
+            digest.update(struct.pack('<IQ', level, len(contents)))
+            digest.update(contents)
+        return digest.digest()
+
+    def prefetch(self, level):
+        """Do nothing. Wrap in a prefetch.LevelPrefetcher to read ahead."""
+
+    def types(self, level):
+        """Get the brick type codes of a level.
+
+        Arguments:
+            level {int} -- The level number
+
+        Returns:
+            np.ndarray -- Brick type per cell, EMPTY for none
+
+        """
+        return map_types(self.map(level))
+
+
+class LevelPack:
+    """Levels read from a compiled, memory-mapped level pack."""
+
+    def __init__(self, filename=LEVEL_PACK):
+        """Open a level pack.
+
+        Arguments:
+            filename {str} -- Path of the pack
+
+        Raises:
+            ValueError -- If the file is not a level pack
+        """
+        self.filename = filename
+        self.data = np.memmap(filename, dtype=np.uint8, mode='r')
+        magic, version, count, self.digest = HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{filename} is not a brick breaker level pack')
+        self.index = {}
+        for level, rows, cols, offset in ENTRY.iter_unpack(
+                self.data[HEADER.size:HEADER.size + ENTRY.size * count]):
+            self.index[level] = (rows, cols, offset)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, level):
+        return level in self.index
+
+    def numbers(self):
+        """Every level number in the pack, in order."""
+        return sorted(self.index)
+
+    def prefetch(self, level):
+        """Do nothing, reading a level from the pack is already cheap."""
+
+    def types(self, level):
+        """Get the brick type codes of a level.
+
+        Arguments:
+            level {int} -- The level number
+
+        Returns:
+            np.ndarray -- Brick type per cell, EMPTY for none
+
+        """
+        rows, cols, offset = self.index[level]
+        cells = self.data[offset:offset + rows * cols]
+        # 255 read as a signed byte is -1, which is EMPTY
+        return cells.view(np.int8).reshape(rows, cols).copy()
+
+
+def write_pack(levels, filename=LEVEL_PACK, digest=bytes(DIGEST_SIZE)):
+    """Write levels to a level pack.
+
+    Arguments:
+        levels {{int: np.ndarray}} -- Brick type codes of each level
+        filename {str} -- Where to write the pack
+        digest {bytes} -- LevelFiles.digest of the files the levels came
+                          from
+    """
+    numbers = sorted(levels)
+    offset = HEADER.size + ENTRY.size * len(numbers)
+    index = []
+    for level in numbers:
+        rows, cols = levels[level].shape
+        index.append(ENTRY.pack(level, rows, cols, offset))
+        offset += rows * cols
+
+    with open(filename, 'wb') as pack_file:
+        pack_file.write(HEADER.pack(MAGIC, VERSION, len(numbers), digest))
+        pack_file.write(b''.join(index))
+        for level in numbers:
+            types = np.ascontiguousarray(levels[level], dtype=np.int8)
+            pack_file.write(types.view(np.uint8).tobytes())
+
+
+# Whether a pack matched its csv files, by their paths and modification
+# times, so a process digests the files once however many games it opens
+verdicts = {}
+
+
+def modified(path):
+    """Modification time of a path in nanoseconds, None if it is missing."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def open_levels(directory=LEVEL_DIR, pack=LEVEL_PACK):
+    """Pick the fastest up to date source of levels.
+
+    Whether the pack is up to date is only worked out again once the pack
+    or the directory of csv files has been modified since.
+
+    Arguments:
+        directory {str} -- Directory of the csv level files
+        pack {str} -- Path of the compiled level pack
+
+    Returns:
+        LevelPack or LevelFiles -- The pack, unless it is missing, of an
+                                   older format or built from other csv
+                                   files. With no csv files at all the
+                                   pack is used as it is
+
+    """
+    files = LevelFiles(directory)
+    if not os.path.exists(pack):
+        return files
+    try:
+        levels = LevelPack(pack)
+    except ValueError:
+        return files
+    key = (os.path.abspath(directory), os.path.abspath(pack),
+           modified(directory), modified(pack))
+    if key not in verdicts:
+        verdicts[key] = (not files.numbers()
+                         or levels.digest == files.digest())
+    return levels if verdicts[key] else files
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--levels', default=LEVEL_DIR,
+                        help='directory of level_N.csv files')
+    parser.add_argument('--out', default=LEVEL_PACK,
+                        help='where to write the pack')
+    args = parser.parse_args()
+
+    files = LevelFiles(args.levels)
+    levels = {level: files.types(level) for level in files.numbers()}
+    write_pack(levels, args.out, files.digest())
+    print(f'Packed {len(levels)} levels into {args.out} '
+          f'({os.path.getsize(args.out)} bytes)')
+
+
+if __name__ == "__main__":
+    main()
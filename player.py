@@ -1,81 +1,119 @@
-import arcade
+import math
+import random
+from abc import ABC, abstractmethod
+from enum import Enum
 
+from body import Body
+from brick import BRICK_WIDTH, BRICK_HEIGHT, GRID_LEFT, GRID_TOP, GOLD
 from constants import SCREEN_WIDTH, WALL_WIDTH
 from power_up import PowerUpType
+from utils import Vector, reflect
 
 MOVEMENT_SPEED = 250
 UPDATES_PER_FRAME = 20
+PLAYER_WIDTH = 56
+PLAYER_ENLARGED_WIDTH = 76
+PLAYER_HEIGHT = 15
 
+# Height of the paddle's center, where it always stays
+PLAYER_Y = 50
 
-class Player(arcade.Sprite):
+# How far off its target the autopilot lets the paddle sit
+AUTOPILOT_DEAD_ZONE = 4
+
+# Share of its speed the autopilot tries to send a ball sideways with.
+# Much flatter and the paddle cannot keep up with the ball, and a ball
+# sent straight up can bounce up and down the same column forever.
+AUTOPILOT_SIDEWAYS = 0.4
+
+# Most of its speed a ball the paddle can keep up with goes sideways
+AUTOPILOT_MAX_SIDEWAYS = 0.6
+
+# Chance the autopilot sends a ball straight up instead, to reach the
+# bricks its usual angles keep missing
+AUTOPILOT_STRAIGHT = 0.2
+
+# Catches in a row that score nothing before the autopilot stops
+# trusting its aim and picks any safe catch, to get out of a loop
+AUTOPILOT_PATIENCE = 8
+
+# Pixels per move, and most moves, when the autopilot follows a shot's
+# path through the bricks
+TRACE_STEP = 4
+TRACE_STEPS = 600
+
+
+class Action(Enum):
+    LEFT = 'left'
+    RIGHT = 'right'
+    SHOOT = 'shoot'
+    PAUSE = 'pause'
+
+
+class Player(Body):
     LEFT = 1
     CENTER = 2
     RIGHT = 3
 
+    # Normal a ball reflects off for each third, to "enhance" the angle
+    NORMALS = {
+        LEFT: Vector(0.196, -0.981),
+        CENTER: Vector(0, 1),
+        RIGHT: Vector(-0.196, -0.981),
+    }
+
     current_power_up = None
 
     def __init__(self, filename, scale):
         """Initialize the Player sprite."""
-        super().__init__(filename, scale)
-
-        # Load textures
-        self.anim_textures = []
-        for i in range(1, 9):
-            texture = arcade.load_texture(f'images/Player_animated{i}.png')
-            self.anim_textures.append(texture)
-
-        self.laser_anim_textures = []
-        for i in range(1, 9):
-            texture = arcade.load_texture(f'images/Player_Laser_animated{i}.png')
-            self.laser_anim_textures.append(texture)
-
-        self.enl_anim_textures = []
-        for i in range(1, 9):
-            texture = arcade.load_texture(f'images/Player_Enl_animated{i}.png')
-            self.enl_anim_textures.append(texture)
-
-        texture = arcade.load_texture('images/player_enlarged.png')
-        self.append_texture(texture)
+        super().__init__(filename, PLAYER_WIDTH, PLAYER_HEIGHT, scale)
+        self.default_texture = filename
+
+        # Animation frame names
+        self.anim_textures = [f'images/Player_animated{i}.png'
+                              for i in range(1, 9)]
+        self.laser_anim_textures = [f'images/Player_Laser_animated{i}.png'
+                                    for i in range(1, 9)]
+        self.enl_anim_textures = [f'images/Player_Enl_animated{i}.png'
+                                  for i in range(1, 9)]
+
+        # Track the current state of what direction is held
+        self.left_pressed = False
+        self.right_pressed = False
 
-        texture = arcade.load_texture('images/player_laser.png')
-        self.append_texture(texture)
+        self.reset()
 
+    def reset(self):
+        """Put the player back in its starting state for a new level."""
+        self.clear_power_up()
         self.cur_texture = 0
 
         self.center_x = SCREEN_WIDTH / 2
-        self.center_y = 50
+        self.center_y = PLAYER_Y
 
         self.break_out = False
         self.break_out_counter = 0
 
-        # Track the current state of what key is pressed
-        self.left_pressed = False
-        self.right_pressed = False
-
-    def on_key_press(self, symbol: int, modifiers: int):
-        """Handle user keyboard input.
-
-        Arrows: Move Left or Right
+    def on_action_press(self, action):
+        """Handle a movement action starting.
 
         Arguments:
-            symbol {int} -- Which key was pressed
-            modifiers {int} -- Which modifiers were pressed
+            action {Action} -- Which action was pressed
         """
-        if symbol == arcade.key.LEFT:
+        if action == Action.LEFT:
             self.left_pressed = True
-        elif symbol == arcade.key.RIGHT:
+        elif action == Action.RIGHT:
             self.right_pressed = True
 
-    def on_key_release(self, symbol: int, modifiers: int):
-        """Undo movement vectors when movement keys are released.
+    def on_action_release(self, action):
+        """Undo movement vectors when movement actions are released.
 
         Arguments:
-            symbol {int} -- Which key was pressed
-            modifiers {int} -- Which modifiers were pressed
+            action {Action} -- Which action was released
         """
-        if symbol == arcade.key.LEFT:
+        if action == Action.LEFT:
             self.left_pressed = False
-        elif symbol == arcade.key.RIGHT:
+        elif action == Action.RIGHT:
             self.right_pressed = False
 
     def update_animation(self, delta_time: float = 1/60):
@@ -83,15 +121,26 @@ class Player(arcade.Sprite):
         if self.current_power_up == PowerUpType.LASER:
             if self.cur_texture >= (len(self.laser_anim_textures)) * UPDATES_PER_FRAME:
                 self.cur_texture = 0
-            self.texture = self.laser_anim_textures[self.cur_texture // UPDATES_PER_FRAME]
+            self.set_texture(self.laser_anim_textures[self.cur_texture // UPDATES_PER_FRAME])
         elif self.current_power_up == PowerUpType.ENLARGE:
             if self.cur_texture >= (len(self.enl_anim_textures)) * UPDATES_PER_FRAME:
                 self.cur_texture = 0
-            self.texture = self.enl_anim_textures[self.cur_texture // UPDATES_PER_FRAME]
+            self.set_texture(self.enl_anim_textures[self.cur_texture // UPDATES_PER_FRAME],
+                             PLAYER_ENLARGED_WIDTH)
         else:
             if self.cur_texture >= (len(self.anim_textures)) * UPDATES_PER_FRAME:
                 self.cur_texture = 0
-            self.texture = self.anim_textures[self.cur_texture // UPDATES_PER_FRAME]
+            self.set_texture(self.anim_textures[self.cur_texture // UPDATES_PER_FRAME])
+
+    def set_texture(self, texture, width=PLAYER_WIDTH):
+        """Switch to a texture, resizing the paddle around its center.
+
+        Arguments:
+            texture {str} -- Path of the image to show
+            width {float} -- Unscaled width of the image
+        """
+        self.texture = texture
+        self.width = width * self.scale
 
     def on_update(self, delta_time: float):
         """Update the positions and statuses of the player object.
@@ -137,7 +186,7 @@ class Player(arcade.Sprite):
             return Player.CENTER
 
     def clear_power_up(self):
-        self.set_texture(0)
+        self.set_texture(self.default_texture)
         self.current_power_up = None
 
     def set_power_up(self, pup):
@@ -148,3 +197,340 @@ class Player(arcade.Sprite):
             self.break_out = True
             # Allow breakout to last 10 seconds
             self.break_out_counter = 10
+
+
+def intercept(ball, y):
+    """Predict where a falling ball will be when its bottom reaches a line.
+
+    Bounces off the side walls are folded in. Bricks, the player and the
+    break out gap are not.
+
+    Arguments:
+        ball {Ball} -- The falling ball
+        y {float} -- Height of the line
+
+    Returns:
+        float -- The ball's center x at the line, or None if the ball is
+                 not falling
+
+    """
+    arrival = ball_arrival(ball, y)
+    return None if arrival is None else arrival[0]
+
+
+def ball_arrival(ball, y):
+    """Predict where and heading which way a falling ball reaches a line.
+
+    As intercept, with the ball's change_x once the side walls have
+    bounced it.
+
+    Arguments:
+        ball {Ball} -- The falling ball
+        y {float} -- Height of the line
+
+    Returns:
+        (float, float) -- The ball's center x and change_x at the line, or
+                          None if the ball is not falling
+
+    """
+    change_x = ball.change_x * ball.mod
+    change_y = ball.change_y * ball.mod
+    if change_y >= 0:
+        return None
+    time = max(ball.bottom - y, 0) / -change_y
+
+    low = WALL_WIDTH + ball.width / 2
+    high = SCREEN_WIDTH - WALL_WIDTH - ball.width / 2
+    span = high - low
+    x = (ball.center_x + change_x * time - low) % (2 * span)
+    if x > span:
+        return low + 2 * span - x, -ball.change_x
+    return low + x, ball.change_x
+
+
+class Controller(ABC):
+    """Plays the game in place of the keyboard.
+
+    Before each step the game loop calls update with the simulation and
+    whatever takes its actions, the simulation itself or a Recorder. The
+    controller presses and releases actions on it just like keys.
+    """
+
+    @abstractmethod
+    def update(self, simulation, actions):
+        """Press and release actions for the coming step.
+
+        Arguments:
+            simulation {Simulation} -- The game being played
+            actions -- Takes on_action_press and on_action_release calls
+        """
+
+    def steer(self, actions, player, direction):
+        """Hold the movement action for a direction and release the other.
+
+        Arguments:
+            actions -- Takes on_action_press and on_action_release calls
+            player {Player} -- The paddle
+            direction {int} -- -1 for left, 1 for right, 0 to stop
+        """
+        for action, wanted, held in (
+                (Action.LEFT, direction < 0, player.left_pressed),
+                (Action.RIGHT, direction > 0, player.right_pressed)):
+            if wanted and not held:
+                actions.on_action_press(action)
+            elif held and not wanted:
+                actions.on_action_release(action)
+
+
+class Autopilot(Controller):
+    """Moves the paddle to where the next falling ball will land.
+
+    Each catch is aimed at the third of the paddle that sends the ball
+    back towards bricks it can break, and away from the break out gap,
+    which no catch can save a ball falling into. A ball stuck to the
+    paddle is carried to where its shot does the same before it is
+    shot. Ties are broken with the autopilot's own seeded generator, so
+    a game with the same seeds plays out the same.
+    """
+
+    def __init__(self, seed=None):
+        """Initialize the autopilot.
+
+        Arguments:
+            seed {int} -- Seed for choosing where to catch the ball
+        """
+        self.random = random.Random(seed)
+        self.offset = 0
+        self.tracking = None
+        self.launch = None
+        # The score at the last catch, and catches since it last went up
+        self.score = 0
+        self.idle = 0
+
+    def update(self, simulation, actions):
+        player = simulation.player
+        balls = list(simulation.balls)
+        if not balls:
+            self.steer(actions, player, 0)
+            return
+
+        # Carry a stuck ball to its launch spot first, unless another
+        # ball needs catching
+        stuck = balls[0]
+        if stuck.stuck_on[0]:
+            if self.launch is None:
+                self.launch = self.launch_spot(stuck, player, simulation)
+            carry = self.launch - stuck.center_x
+            if (abs(carry) > AUTOPILOT_DEAD_ZONE
+                    and not any(ball.change_y < 0 for ball in balls
+                                if not ball.stuck_on[0])):
+                self.steer(actions, player, 1 if carry > 0 else -1)
+                return
+            actions.on_action_press(Action.SHOOT)
+        self.launch = None
+
+        # Go for whichever falling ball reaches the paddle first. Rising
+        # balls can come back off any brick, so just stay under the lowest
+        free = [ball for ball in balls if not ball.stuck_on[0]]
+        if not free:
+            self.steer(actions, player, 0)
+            return
+        falling = [ball for ball in free if ball.change_y < 0]
+        if falling:
+            ball = min(falling, key=lambda ball: (ball.bottom - player.top)
+                       / -ball.change_y)
+            if ball is not self.tracking:
+                self.offset = self.aim(ball, player, simulation)
+            self.tracking = ball
+            target = intercept(ball, player.top) - self.offset
+        else:
+            self.tracking = None
+            ball = min(free, key=lambda ball: ball.center_y)
+            target = ball.center_x
+
+        if target < player.center_x - AUTOPILOT_DEAD_ZONE:
+            self.steer(actions, player, -1)
+        elif target > player.center_x + AUTOPILOT_DEAD_ZONE:
+            self.steer(actions, player, 1)
+        else:
+            self.steer(actions, player, 0)
+
+    def aim(self, ball, player, simulation):
+        """Pick where along the paddle to catch a ball.
+
+        Each third of the paddle sends the ball off at a different angle.
+        Out of the catches the paddle can still reach in time, the ball's
+        way back down is followed for each, and those that would send it
+        out through the break out gap are left out. Of the rest, the
+        ones that meet a brick that can be broken go first, then the one
+        sending the ball off closest to AUTOPILOT_SIDEWAYS, or now and
+        then straight up. After AUTOPILOT_PATIENCE catches that score
+        nothing, any catch that keeps the ball in play will do. The spot
+        within the third is random, so the same shot is not played the
+        same way every time.
+
+        Arguments:
+            ball {Ball} -- The ball to catch
+            player {Player} -- The paddle
+            simulation {Simulation} -- The game, for its walls and bricks
+
+        Returns:
+            float -- Where the ball should land, relative to the paddle's
+                     center
+
+        """
+        third = player.width / 3
+        offsets = {Player.LEFT: -third, Player.CENTER: 0,
+                   Player.RIGHT: third}
+        sideways = AUTOPILOT_SIDEWAYS
+        if self.random.random() < AUTOPILOT_STRAIGHT:
+            sideways = 0
+
+        if simulation.score != self.score:
+            self.score = simulation.score
+            self.idle = 0
+        else:
+            self.idle += 1
+        restless = self.idle > AUTOPILOT_PATIENCE
+
+        landing, change_x = ball_arrival(ball, player.top)
+        time = max(ball.bottom - player.top, 0) / -(ball.change_y * ball.mod)
+        reach = MOVEMENT_SPEED * time + AUTOPILOT_DEAD_ZONE
+        low = WALL_WIDTH + player.width / 2
+        high = SCREEN_WIDTH - WALL_WIDTH - player.width / 2
+        speed = math.hypot(change_x, ball.change_y)
+
+        def cost(location):
+            target = landing - offsets[location]
+            distance = abs(target - player.center_x)
+            if not low <= target <= high or distance > reach:
+                return (2, distance)
+            v = reflect(Vector(change_x, ball.change_y),
+                        Player.NORMALS[location])
+            if v.y <= 0:
+                return (1, distance)
+            breaks, lost, back, length = self.trace(
+                simulation, landing, v.x, v.y, ball.width / 2)
+            if lost:
+                return (1, distance)
+            if restless:
+                return (0, self.random.random())
+            # Whether the paddle can get from this catch to the next
+            late = (abs(back - target) - third
+                    > MOVEMENT_SPEED * length / (speed * ball.mod))
+            flat = abs(v.x) / speed
+            return (0, late, flat > AUTOPILOT_MAX_SIDEWAYS, not breaks,
+                    abs(flat - sideways), self.random.random())
+
+        location = min(offsets, key=cost)
+        return offsets[location] + self.random.uniform(-1, 1) * third / 4
+
+    def launch_spot(self, ball, player, simulation):
+        """Pick where to carry a stuck ball to before shooting it.
+
+        The spots the paddle can carry it to are tried a brick apart,
+        nearest first, and the first whose shot meets a brick that can
+        be broken without sending the ball out through the break out gap
+        is taken.
+
+        Arguments:
+            ball {Ball} -- The stuck ball
+            player {Player} -- The paddle
+            simulation {Simulation} -- The game, for its walls and bricks
+
+        Returns:
+            float -- The ball's center x to shoot from
+        """
+        shift = ball.center_x - player.center_x
+        low = WALL_WIDTH + player.width / 2 + shift
+        high = SCREEN_WIDTH - WALL_WIDTH - player.width / 2 + shift
+        velocity = ball.shot_velocity()
+        bricks = round((high - low) / BRICK_WIDTH)
+        spots = [ball.center_x + BRICK_WIDTH * step
+                 for step in sorted(range(-bricks, bricks + 1), key=abs)]
+        for x in spots:
+            if low <= x <= high:
+                breaks, lost, _, _ = self.trace(simulation, x, velocity.x,
+                                                velocity.y, ball.width / 2)
+                if breaks and not lost:
+                    return x
+        return ball.center_x
+
+    def trace(self, simulation, x, change_x, change_y, radius):
+        """Follow a ball sent up off the paddle until it comes back down.
+
+        The walls and bricks bounce it, the bricks as whole grid cells,
+        and the paddle is taken to stay where it is. A brick the ball
+        would break is bounced off like the rest, since it comes back
+        down much the same way.
+
+        Arguments:
+            simulation {Simulation} -- The game
+            x {float} -- Where the ball leaves the paddle
+            change_x {float} -- Speed to the right it leaves with
+            change_y {float} -- Speed up it leaves with
+            radius {float} -- Half the ball's width
+
+        Returns:
+            (bool, bool, float, float) -- Whether it meets a brick that
+                                          can be broken, whether it goes
+                                          out through the break out gap,
+                                          on the way or off the next
+                                          catch, and where it comes back
+                                          down after how long a path
+
+        """
+        bricks = simulation.bricks
+        rows, cols = bricks.alive.shape
+        low = WALL_WIDTH + radius
+        high = SCREEN_WIDTH - WALL_WIDTH - radius
+        ceiling = simulation.top_walls[0].bottom - radius
+        gap_top = simulation.break_out_wall.top + radius
+        floor = simulation.player.top + radius
+        length = math.hypot(change_x, change_y)
+        dx = change_x / length * TRACE_STEP
+        dy = change_y / length * TRACE_STEP
+        y = floor
+        breaks = False
+        for moves in range(1, TRACE_STEPS + 1):
+            x += dx
+            y += dy
+            if x > high and y < gap_top:
+                return breaks, True, x, moves * TRACE_STEP
+            if x < low or x > high:
+                dx = -dx
+                x += 2 * dx
+            if y > ceiling:
+                dy = -dy
+                y += 2 * dy
+            if y < floor:
+                # Coming down to the right this close to the wall, the
+                # paddle cannot get far enough over to send it back up
+                # with its left third, and any other catch sends it on
+                # out through the gap
+                lost = dx > 0 and x > (SCREEN_WIDTH - WALL_WIDTH
+                                       - simulation.player.width * 2 / 3)
+                return breaks, lost, x, moves * TRACE_STEP
+
+            top = int((GRID_TOP - y - radius) // BRICK_HEIGHT)
+            bottom = int((GRID_TOP - y + radius) // BRICK_HEIGHT)
+            left = int((x - radius - GRID_LEFT) // BRICK_WIDTH)
+            right = int((x + radius - GRID_LEFT) // BRICK_WIDTH)
+            hit = False
+            for row in range(max(top, 0) + bricks.top_row,
+                             min(bottom + 1 + bricks.top_row, rows)):
+                for col in range(max(left, 0), min(right + 1, cols)):
+                    if bricks.alive[row, col]:
+                        hit = True
+                        breaks = breaks or bricks.types[row, col] != GOLD
+            if hit:
+                # Bounce back the way the ball came into the brick
+                x -= dx
+                y -= dy
+                if (top == int((GRID_TOP - y - radius) // BRICK_HEIGHT)
+                        and bottom == int((GRID_TOP - y + radius)
+                                          // BRICK_HEIGHT)):
+                    dx = -dx
+                else:
+                    dy = -dy
+        return breaks, False, x, TRACE_STEPS * TRACE_STEP
@@ -0,0 +1,34 @@
+class BodyPool:
+    """Bodies that have left play, kept so they can be reused.
+
+    A body taken from the pool still holds whatever state it had when it
+    was released, so callers reset it before putting it back in play.
+    """
+
+    def __init__(self, factory, size=0):
+        """Initialize the pool.
+
+        Arguments:
+            factory -- Called with no arguments to build a new body
+            size {int} -- Number of bodies to build up front
+        """
+        self.factory = factory
+        self.free = [factory() for _ in range(size)]
+
+    def __len__(self):
+        return len(self.free)
+
+    def take(self):
+        """Get a body from the pool, building one if it is empty."""
+        if self.free:
+            return self.free.pop()
+        return self.factory()
+
+    def release(self, body):
+        """Take a body out of play and keep it for reuse.
+
+        Arguments:
+            body {Body} -- The body to release
+        """
+        body.remove_from_sprite_lists()
+        self.free.append(body)
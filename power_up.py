@@ -1,9 +1,13 @@
-import arcade
 import random
 from enum import Enum
 
+from body import Body
 from constants import SCALING
 
+POWER_UP_WIDTH = 30
+POWER_UP_HEIGHT = 12
+POWER_UP_SPEED = 150
+
 
 class PowerUpType(Enum):
     CATCH = 'catch'
@@ -15,17 +19,30 @@ class PowerUpType(Enum):
     LASER = 'laser'
 
 
-class PowerUp(arcade.Sprite):
+class PowerUp(Body):
+
+    def __init__(self, x, y, type=None):
+        """Initialize the PowerUp sprite."""
+        super().__init__(None, POWER_UP_WIDTH, POWER_UP_HEIGHT, SCALING)
+        self.reset(x, y, type)
 
-    def __init__(self, x, y):
-        """Initialize the Brick sprite."""
-        self.type = random.choice(list(PowerUpType))
+    def reset(self, x, y, type=None):
+        """Start the power up falling from a given point.
 
-        super().__init__(f'images/pup_{self.type.value}.png', SCALING)
+        Arguments:
+            x {float} -- Horizontal center to fall from
+            y {float} -- Vertical center to fall from
+            type {PowerUpType} -- The power up to be. Picked at random if
+                                  not given.
+        """
+        if type is None:
+            type = random.choice(list(PowerUpType))
+        self.type = type
+        self.texture = f'images/pup_{self.type.value}.png'
 
         self.center_x = x
         self.center_y = y
-        self.change_y = -150
+        self.change_y = -POWER_UP_SPEED
 
     def on_update(self, delta_time: float):
         """Update the positions and statuses of the power up game object.
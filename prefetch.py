@@ -0,0 +1,79 @@
+"""Load the next level on a worker thread while the current one is played.
+
+A LevelPrefetcher wraps a level source, a LevelPack or LevelFiles, and
+looks the same to the simulation. Each time a level is set up the
+simulation asks for the next one to be prefetched, so by the time the
+level is cleared its bricks are already read and converted and the
+transition only swaps them in.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+
+class LevelPrefetcher:
+    """A level source that reads levels ahead of time on a worker thread."""
+
+    def __init__(self, levels):
+        """Initialize the prefetcher.
+
+        Arguments:
+            levels -- The LevelPack or LevelFiles to read levels from
+        """
+        self.levels = levels
+        self.executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='level-prefetch')
+        # Level number to the Future of its brick types
+        self.pending = {}
+
+    def __contains__(self, level):
+        return level in self.levels
+
+    def numbers(self):
+        return self.levels.numbers()
+
+    def prefetch(self, level):
+        """Start reading a level in the background.
+
+        Arguments:
+            level {int} -- The level number
+        """
+        if level not in self.pending:
+            self.pending[level] = self.executor.submit(self.levels.types,
+                                                       level)
+
+    def peek(self, level):
+        """Get a prefetched level's brick types if they are ready.
+
+        Arguments:
+            level {int} -- The level number
+
+        Returns:
+            np.ndarray -- Brick type per cell, or None if the level is not
+                          prefetched or not read yet
+
+        """
+        future = self.pending.get(level)
+        if future is None or not future.done():
+            return None
+        return future.result()
+
+    def types(self, level):
+        """Get the brick types of a level, prefetched if possible.
+
+        Waits for a prefetch still in progress, and reads the level on
+        the spot if it was never prefetched.
+
+        Arguments:
+            level {int} -- The level number
+
+        Returns:
+            np.ndarray -- Brick type per cell, EMPTY for none
+
+        """
+        future = self.pending.pop(level, None)
+        if future is None:
+            return self.levels.types(level)
+        return future.result()
+
+    def close(self):
+        """Stop the worker thread once it is idle."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
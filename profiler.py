@@ -0,0 +1,158 @@
+"""Time the phases of every frame and keep the recent history.
+
+Profiling is opt-in. Code marks out its phases with
+
+    with profiler.phase('balls'):
+        ...
+
+and the game calls end_frame once per drawn frame. The totals for the
+last FRAME_HISTORY frames are kept in a ring buffer to take percentiles
+from, and every phase is also logged as a Chrome trace event, which
+save_trace writes out for chrome://tracing or https://ui.perfetto.dev.
+
+NULL_PROFILER does nothing, and is what the game and the simulation use
+until profiling is switched on.
+"""
+import contextlib
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+# Ten seconds of frames at 60fps
+FRAME_HISTORY = 600
+
+# Newest trace events kept for the trace file
+TRACE_LIMIT = 200000
+
+
+class Phase:
+    """Times one named phase each time its block runs."""
+
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.profiler.record(self.name, self.start, time.perf_counter())
+
+
+class Profiler:
+    """Collects phase timings per frame in a ring buffer and a trace log."""
+
+    def __init__(self, history=FRAME_HISTORY, trace_limit=TRACE_LIMIT):
+        """Initialize the profiler.
+
+        Arguments:
+            history {int} -- Frames to keep timings for
+            trace_limit {int} -- Newest trace events to keep
+        """
+        self.history = history
+        self.frames = 0
+        self.phases = {}
+        # Seconds spent in each phase, one slot per frame
+        self.samples = {'frame': np.zeros(history)}
+        self.current = {}
+        self.trace = deque(maxlen=trace_limit)
+        self.origin = time.perf_counter()
+        self.frame_start = self.origin
+
+    def phase(self, name):
+        """Get the context manager that times a phase.
+
+        Arguments:
+            name {str} -- Name of the phase
+
+        Returns:
+            Phase -- Times the block it guards
+
+        """
+        phase = self.phases.get(name)
+        if phase is None:
+            phase = self.phases[name] = Phase(self, name)
+            self.samples[name] = np.zeros(self.history)
+        return phase
+
+    def record(self, name, start, end):
+        self.current[name] = self.current.get(name, 0.0) + end - start
+        self.trace.append((name, start, end))
+
+    def end_frame(self):
+        """Close the current frame and store its timings."""
+        now = time.perf_counter()
+        self.trace.append(('frame', self.frame_start, now))
+        slot = self.frames % self.history
+        for name, samples in self.samples.items():
+            samples[slot] = self.current.get(name, 0.0)
+        self.samples['frame'][slot] = now - self.frame_start
+        self.current = {}
+        self.frame_start = now
+        self.frames += 1
+
+    def percentiles(self, name, q=(50, 95, 99)):
+        """Find percentiles of a phase over the frames kept.
+
+        Arguments:
+            name {str} -- Name of the phase, or 'frame' for whole frames
+            q {(float)} -- Percentiles to find
+
+        Returns:
+            np.ndarray -- The percentiles in milliseconds
+
+        """
+        filled = min(self.frames, self.history)
+        if filled == 0:
+            return np.zeros(len(q))
+        return np.percentile(self.samples[name][:filled], q) * 1000
+
+    def report(self):
+        """Lines of p50/p95/p99 timings, whole frames first.
+
+        Returns:
+            [str] -- A heading, then one line per phase
+
+        """
+        names = ['frame', *sorted(self.phases)]
+        width = max(len(name) for name in names)
+        lines = [f'{"":<{width}} {"p50":>6} {"p95":>6} {"p99":>6}']
+        for name in names:
+            p50, p95, p99 = self.percentiles(name)
+            lines.append(f'{name:<{width}} {p50:6.2f} {p95:6.2f} '
+                         f'{p99:6.2f}ms')
+        return lines
+
+    def save_trace(self, filename):
+        """Write the trace log as Chrome trace event JSON.
+
+        Arguments:
+            filename {str} -- Where to write the trace
+        """
+        events = [{'name': name, 'ph': 'X', 'pid': 1, 'tid': 1,
+                   'ts': (start - self.origin) * 1e6,
+                   'dur': (end - start) * 1e6}
+                  for name, start, end in self.trace]
+        with open(filename, 'w') as trace_file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'},
+                      trace_file)
+
+
+class NullProfiler:
+    """Takes the place of a Profiler when profiling is off."""
+
+    null_phase = contextlib.nullcontext()
+
+    def phase(self, name):
+        return self.null_phase
+
+    def end_frame(self):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
@@ -0,0 +1,211 @@
+"""Record player input and play it back exactly.
+
+A recording holds the game's random seed, the starting level, the
+physics rate, whether levels are endless and every action with the step
+it happened before. Every random choice comes from the seeded generator
+and the simulation only ever moves in fixed steps, so feeding the same
+actions at the same steps gives a bit-exact copy of the original game.
+
+    $ python game.py --record run.bbr
+    $ python replay.py run.bbr --slowest 10
+
+Recordings are a small binary file: a 17 byte header followed by 5 bytes
+per action.
+"""
+import argparse
+import struct
+import time
+
+from constants import PHYSICS_HZ
+from player import Action
+from simulation import Simulation
+
+MAGIC = b'BBRP'
+VERSION = 1
+
+# Magic, version, seed, starting level, physics rate, flags
+HEADER = struct.Struct('<4sBQBHB')
+
+# Flag bits
+ENDLESS = 0x01
+
+# Step the action happened before, action code with the release flag
+EVENT = struct.Struct('<IB')
+
+ACTION_CODES = {
+    Action.LEFT: 0,
+    Action.RIGHT: 1,
+    Action.SHOOT: 2,
+    Action.PAUSE: 3,
+}
+CODE_ACTIONS = {code: action for action, code in ACTION_CODES.items()}
+RELEASE = 0x80
+
+
+def parse_seed(text):
+    """Read a --seed argument, which has to fit the header's seed field.
+
+    Arguments:
+        text {str} -- The argument as given
+
+    Returns:
+        int -- The seed
+
+    """
+    try:
+        seed = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'{text!r} is not a whole number')
+    if not 0 <= seed < 1 << 64:
+        raise argparse.ArgumentTypeError(
+            f'{seed} is not between 0 and 2**64 - 1')
+    return seed
+
+
+class Recording:
+    """The seed and the timed actions of one game."""
+
+    def __init__(self, seed, level=1, physics_hz=PHYSICS_HZ, endless=False):
+        """Initialize an empty recording.
+
+        Arguments:
+            seed {int} -- The random seed of the game
+            level {int} -- The level the game starts on
+            physics_hz {int} -- Simulation steps per second
+            endless {bool} -- Whether the game plays generated levels
+        """
+        self.seed = seed
+        self.level = level
+        self.physics_hz = physics_hz
+        self.endless = endless
+        # (step, action, pressed) in the order they happened
+        self.events = []
+
+    def to_bytes(self):
+        flags = ENDLESS if self.endless else 0
+        data = [HEADER.pack(MAGIC, VERSION, self.seed, self.level,
+                            self.physics_hz, flags)]
+        for step, action, pressed in self.events:
+            code = ACTION_CODES[action] | (0 if pressed else RELEASE)
+            data.append(EVENT.pack(step, code))
+        return b''.join(data)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, seed, level, physics_hz, flags = HEADER.unpack_from(
+            data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('Not a brick breaker recording')
+        recording = cls(seed, level, physics_hz, bool(flags & ENDLESS))
+        for step, code in EVENT.iter_unpack(data[HEADER.size:]):
+            recording.events.append((step, CODE_ACTIONS[code & ~RELEASE],
+                                     not code & RELEASE))
+        return recording
+
+    def save(self, filename):
+        with open(filename, 'wb') as recording_file:
+            recording_file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, filename):
+        with open(filename, 'rb') as recording_file:
+            return cls.from_bytes(recording_file.read())
+
+
+class Recorder:
+    """Passes actions on to a simulation and writes them to a recording."""
+
+    def __init__(self, simulation, recording):
+        self.simulation = simulation
+        self.recording = recording
+
+    def on_action_press(self, action):
+        self.recording.events.append((self.simulation.steps, action, True))
+        self.simulation.on_action_press(action)
+
+    def on_action_release(self, action):
+        self.recording.events.append((self.simulation.steps, action, False))
+        self.simulation.on_action_release(action)
+
+
+class ReplayDriver:
+    """Feeds a recording's actions to a simulation at the right steps."""
+
+    def __init__(self, simulation, recording):
+        self.simulation = simulation
+        self.recording = recording
+        self.index = 0
+
+    @property
+    def finished(self):
+        return self.index >= len(self.recording.events)
+
+    def feed(self):
+        """Apply every action due before the simulation's next step."""
+        events = self.recording.events
+        while (self.index < len(events)
+               and events[self.index][0] <= self.simulation.steps):
+            _, action, pressed = events[self.index]
+            if pressed:
+                self.simulation.on_action_press(action)
+            else:
+                self.simulation.on_action_release(action)
+            self.index += 1
+
+
+def replay(recording, steps=None):
+    """Play a recording back without a window.
+
+    Arguments:
+        recording {Recording} -- The game to play back
+        steps {int} -- Steps to run. Defaults to one past the last action.
+
+    Returns:
+        (Simulation, [float]) -- The simulation after the last step and the
+                                 wall clock time each step took
+
+    """
+    simulation = Simulation(recording.seed, recording.endless)
+    simulation.setup(recording.level)
+    driver = ReplayDriver(simulation, recording)
+    if steps is None:
+        steps = recording.events[-1][0] + 1 if recording.events else 0
+
+    step_time = 1 / recording.physics_hz
+    timings = []
+    while simulation.steps < steps and not simulation.game_over:
+        driver.feed()
+        start = time.perf_counter()
+        simulation.step(step_time)
+        timings.append(time.perf_counter() - start)
+    return simulation, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('recording')
+    parser.add_argument('--steps', type=int,
+                        help='steps to run, defaults to the last action')
+    parser.add_argument('--slowest', type=int, default=5,
+                        help='how many of the slowest steps to list')
+    args = parser.parse_args()
+
+    recording = Recording.load(args.recording)
+    simulation, timings = replay(recording, args.steps)
+
+    elapsed = sum(timings)
+    game_time = len(timings) / recording.physics_hz
+    print(f'Replayed {len(timings)} steps ({game_time:.1f}s of play) '
+          f'in {elapsed:.3f}s, {game_time / max(elapsed, 1e-9):.0f}x '
+          f'real time')
+    print(f'Level: {simulation.level} Score: {simulation.score} '
+          f'Lives: {simulation.lives} Game over: {simulation.game_over}')
+
+    slowest = sorted(range(len(timings)), key=timings.__getitem__,
+                     reverse=True)[:args.slowest]
+    for step in slowest:
+        print(f'  step {step}: {timings[step] * 1000:.3f}ms')
+
+
+if __name__ == "__main__":
+    main()
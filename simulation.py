@@ -0,0 +1,608 @@
+import random
+
+import numpy as np
+
+from constants import (SCREEN_WIDTH, SCREEN_HEIGHT, SCALING,
+                       TOP_WALL_WIDTH)
+from batch import gather, swept_boxes, body_boxes, touching
+from body import Body, BodyList
+from pool import BodyPool
+from brick_field import BrickField, FIELD_BOTTOM
+from endless import EndlessLevels
+from level_pack import LevelFiles, open_levels
+from player import Player, Action
+from ball import Ball
+from brick import Brick
+from power_up import PowerUp, PowerUpType
+from profiler import NULL_PROFILER
+from laser import Laser, Side
+
+SIDE_WALL_WIDTH = 19
+SIDE_WALL_HEIGHT = 100
+SIDE_WALL_COUNT = 8
+TOP_WALL_LENGTH = 100
+TOP_WALL_COUNT = 6
+
+# Lives in hand at the start of a game, and bricks broken before the
+# first power up drops
+STARTING_LIVES = 2
+FIRST_POWER_UP = 5
+
+# Upper bound on bounces resolved for one ball in a single step
+MAX_IMPACTS_PER_STEP = 8
+
+# Bodies built up front so play does not have to allocate them
+BALL_POOL_SIZE = 8
+LASER_POOL_SIZE = 16
+POWER_UP_POOL_SIZE = 8
+
+# Fewest moving balls or lasers worth a vectorised pass
+BATCH_MIN_BODIES = 16
+
+# Seconds between rows when a level taller than the screen scrolls
+SCROLL_INTERVAL = 0.25
+
+
+class Simulation:
+    """The complete state and rules of a game of brick breaker.
+
+    Nothing in here depends on arcade, so a simulation can be stepped
+    without a window. Sounds the game would play are collected in
+    sound_events during each step for a renderer to pick up.
+    """
+
+    def __init__(self, seed=None, endless=False):
+        """Initialize the game.
+
+        The walls, the player and the body lists are built once here and
+        kept for the whole game. setup only swaps in what a level changes.
+
+        Arguments:
+            seed {int} -- Seed for every random choice the game makes.
+                          Games with the same seed and the same inputs
+                          play out identically.
+            endless {bool} -- Play generated levels that never run out
+                              instead of the level files
+        """
+        self.seed = seed
+        self.random = random.Random(seed)
+
+        # Where level layouts come from, the compiled pack if up to date
+        self.endless = endless
+        self.levels = EndlessLevels(seed) if endless else open_levels()
+
+        # Initialize score
+        self.score = 0
+        self.lives = STARTING_LIVES
+        self.game_over = False
+        self.sound_events = []
+
+        # Number of steps taken, which is also the game clock for replays
+        self.steps = 0
+
+        # Times the phases of each step when profiling is on
+        self.profiler = NULL_PROFILER
+
+        # Running totals for balancing runs
+        self.bounces = 0
+        self.power_ups_dropped = 0
+        self.lives_lost = 0
+
+        # Initialize body lists
+        self.side_walls = BodyList()
+        self.top_walls = BodyList()
+        self.balls = BodyList()
+        self.bricks = BrickField()
+        self.power_ups = BodyList()
+        self.lasers = BodyList()
+
+        # Set up the walls
+        for i in range(SIDE_WALL_COUNT):
+            new_left_wall = Body('images/wall_left.png',
+                                 SIDE_WALL_WIDTH, SIDE_WALL_HEIGHT)
+            new_left_wall.left = 0
+            new_left_wall.bottom = i * 100
+            self.side_walls.append(new_left_wall)
+
+            new_right_wall = Body('images/wall_right.png',
+                                  SIDE_WALL_WIDTH, SIDE_WALL_HEIGHT)
+            new_right_wall.right = SCREEN_WIDTH
+            new_right_wall.bottom = i * 100
+            if i == 0:
+                self.break_out_wall = new_right_wall
+            else:
+                self.side_walls.append(new_right_wall)
+
+        for i in range(TOP_WALL_COUNT):
+            new_top_wall = Body('images/wall_top.png',
+                                TOP_WALL_LENGTH, TOP_WALL_WIDTH)
+            new_top_wall.top = SCREEN_HEIGHT
+            new_top_wall.left = i * 100
+            self.top_walls.append(new_top_wall)
+
+        # Walls never move, so their boxes are stacked once for batch tests
+        self.wall_boxes = body_boxes([*self.side_walls, *self.top_walls])
+
+        # Set up the player
+        self.player = Player('images/player.png', SCALING)
+
+        # Bodies out of play, kept for reuse
+        self.ball_pool = BodyPool(
+            lambda: Ball('images/ball.png', SCALING, self.player),
+            BALL_POOL_SIZE)
+        self.laser_pool = BodyPool(
+            lambda: Laser(Side.LEFT, self.player), LASER_POOL_SIZE)
+        self.power_up_pool = BodyPool(
+            lambda: PowerUp(0, 0, PowerUpType.CATCH), POWER_UP_POOL_SIZE)
+
+    def setup(self, level):
+        """Get the given level ready to play."""
+        self.pause = False
+
+        # Initialize level
+        self.level = level
+        self.break_out = False
+
+        # Initialize power up counter
+        self.pup_counter = FIRST_POWER_UP
+
+        # Time since a tall level last scrolled
+        self.scroll_time = 0.0
+
+        # Clear out anything still moving from the last level
+        for body_list, pool in ((self.balls, self.ball_pool),
+                                (self.power_ups, self.power_up_pool),
+                                (self.lasers, self.laser_pool)):
+            for body in body_list:
+                pool.release(body)
+
+        # Retrieve the level pattern and build the current level, then
+        # let the level source get a head start on the next one
+        self.build_level(self.levels.types(self.level))
+        self.levels.prefetch(self.next_level())
+
+        # Put the player back at the start
+        self.player.reset()
+
+        # Set up the ball
+        ball = self.ball_pool.take()
+        ball.reset()
+        self.balls.append(ball)
+
+    def next_level(self):
+        """The level after this one, going back to 1 after the last."""
+        if self.level + 1 in self.levels:
+            return self.level + 1
+        return 1
+
+    def get_level_map(self, level):
+        """Retrieve the given level map from csv file.
+
+        Arguments:
+            level {int} -- The level ID to fetch
+
+        Returns:
+            map_array {[[str]]} -- A 2D array representing the brick pattern
+
+        """
+        return LevelFiles().map(level)
+
+    def build_level(self, level_map):
+        """Build the brick pattern of a level.
+
+        Arguments:
+            level_map {np.ndarray} -- Brick type codes per cell, or a 2D
+                                      array of strings as read from csv
+        """
+        if isinstance(level_map, np.ndarray):
+            self.bricks.load_types(level_map)
+        else:
+            self.bricks.load(level_map)
+
+    def on_action_press(self, action):
+        """Handle a player action.
+
+        PAUSE: Pause/Unpause the game
+        LEFT/RIGHT: Move Left or Right
+        SHOOT: Shoot the ball from initial position
+
+        Arguments:
+            action {Action} -- Which action was pressed
+        """
+        if action == Action.PAUSE:
+            self.pause = not self.pause
+
+        if action == Action.SHOOT:
+            # Shoot the ball!
+            self.balls[0].shoot()
+            if self.player.current_power_up == PowerUpType.LASER:
+                self.shoot_lasers()
+
+        self.player.on_action_press(action)
+
+    def on_action_release(self, action):
+        """Undo movement vectors when movement actions are released.
+
+        Arguments:
+            action {Action} -- Which action was released
+        """
+        self.player.on_action_release(action)
+
+    def step(self, delta_time: float):
+        """Update the positions and statuses of all game objects.
+
+        If paused, do nothing
+        Sweep lasers and balls along their paths so fast objects and long
+        steps cannot skip past bricks, walls or the player. Update ball
+        vector on each collision. Remove bricks when collision detected
+        with ball.
+
+        Arguments:
+            delta_time {float} -- Time since the last update
+        """
+        self.sound_events = []
+        self.steps += 1
+        if self.pause or self.game_over:
+            return
+
+        profiler = self.profiler
+        with profiler.phase('player'):
+            self.player.on_update(delta_time)
+            self.player.update_animation(delta_time)
+
+        with profiler.phase('lasers'):
+            self.move_lasers(delta_time)
+        with profiler.phase('balls'):
+            self.move_balls(delta_time)
+
+        with profiler.phase('power_ups'):
+            self.move_power_ups(delta_time)
+
+        self.scroll_bricks(delta_time)
+
+        # Balls that drop below the screen, or slip out through the
+        # break out gap, are lost
+        for ball in self.balls:
+            if ball.top <= 0 or ball.left >= SCREEN_WIDTH:
+                self.ball_pool.release(ball)
+
+        with profiler.phase('level_completed'):
+            completed = self.level_completed()
+        if completed:
+            self.setup(self.next_level())
+
+        if len(self.balls) <= 0:
+            self.lives_lost += 1
+            if self.lives == 0:
+                self.game_over = True
+            else:
+                self.lives = self.lives - 1
+                ball = self.ball_pool.take()
+                ball.reset()
+                self.balls.append(ball)
+                self.player.clear_power_up()
+
+    def move_power_ups(self, delta_time):
+        """Drop every power up, collecting the ones that reach the player.
+
+        Arguments:
+            delta_time {float} -- Time to move for
+        """
+        for pup in self.power_ups:
+            if pup.time_of_impact(0, pup.change_y * delta_time, self.player):
+                self.power_up_pool.release(pup)
+                if self.balls:
+                    self.collect_power_up(pup, self.balls[0])
+            else:
+                pup.on_update(delta_time)
+                if pup.top < 0:
+                    # Missed power ups leave play once off the screen
+                    self.power_up_pool.release(pup)
+
+    def scroll_bricks(self, delta_time):
+        """Scroll a level taller than the screen down a row at a time.
+
+        The bricks move down a row every SCROLL_INTERVAL while the lowest
+        breakable ones have room below them, so no brick ever comes
+        further down than on a level that fits the screen. A scroll waits
+        while a ball or laser sits just under a brick, where the brick
+        would land on it.
+
+        Arguments:
+            delta_time {float} -- Time since the last step
+        """
+        bricks = self.bricks
+        if bricks.top_row == 0:
+            return
+        self.scroll_time += delta_time
+        if self.scroll_time < SCROLL_INTERVAL:
+            return
+        lowest = bricks.lowest_breakable()
+        if lowest is not None and lowest - Brick.height < FIELD_BOTTOM:
+            return
+        for body in (*self.balls, *self.lasers):
+            if bricks.in_box(body.left, body.right, body.bottom,
+                             body.top + Brick.height):
+                return
+        self.scroll_time = 0.0
+        bricks.scroll()
+
+    def move_lasers(self, delta_time):
+        """Move every laser for one step.
+
+        With many lasers in flight, the ones nowhere near a brick are
+        moved together in one vectorised pass.
+
+        Arguments:
+            delta_time {float} -- Time to move for
+        """
+        lasers = list(self.lasers)
+        if len(lasers) < BATCH_MIN_BODIES:
+            for laser in lasers:
+                self.move_laser(laser, delta_time)
+            return
+
+        batch = gather(lasers, delta_time)
+        busy = touching(swept_boxes(batch), self.bricks.bounds())
+        y = batch['y'] + batch['dy']
+        for laser, laser_busy, laser_y in zip(lasers, busy, y.tolist()):
+            if laser_busy:
+                self.move_laser(laser, delta_time)
+            else:
+                laser.center_y = laser_y
+                if laser.top > SCREEN_HEIGHT - TOP_WALL_WIDTH:
+                    self.laser_pool.release(laser)
+
+    def move_balls(self, delta_time):
+        """Move every ball for one step.
+
+        Stuck balls follow what they are stuck to. With many free balls,
+        the ones with no wall, brick or player near their path are moved
+        together in one vectorised pass, and only the rest are swept one
+        at a time.
+
+        Arguments:
+            delta_time {float} -- Time to move for
+        """
+        free = []
+        for ball in self.balls:
+            if ball.stuck_on[0]:
+                ball.on_update(delta_time)
+            else:
+                free.append(ball)
+
+        if len(free) < BATCH_MIN_BODIES:
+            for ball in free:
+                self.move_ball(ball, delta_time)
+            return
+
+        batch = gather(free, delta_time, speed_mod=True)
+        obstacles = np.concatenate([self.wall_boxes,
+                                    body_boxes([self.player]),
+                                    self.bricks.bounds()])
+        busy = touching(swept_boxes(batch), obstacles)
+        x = (batch['x'] + batch['dx']).tolist()
+        y = (batch['y'] + batch['dy']).tolist()
+        for ball, ball_busy, ball_x, ball_y in zip(free, busy, x, y):
+            if ball_busy:
+                self.move_ball(ball, delta_time)
+            else:
+                ball.center_x = ball_x
+                ball.center_y = ball_y
+
+    def move_laser(self, laser, delta_time):
+        """Move a laser, destroying it on the first brick in its path.
+
+        Arguments:
+            laser {Laser} -- The laser to move
+            delta_time {float} -- Time to move for
+        """
+        dy = laser.change_y * delta_time
+        bricks = self.bricks.in_box(laser.left, laser.right,
+                                    min(laser.bottom, laser.bottom + dy),
+                                    max(laser.top, laser.top + dy))
+        impact = self.first_impact(laser, 0, dy, bricks)
+        if impact:
+            self.hit_brick(impact[2])
+            self.laser_pool.release(laser)
+            return
+
+        laser.on_update(delta_time)
+        if laser.top > SCREEN_HEIGHT - TOP_WALL_WIDTH:
+            self.laser_pool.release(laser)
+
+    def move_ball(self, ball, delta_time):
+        """Move a free ball, bouncing off everything in its path.
+
+        The ball is swept along its velocity and the earliest impact is
+        resolved first. The rest of the step then continues from the point
+        of contact with the new velocity, so several bounces can happen in
+        one step and in the order they really occur.
+
+        Arguments:
+            ball {Ball} -- The ball to move
+            delta_time {float} -- Time to move for
+        """
+        time_left = delta_time
+        for _ in range(MAX_IMPACTS_PER_STEP):
+            dx, dy = ball.displacement(time_left)
+            impact = self.ball_impact(ball, dx, dy)
+            if impact is None:
+                ball.center_x = ball.center_x + dx
+                ball.center_y = ball.center_y + dy
+                return
+
+            t, normal, target = impact
+            self.bounces += 1
+            ball.center_x = ball.center_x + dx * t
+            ball.center_y = ball.center_y + dy * t
+            time_left = time_left * (1 - t)
+
+            if target is self.player:
+                ball.collides_with_player()
+                self.sound_events.append('player')
+                if ball.stuck_on[0]:
+                    return
+            elif isinstance(target, Brick):
+                ball.collides_with_brick(target, normal)
+                self.hit_brick(target)
+            else:
+                ball.collides_with_wall(normal)
+
+    def ball_impact(self, ball, dx, dy):
+        """Find the first thing a ball would hit along a displacement.
+
+        Arguments:
+            ball {Ball} -- The moving ball
+            dx {float} -- Horizontal displacement
+            dy {float} -- Vertical displacement
+
+        Returns:
+            (float, Vector, Body) -- Fraction of the displacement before
+                                     the impact, the face normal and the
+                                     body hit, or None
+
+        """
+        bricks = self.bricks.in_box(min(ball.left, ball.left + dx),
+                                    max(ball.right, ball.right + dx),
+                                    min(ball.bottom, ball.bottom + dy),
+                                    max(ball.top, ball.top + dy))
+        impact = self.first_impact(ball, dx, dy, bricks)
+        for walls in (self.side_walls, self.top_walls):
+            wall_impact = self.first_impact(ball, dx, dy, walls)
+            if wall_impact and (impact is None or wall_impact[0] < impact[0]):
+                impact = wall_impact
+
+        # The player bounces any falling ball that touches it, whichever
+        # face the ball meets
+        if dy < 0:
+            player_impact = ball.time_of_impact(dx, dy, self.player)
+            if player_impact and (impact is None
+                                  or player_impact[0] < impact[0]):
+                impact = (*player_impact, self.player)
+        return impact
+
+    def first_impact(self, body, dx, dy, targets):
+        """Find the earliest target a moving body runs into.
+
+        Targets the body is moving away from are ignored. Ties go to the
+        target listed first.
+
+        Arguments:
+            body {Body} -- The moving body
+            dx {float} -- Horizontal displacement
+            dy {float} -- Vertical displacement
+            targets -- The bodies that could be hit
+
+        Returns:
+            (float, Vector, Body) -- Fraction of the displacement before
+                                     the impact, the face normal and the
+                                     body hit, or None
+
+        """
+        # Bounds of the whole sweep, to skip targets nowhere near it
+        left = body.left + min(dx, 0)
+        right = body.right + max(dx, 0)
+        bottom = body.bottom + min(dy, 0)
+        top = body.top + max(dy, 0)
+
+        first = None
+        for target in targets:
+            if (target.right < left or target.left > right
+                    or target.top < bottom or target.bottom > top):
+                continue
+            impact = body.time_of_impact(dx, dy, target)
+            if impact is None:
+                continue
+            t, normal = impact
+            if normal.x * dx + normal.y * dy >= 0:
+                continue
+            if first is None or t < first[0]:
+                first = (t, normal, target)
+        return first
+
+    def hit_brick(self, brick):
+        """Damage a brick, scoring it and maybe dropping a power up.
+
+        Arguments:
+            brick {Brick} -- The brick that was hit
+        """
+        brick.hit()
+        if brick.type == 9 or brick.type == 8:
+            self.sound_events.append('sbrick')
+        else:
+            self.sound_events.append('brick')
+
+        # If brick reaches 0 hp, destroy brick and increase score
+        if brick.hit_points == 0:
+            if brick.type == 8:
+                self.score += (Brick.clrs[brick.type][1] * self.level)
+            else:
+                self.score += Brick.clrs[brick.type][1]
+            # If enough non-gold/silver bricks have been destroyed,
+            # drop a power up
+            if brick.type != 9 and brick.type != 8 and self.pup_counter <= 0:
+                self.drop_power_up(brick)
+            else:
+                self.pup_counter = self.pup_counter - 1
+            self.bricks.remove(brick)
+
+    def collect_power_up(self, pup, ball):
+        """Apply a power up the player caught.
+
+        Arguments:
+            pup {PowerUp} -- The power up that was caught
+            ball {Ball} -- The ball the power up applies to
+        """
+        if pup.type == PowerUpType.EXTRA:
+            self.add_life()
+        elif pup.type == PowerUpType.DISRUPT:
+            new_ball = ball.copy(self.ball_pool.take())
+            new_ball.change_x = new_ball.change_x * 0.90
+            self.balls.append(new_ball)
+        pup.on_collide(self.player, ball)
+
+    def level_completed(self):
+        """Check if the level has been completed.
+
+        If the number of bricks is 0, the level has been completed. If the
+        only remaining bricks are gold, the level is completed.
+
+        If the player received breakout power up, check to see if the player
+        sprite moved beyond the right wall boundary.
+
+        Returns:
+            bool -- True if level is completed. False otherwise.
+
+        """
+        if self.player.left >= SCREEN_WIDTH and self.player.break_out:
+            self.score = self.score + 10000
+            return True
+        return self.bricks.breakable_count == 0
+
+    def add_life(self):
+        self.lives = self.lives + 1
+
+    def shoot_lasers(self):
+        left_laser = self.laser_pool.take()
+        left_laser.reset(Side.LEFT, self.player)
+        right_laser = self.laser_pool.take()
+        right_laser.reset(Side.RIGHT, self.player)
+        self.lasers.append(left_laser)
+        self.lasers.append(right_laser)
+
+    def drop_power_up(self, brick):
+        """Create a new random power up.
+
+        The power up is created where the brick sprite was located. A new
+        pup_counter value is randomly assigned for the next power up.
+
+        Arguments:
+            brick -- The brick the power up is spawning from.
+        """
+        new_pup = self.power_up_pool.take()
+        new_pup.reset(brick.center_x, brick.center_y,
+                      self.random.choice(list(PowerUpType)))
+        self.power_ups.append(new_pup)
+        self.power_ups_dropped += 1
+        self.pup_counter = self.random.randrange(3, 8)
@@ -0,0 +1,308 @@
+"""Save a game's complete state to a small binary blob and restore it.
+
+A snapshot holds everything a Simulation needs to carry on exactly as it
+would have: the counters, the random generator, the paddle, every ball,
+power up and laser in play, and the bricks as arrays of type codes and
+hit points with a bitmask of the live cells. Restoring reuses the
+simulation's pooled bodies, so it is quick enough for quick saves,
+rolling back while hunting a bug, or forking many games off one state:
+
+    >>> data = snapshot.take(simulation)
+    >>> fork = Simulation(simulation.seed)
+    >>> snapshot.restore(fork, data)
+
+Restore into a simulation of the same kind, endless or not. The level
+source is not part of a snapshot, and an endless game's levels are made
+from its seed, so an endless snapshot only restores into a simulation
+with the same seed.
+
+    $ python snapshot.py --steps 3000 --forks 100
+
+plays an autopilot game, forks it and reports sizes and timings.
+
+Layout, little endian:
+
+    header   magic b'BBSS', version u8
+    game     seed u64, score i64, lives i32, level u32, steps u64,
+             bounces u64, power ups dropped u32, lives lost u32,
+             power up counter i32, scroll time f64, flags u8
+    random   624 + 1 u32 words of generator state, gauss f64
+    player   x, y, width f64, texture u8, animation counter i32,
+             power up u8, flags u8, break out time f64
+    counts   balls, power ups, lasers, brick rows, brick columns and
+             brick top row, u16 each
+    balls    x, y, change x, change y, speed modifier f64, power up u8,
+             stuck u8, stuck offset f64 per ball
+    pups     x, y f64, type u8 per power up
+    lasers   x, y, change y f64 per laser
+    bricks   rows x columns i8 types, then i8 hit points, then the live
+             cells packed 8 to a byte
+"""
+import argparse
+import math
+import struct
+import time
+
+import numpy as np
+
+from constants import PHYSICS_HZ
+from player import Autopilot
+from power_up import PowerUpType
+from replay import parse_seed
+from simulation import Simulation
+
+MAGIC = b'BBSS'
+VERSION = 1
+
+HEADER = struct.Struct('<4sB')
+GAME = struct.Struct('<QqiIQQIIidB')
+RANDOM = struct.Struct('<625Id')
+PLAYER = struct.Struct('<dddBiBBd')
+COUNTS = struct.Struct('<6H')
+BALL = struct.Struct('<dddddBBd')
+POWER_UP = struct.Struct('<ddB')
+LASER = struct.Struct('<ddd')
+
+# Snapshots taken to time one
+TIMING_REPEATS = 100
+
+# Game flags
+HAS_SEED = 0x01
+ENDLESS = 0x02
+GAME_OVER = 0x04
+PAUSE = 0x08
+BREAK_OUT = 0x10
+
+# Player flags
+LEFT_PRESSED = 0x01
+RIGHT_PRESSED = 0x02
+PLAYER_BREAK_OUT = 0x04
+
+# Power up codes, 0 for none
+POWER_UPS = [None, *PowerUpType]
+POWER_UP_CODES = {pup: code for code, pup in enumerate(POWER_UPS)}
+
+
+def player_textures(player):
+    return [player.default_texture, *player.anim_textures,
+            *player.laser_anim_textures, *player.enl_anim_textures]
+
+
+def take(simulation):
+    """Capture the state of a game.
+
+    Arguments:
+        simulation {Simulation} -- The game
+
+    Returns:
+        bytes -- The snapshot
+
+    """
+    flags = ((HAS_SEED if simulation.seed is not None else 0)
+             | (ENDLESS if simulation.endless else 0)
+             | (GAME_OVER if simulation.game_over else 0)
+             | (PAUSE if simulation.pause else 0)
+             | (BREAK_OUT if simulation.break_out else 0))
+    data = [HEADER.pack(MAGIC, VERSION),
+            GAME.pack(simulation.seed or 0, simulation.score,
+                      simulation.lives, simulation.level, simulation.steps,
+                      simulation.bounces, simulation.power_ups_dropped,
+                      simulation.lives_lost, simulation.pup_counter,
+                      simulation.scroll_time, flags)]
+
+    _, words, gauss = simulation.random.getstate()
+    data.append(RANDOM.pack(*words, math.nan if gauss is None else gauss))
+
+    player = simulation.player
+    player_flags = ((LEFT_PRESSED if player.left_pressed else 0)
+                    | (RIGHT_PRESSED if player.right_pressed else 0)
+                    | (PLAYER_BREAK_OUT if player.break_out else 0))
+    data.append(PLAYER.pack(
+        player.center_x, player.center_y, player.width,
+        player_textures(player).index(player.texture), player.cur_texture,
+        POWER_UP_CODES[player.current_power_up], player_flags,
+        player.break_out_counter))
+
+    bricks = simulation.bricks
+    rows, cols = bricks.types.shape
+    data.append(COUNTS.pack(len(simulation.balls), len(simulation.power_ups),
+                            len(simulation.lasers), rows, cols,
+                            bricks.top_row))
+    for ball in simulation.balls:
+        stuck_to, offset = ball.stuck_on
+        data.append(BALL.pack(ball.center_x, ball.center_y, ball.change_x,
+                              ball.change_y, ball.mod,
+                              POWER_UP_CODES[ball.current_power_up],
+                              stuck_to is not None, offset))
+    for pup in simulation.power_ups:
+        data.append(POWER_UP.pack(pup.center_x, pup.center_y,
+                                  POWER_UP_CODES[pup.type]))
+    for laser in simulation.lasers:
+        data.append(LASER.pack(laser.center_x, laser.center_y,
+                               laser.change_y))
+
+    data.append(bricks.types.tobytes())
+    data.append(bricks.hit_points.tobytes())
+    data.append(np.packbits(bricks.alive).tobytes())
+    return b''.join(data)
+
+
+def restore(simulation, data):
+    """Put a game back in the state of a snapshot.
+
+    Arguments:
+        simulation {Simulation} -- The game to overwrite
+        data {bytes} -- A snapshot from take
+
+    Raises:
+        ValueError -- If data is not a snapshot, or is of an endless game
+                      and the simulation is not, or the other way round,
+                      or both are endless but were given different seeds
+    """
+    magic, version = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('Not a brick breaker snapshot')
+    offset = HEADER.size
+
+    (seed, score, lives, level, steps, bounces, power_ups_dropped,
+     lives_lost, pup_counter, scroll_time, flags) = GAME.unpack_from(
+         data, offset)
+    offset += GAME.size
+    if bool(flags & ENDLESS) != simulation.endless:
+        raise ValueError('Snapshot and simulation differ in endless mode')
+    if not flags & HAS_SEED:
+        seed = None
+    if simulation.endless and seed != simulation.seed:
+        # The simulation's levels are generated from its own seed
+        raise ValueError('Snapshot and simulation differ in seed, which '
+                         'endless levels are made from')
+    simulation.seed = seed
+    simulation.score = score
+    simulation.lives = lives
+    simulation.level = level
+    simulation.steps = steps
+    simulation.bounces = bounces
+    simulation.power_ups_dropped = power_ups_dropped
+    simulation.lives_lost = lives_lost
+    simulation.pup_counter = pup_counter
+    simulation.scroll_time = scroll_time
+    simulation.game_over = bool(flags & GAME_OVER)
+    simulation.pause = bool(flags & PAUSE)
+    simulation.break_out = bool(flags & BREAK_OUT)
+    simulation.sound_events = []
+
+    *words, gauss = RANDOM.unpack_from(data, offset)
+    offset += RANDOM.size
+    simulation.random.setstate((3, tuple(words),
+                                None if math.isnan(gauss) else gauss))
+
+    player = simulation.player
+    (player.center_x, player.center_y, player.width, texture,
+     player.cur_texture, power_up, player_flags,
+     player.break_out_counter) = PLAYER.unpack_from(data, offset)
+    offset += PLAYER.size
+    player.texture = player_textures(player)[texture]
+    player.current_power_up = POWER_UPS[power_up]
+    player.left_pressed = bool(player_flags & LEFT_PRESSED)
+    player.right_pressed = bool(player_flags & RIGHT_PRESSED)
+    player.break_out = bool(player_flags & PLAYER_BREAK_OUT)
+
+    balls, power_ups, lasers, rows, cols, top_row = COUNTS.unpack_from(
+        data, offset)
+    offset += COUNTS.size
+
+    for body_list, pool in ((simulation.balls, simulation.ball_pool),
+                            (simulation.power_ups, simulation.power_up_pool),
+                            (simulation.lasers, simulation.laser_pool)):
+        for body in body_list:
+            pool.release(body)
+
+    for _ in range(balls):
+        ball = simulation.ball_pool.take()
+        (ball.center_x, ball.center_y, ball.change_x, ball.change_y,
+         ball.mod, power_up, stuck, stuck_offset) = BALL.unpack_from(
+             data, offset)
+        offset += BALL.size
+        ball.current_power_up = POWER_UPS[power_up]
+        ball.stuck_on = (player if stuck else None, stuck_offset)
+        simulation.balls.append(ball)
+
+    for _ in range(power_ups):
+        x, y, type = POWER_UP.unpack_from(data, offset)
+        offset += POWER_UP.size
+        pup = simulation.power_up_pool.take()
+        pup.reset(x, y, POWER_UPS[type])
+        simulation.power_ups.append(pup)
+
+    for _ in range(lasers):
+        laser = simulation.laser_pool.take()
+        laser.center_x, laser.center_y, laser.change_y = LASER.unpack_from(
+            data, offset)
+        offset += LASER.size
+        simulation.lasers.append(laser)
+
+    cells = rows * cols
+    types = np.frombuffer(data, dtype=np.int8, count=cells, offset=offset)
+    offset += cells
+    hit_points = np.frombuffer(data, dtype=np.int8, count=cells,
+                               offset=offset)
+    offset += cells
+    alive = np.unpackbits(np.frombuffer(data, dtype=np.uint8,
+                                        count=(cells + 7) // 8,
+                                        offset=offset), count=cells)
+    simulation.bricks.set_state(types.reshape(rows, cols).copy(),
+                                hit_points.reshape(rows, cols).copy(),
+                                alive.reshape(rows, cols).astype(bool),
+                                top_row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--level', type=int, default=1)
+    parser.add_argument('--seed', type=parse_seed, default=0)
+    parser.add_argument('--steps', type=int, default=3000,
+                        help='steps to play before the snapshot')
+    parser.add_argument('--forks', type=int, default=100,
+                        help='games to restore the snapshot into')
+    parser.add_argument('--after', type=int, default=600,
+                        help='steps each fork plays after the restore')
+    args = parser.parse_args()
+
+    step_time = 1 / PHYSICS_HZ
+    simulation = Simulation(args.seed)
+    simulation.setup(args.level)
+    autopilot = Autopilot(args.seed)
+    for _ in range(args.steps):
+        autopilot.update(simulation, simulation)
+        simulation.step(step_time)
+
+    start = time.perf_counter()
+    for _ in range(TIMING_REPEATS):
+        data = take(simulation)
+    took = (time.perf_counter() - start) / TIMING_REPEATS
+    print(f'Snapshot after {simulation.steps} steps: {len(data)} bytes '
+          f'in {took * 1e6:.0f}us')
+
+    forks = [Simulation(args.seed) for _ in range(args.forks)]
+    start = time.perf_counter()
+    for fork in forks:
+        restore(fork, data)
+    took = (time.perf_counter() - start) / max(args.forks, 1)
+    print(f'Restored {args.forks} forks, {took * 1e6:.0f}us each')
+
+    # Every fork gets the same autopilot state as the original, so all of
+    # them should play out the same as it does
+    outcomes = set()
+    for game in [simulation, *forks]:
+        pilot = Autopilot(args.seed)
+        pilot.random.setstate(autopilot.random.getstate())
+        for _ in range(args.after):
+            pilot.update(game, game)
+            game.step(step_time)
+        outcomes.add(take(game))
+    print(f'After {args.after} more steps: {len(outcomes)} distinct '
+          f'state{"s" if len(outcomes) != 1 else ""}')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+import arcade
+import numpy as np
+
+from assets import assets
+from brick import Brick
+from brick_field import VISIBLE_ROWS
+from constants import SCREEN_WIDTH, SCREEN_HEIGHT, SCALING
+
+
+class SpriteLayer:
+    """A SpriteList kept in step with a list of simulation bodies.
+
+    Each body gets one sprite. On every sync, sprites are handed out to
+    new bodies, parked for bodies that are gone, and moved and
+    re-textured to match the rest. Parked sprites stay in the SpriteList
+    fully transparent and are reused first, so the list and its buffers
+    do not shrink and regrow as bodies come and go. Positions can be
+    blended between the previous and the current simulation step for
+    smooth drawing.
+    """
+
+    def __init__(self, reserve=0, texture=None):
+        """Initialize the layer.
+
+        Arguments:
+            reserve {int} -- Number of parked sprites to create up front
+            texture {str} -- Image for the reserved sprites
+        """
+        self.sprite_list = arcade.SpriteList(use_spatial_hash=False)
+        self.sprites = {}
+        self.parked = []
+        self.previous = {}
+        self.reserve(reserve, texture)
+
+    def reserve(self, count, texture, limit=None):
+        """Make sure there are sprites enough to show a number of bodies.
+
+        Arguments:
+            count {int} -- Bodies the layer should be able to show at once
+            texture {str} -- Image for any new parked sprites
+            limit {int} -- Most new sprites to make in this call
+
+        Returns:
+            bool -- True if there are enough sprites
+        """
+        missing = count - len(self.sprites) - len(self.parked)
+        made = missing if limit is None else min(missing, limit)
+        for _ in range(made):
+            sprite = self.new_sprite(texture)
+            sprite.alpha = 0
+            self.parked.append(sprite)
+        return made >= missing
+
+    def remember(self, bodies):
+        """Record where the bodies are before the simulation steps.
+
+        Arguments:
+            bodies -- The bodies about to be moved
+        """
+        self.previous = {body: (body.center_x, body.center_y)
+                         for body in bodies}
+
+    def sync(self, bodies, alpha=1.0):
+        """Match the sprites to the current bodies.
+
+        Arguments:
+            bodies -- The bodies to show, in draw order
+            alpha {float} -- How far to place each sprite from its
+                             remembered position to its current one
+        """
+        seen = set()
+        for body in bodies:
+            sprite = self.sprites.get(body)
+            if sprite is None:
+                sprite = self.take_sprite(body.texture)
+                self.sprites[body] = sprite
+            elif sprite.texture_name != body.texture:
+                sprite.texture = assets.texture(body.texture)
+                sprite.texture_name = body.texture
+            if body in self.previous:
+                x, y = self.previous[body]
+                sprite.center_x = x + (body.center_x - x) * alpha
+                sprite.center_y = y + (body.center_y - y) * alpha
+            else:
+                sprite.center_x = body.center_x
+                sprite.center_y = body.center_y
+            seen.add(body)
+
+        for body in [body for body in self.sprites if body not in seen]:
+            self.park(self.sprites.pop(body))
+
+    def park(self, sprite):
+        """Hide a sprite and keep it for reuse."""
+        sprite.alpha = 0
+        self.parked.append(sprite)
+
+    def take_sprite(self, texture):
+        """Reuse a parked sprite, or add a new one to the list.
+
+        Arguments:
+            texture {str} -- Image to show on the sprite
+        """
+        if not self.parked:
+            return self.new_sprite(texture)
+        sprite = self.parked.pop()
+        sprite.alpha = 255
+        if sprite.texture_name != texture:
+            sprite.texture = assets.texture(texture)
+            sprite.texture_name = texture
+        return sprite
+
+    def new_sprite(self, texture):
+        sprite = arcade.Sprite(scale=SCALING)
+        sprite.texture = assets.texture(texture)
+        sprite.texture_name = texture
+        self.sprite_list.append(sprite)
+        return sprite
+
+    def draw(self):
+        self.sprite_list.draw()
+
+
+# Rows above the visible ones that get sprites ahead of a scroll
+MATERIALISE_ROWS = 2
+
+
+class BrickFieldLayer(SpriteLayer):
+    """One SpriteList showing the bricks in sight in a BrickField.
+
+    Sprites are keyed by cell, and only the cells the field marks dirty
+    are looked at, so a frame where no brick changed costs nothing. Only
+    the visible rows, and MATERIALISE_ROWS above them kept transparent
+    until they scroll into sight, have sprites. As a
+    tall level scrolls, rows coming into that band get sprites and rows
+    leaving it give theirs back, so the sprite count follows what is on
+    screen rather than the size of the level.
+    """
+
+    generation = -1
+    top_row = 0
+    rows = range(0)
+
+    def sync(self, field):
+        """Match the sprites to the bricks that changed.
+
+        Arguments:
+            field {BrickField} -- The bricks to show
+        """
+        if field.generation != self.generation:
+            # A new level layout, none of the old cells carry over
+            for sprite in self.sprites.values():
+                self.park(sprite)
+            self.sprites = {}
+            self.rows = range(0)
+            self.generation = field.generation
+
+        rows = range(max(field.top_row - MATERIALISE_ROWS, 0),
+                     min(field.top_row + VISIBLE_ROWS, len(field.alive)))
+        cells = field.take_dirty(rows)
+        if rows != self.rows:
+            for cell in [cell for cell in self.sprites
+                         if cell[0] not in rows]:
+                self.park(self.sprites.pop(cell))
+            for row in rows:
+                if row not in self.rows:
+                    cells.extend((row, int(col)) for col
+                                 in np.flatnonzero(field.alive[row]))
+            self.rows = rows
+
+        if field.top_row != self.top_row:
+            # Everything in sight moved down with the scroll
+            for (row, col), sprite in self.sprites.items():
+                sprite.center_y = Brick(field, row, col).center_y
+                sprite.alpha = 255 if row >= field.top_row else 0
+            self.top_row = field.top_row
+
+        for row, col in dict.fromkeys(cells):
+            sprite = self.sprites.pop((row, col), None)
+            if not field.alive[row, col]:
+                if sprite is not None:
+                    self.park(sprite)
+                continue
+
+            brick = Brick(field, row, col)
+            if sprite is None:
+                sprite = self.take_sprite(brick.texture)
+            elif sprite.texture_name != brick.texture:
+                sprite.texture = assets.texture(brick.texture)
+                sprite.texture_name = brick.texture
+            sprite.center_x = brick.center_x
+            sprite.center_y = brick.center_y
+            # Rows made ahead of a scroll wait out of sight
+            sprite.alpha = 255 if row >= field.top_row else 0
+            self.sprites[(row, col)] = sprite
+
+
+class StaticLayer(SpriteLayer):
+    """The background and walls, drawn from a texture rendered once.
+
+    The walls never move, so they are drawn into an offscreen texture when
+    the layer is made and shown as one full screen backdrop sprite after
+    that. The break out gate opens and closes, so it is kept out of the
+    texture and synced like any other body, as an overlay in the same
+    SpriteList. The whole static scene is a single draw.
+    """
+
+    def __init__(self, walls, background):
+        """Render the backdrop.
+
+        Arguments:
+            walls -- The bodies that never change
+            background {(int, int, int)} -- Color behind the walls
+        """
+        super().__init__()
+        texture = arcade.Texture.create_empty('static_layer',
+                                              (SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.backdrop = arcade.Sprite()
+        self.backdrop.texture = texture
+        self.backdrop.center_x = SCREEN_WIDTH / 2
+        self.backdrop.center_y = SCREEN_HEIGHT / 2
+        self.sprite_list.append(self.backdrop)
+
+        wall_layer = SpriteLayer()
+        wall_layer.sync(walls)
+        with self.sprite_list.atlas.render_into(texture) as framebuffer:
+            framebuffer.clear(background)
+            wall_layer.draw()
@@ -0,0 +1,114 @@
+"""Find out where the time to the game's first frame goes.
+
+    $ python game.py --profile-startup
+
+starts the game again under python -X importtime, which times every
+import, and has it quit once the first frame is drawn. The game reports
+each stage of its startup and the assets it loaded before that frame,
+then the slowest imports are listed.
+"""
+import subprocess
+import sys
+import time
+
+# Rows shown in the asset and import tables
+REPORT_ROWS = 12
+
+
+def timing_imports():
+    """Whether this interpreter was started with -X importtime."""
+    return 'importtime' in sys._xoptions
+
+
+class StartupProfile:
+    """The stages of startup, each timed from the end of the last."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.last = self.start
+        self.stages = []
+
+    def mark(self, stage):
+        """End a stage.
+
+        Arguments:
+            stage {str} -- What the time since the last mark was spent on
+        """
+        now = time.perf_counter()
+        self.stages.append((stage, now - self.last))
+        self.last = now
+
+    def report(self, load_times):
+        """Describe the stages and the assets loaded so far.
+
+        Arguments:
+            load_times {{str: (float, bool)}} -- Seconds each asset took
+                to load and whether the main thread loaded it
+
+        Returns:
+            [str] -- Lines of the report
+
+        """
+        lines = ['Startup, after imports']
+        for stage, seconds in self.stages:
+            lines.append(f'  {stage:<32} {seconds * 1000:9.1f}ms')
+        lines.append(f'  {"total":<32} '
+                     f'{(self.last - self.start) * 1000:9.1f}ms')
+
+        blocking = sorted(((seconds, path) for path, (seconds, main)
+                           in load_times.items() if main), reverse=True)
+        streamed = len(load_times) - len(blocking)
+        lines.append(f'Assets loaded on the main thread: {len(blocking)} in '
+                     f'{sum(seconds for seconds, _ in blocking) * 1000:.1f}ms'
+                     f', {streamed} streamed in the background so far')
+        for seconds, path in blocking[:REPORT_ROWS]:
+            lines.append(f'  {path:<32} {seconds * 1000:9.1f}ms')
+        return lines
+
+
+def import_times(text):
+    """Read the top level imports out of python -X importtime output.
+
+    Arguments:
+        text {str} -- What the interpreter wrote to stderr
+
+    Returns:
+        [(str, float)] -- Module and seconds spent importing it and
+                          everything it imported, slowest first
+
+    """
+    imports = []
+    for line in text.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line.split('|')
+        if not cumulative.strip().isdigit() or name.startswith('  '):
+            continue
+        imports.append((name.strip(), int(cumulative) / 1e6))
+    return sorted(imports, key=lambda item: item[1], reverse=True)
+
+
+def run_profiled(argv):
+    """Run the game under -X importtime and report its imports.
+
+    Arguments:
+        argv {[str]} -- The game's command line, script first
+
+    Returns:
+        int -- The game's exit status
+    """
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', *argv],
+                            stderr=subprocess.PIPE, text=True)
+    elapsed = time.perf_counter() - start
+
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            print(line, file=sys.stderr)
+
+    imports = import_times(result.stderr)
+    print(f'Imports: {sum(seconds for _, seconds in imports) * 1000:.1f}ms')
+    for name, seconds in imports[:REPORT_ROWS]:
+        print(f'  {name:<32} {seconds * 1000:9.1f}ms')
+    print(f'Launch to exit: {elapsed * 1000:.1f}ms')
+    return result.returncode
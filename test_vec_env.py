@@ -0,0 +1,68 @@
+import numpy as np
+
+from ball import BALL_SPEED
+from brick import GOLD
+from constants import SCREEN_WIDTH, SCALING
+from player import PLAYER_Y
+from power_up import POWER_UP_HEIGHT
+from vec_env import (VecBrickBreakerEnv, ACTION_COUNT, BALL_FIELDS,
+                     DISRUPT, MAX_BALLS, NOOP, PADDLE_HEIGHT)
+
+
+def observed_balls(env, observations):
+    balls = observations[:, env.balls].reshape(env.num_envs, -1, BALL_FIELDS)
+    return balls[..., 4].sum(axis=1)
+
+
+def test_every_ball_has_a_slot():
+    env = VecBrickBreakerEnv(1)
+    env.reset(seed=0)
+
+    # Fill every ball slot with balls flying up the middle of the screen
+    for slot in range(MAX_BALLS):
+        env.ball_x[0, slot] = SCREEN_WIDTH / 2 + 4 * slot
+        env.ball_y[0, slot] = 200
+        env.ball_change_x[0, slot] = 0
+        env.ball_change_y[0, slot] = BALL_SPEED
+        env.ball_stuck[0, slot] = False
+        env.spawn_balls(np.array([0]), np.array([slot]))
+
+    # and catch a DISRUPT with no slot left for its ball
+    env.pup_type[0, 0] = DISRUPT
+    env.pup_x[0, 0] = env.paddle_x[0]
+    env.pup_y[0, 0] = (PLAYER_Y + (POWER_UP_HEIGHT * SCALING
+                                   + PADDLE_HEIGHT) / 2 + 1)
+
+    observations, _, _, _, _ = env.step(np.array([NOOP]))
+    assert env.pup_type[0, 0] == 0
+    assert env.ball_active[0].sum() == MAX_BALLS
+    assert observed_balls(env, observations)[0] == MAX_BALLS
+
+
+def test_broken_bricks_are_not_observed():
+    # Level 3 has gold bricks, which take no damage but can scroll away
+    env = VecBrickBreakerEnv(1, level=3)
+    env.reset(seed=0)
+    gold = np.flatnonzero(env.types == GOLD)
+    assert len(gold)
+    env.remove_bricks(gold)
+    env.observe()
+    assert not env.observations[0, env.bricks][gold].any()
+
+
+def test_observations_follow_the_games():
+    env = VecBrickBreakerEnv(32, level=4)
+    env.reset(seed=1)
+    generator = np.random.default_rng(1)
+    rows = env.grid_shape[0]
+    for _ in range(3000):
+        observations, _, _, _, _ = env.step(
+            generator.integers(ACTION_COUNT, size=env.num_envs))
+        assert (observed_balls(env, observations)
+                == env.ball_active.sum(axis=1)).all()
+
+    band = env.top_row[:, None] + np.arange(rows)
+    games = np.arange(env.num_envs)[:, None]
+    bricks = np.where(env.alive, env.hit_points, 0)[games, band]
+    assert (observations[:, env.bricks]
+            == bricks.reshape(env.num_envs, -1)).all()
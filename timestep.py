@@ -0,0 +1,50 @@
+from constants import PHYSICS_HZ
+
+# Most simulation steps run for one frame. Beyond this the game slows
+# down instead of spending ever longer catching up.
+MAX_STEPS_PER_FRAME = 5
+
+
+class FixedTimestep:
+    """Turns variable frame times into a whole number of fixed steps.
+
+    Frame time is added to an accumulator and spent in steps of exactly
+    1 / hz seconds, so the simulation sees the same step size however
+    fast or slow frames arrive. The time left over, as a fraction of a
+    step, is used to interpolate what is drawn.
+    """
+
+    def __init__(self, hz=PHYSICS_HZ, max_steps=MAX_STEPS_PER_FRAME):
+        """Initialize the timestep.
+
+        Arguments:
+            hz {float} -- Simulation steps per second
+            max_steps {int} -- Most steps to run for a single frame
+        """
+        self.step_time = 1 / hz
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+
+    def advance(self, delta_time):
+        """Add frame time and find how many steps are due.
+
+        Arguments:
+            delta_time {float} -- Time since the last frame
+
+        Returns:
+            int -- Number of steps to run now
+
+        """
+        self.accumulator = self.accumulator + delta_time
+        steps = int(self.accumulator / self.step_time)
+        if steps > self.max_steps:
+            # Drop the time we cannot catch up on
+            steps = self.max_steps
+            self.accumulator = steps * self.step_time
+        self.accumulator = self.accumulator - steps * self.step_time
+        return steps
+
+    @property
+    def alpha(self):
+        """Fraction of a step between the last step and the present."""
+        return self.accumulator / self.step_time
@@ -0,0 +1,994 @@
+"""Step many games in lockstep for training paddle agents.
+
+VecBrickBreakerEnv follows the Gymnasium vector environment interface:
+reset returns observations and infos, step takes one action per game and
+returns observations, rewards, terminated, truncated and infos, all as
+NumPy arrays with a leading game axis.
+
+The games do not run through Simulation. Every game's paddle, balls,
+power ups, lasers and bricks live in arrays with a leading game axis,
+and each step moves all of them with array operations, by the rules
+Simulation plays: balls swept through walls, bricks and the paddle,
+Ball.collides_with_player's angled returns, Brick.hit, the power ups
+and the scoring. Two things differ. The balls of one game move
+together, so when two of them reach the same brick in the same step
+both bounce off it, and a game holds at most MAX_BALLS balls,
+MAX_POWER_UPS falling power ups and MAX_LASERS lasers, so a DISRUPT,
+drop or shot with no free slot adds nothing. Random choices come from
+one generator seeded by reset, so a run can be repeated.
+
+A game that ends is started again in the same step. Its last
+observation is kept in infos['final_observation'], flagged by
+infos['_final_observation'].
+
+Each observation is one float32 row, laid out as
+
+    PADDLE     x, y, width, power up (0 for none), lives
+    BALLS      x, y, change_x, change_y, in play per ball slot, one
+               slot for every ball a game can hold
+    POWER_UPS  x, y, type (0 for none) per power up slot
+    BRICKS     hit points of each live brick in sight, row by row
+
+with positions in screen pixels and speeds in pixels a second.
+
+    $ python vec_env.py --envs 256 --steps 2000
+
+times random play.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from ball import BALL_SIZE, BALL_SPEED
+from batch import times_of_impact
+from brick import (Brick, BRICK_WIDTH, BRICK_HEIGHT, GRID_LEFT, GRID_TOP,
+                   SILVER, GOLD)
+from brick_field import EMPTY, VISIBLE_ROWS, FIELD_BOTTOM, POINTS
+from constants import (SCREEN_WIDTH, SCREEN_HEIGHT, SCALING, WALL_WIDTH,
+                       TOP_WALL_WIDTH, PHYSICS_HZ)
+from laser import LASER_WIDTH, LASER_HEIGHT, LASER_SPEED
+from level_pack import open_levels
+from player import (MOVEMENT_SPEED, PLAYER_WIDTH, PLAYER_ENLARGED_WIDTH,
+                    PLAYER_HEIGHT, PLAYER_Y)
+from power_up import (PowerUpType, POWER_UP_WIDTH, POWER_UP_HEIGHT,
+                      POWER_UP_SPEED)
+from simulation import (SIDE_WALL_WIDTH, SIDE_WALL_HEIGHT, SIDE_WALL_COUNT,
+                        TOP_WALL_LENGTH, TOP_WALL_COUNT, STARTING_LIVES,
+                        FIRST_POWER_UP, MAX_IMPACTS_PER_STEP,
+                        SCROLL_INTERVAL)
+
+# Actions, one of these per game each step
+NOOP = 0
+LEFT = 1
+RIGHT = 2
+SHOOT = 3
+ACTION_COUNT = 4
+
+# Long enough to clear any level
+MAX_EPISODE_STEPS = 10 * 60 * PHYSICS_HZ
+
+# Bodies one game can hold at once
+MAX_BALLS = 16
+MAX_POWER_UPS = 8
+MAX_LASERS = 64
+
+# Power up codes, 0 for none
+POWER_UP_CODES = {pup: code for code, pup in enumerate(PowerUpType, 1)}
+CATCH = POWER_UP_CODES[PowerUpType.CATCH]
+SLOW = POWER_UP_CODES[PowerUpType.SLOW]
+ENLARGE = POWER_UP_CODES[PowerUpType.ENLARGE]
+EXTRA = POWER_UP_CODES[PowerUpType.EXTRA]
+DISRUPT = POWER_UP_CODES[PowerUpType.DISRUPT]
+BREAK = POWER_UP_CODES[PowerUpType.BREAK]
+LASER = POWER_UP_CODES[PowerUpType.LASER]
+PLAYER_POWER_UPS = (ENLARGE, BREAK, LASER)
+
+# Observation fields per paddle, ball and power up
+PADDLE_FIELDS = 5
+BALL_FIELDS = 5
+POWER_UP_FIELDS = 3
+
+# Body sizes as the game scales them
+BALL_WIDTH = BALL_SIZE * SCALING
+PADDLE_HEIGHT = PLAYER_HEIGHT * SCALING
+PADDLE_TOP = PLAYER_Y + PADDLE_HEIGHT / 2
+PADDLE_BOTTOM = PLAYER_Y - PADDLE_HEIGHT / 2
+
+# The walls Simulation builds, each side and the top merged into one box
+# of (left, right, bottom, top). The right wall leaves the break out gap.
+WALLS = np.array([
+    (0, SIDE_WALL_WIDTH * SCALING, 0, SIDE_WALL_COUNT * SIDE_WALL_HEIGHT),
+    (SCREEN_WIDTH - SIDE_WALL_WIDTH * SCALING, SCREEN_WIDTH,
+     SIDE_WALL_HEIGHT, SIDE_WALL_COUNT * SIDE_WALL_HEIGHT),
+    (0, TOP_WALL_COUNT * TOP_WALL_LENGTH,
+     SCREEN_HEIGHT - TOP_WALL_WIDTH * SCALING, SCREEN_HEIGHT),
+], dtype=float)
+WALL_X = (WALLS[:, 0] + WALLS[:, 1]) / 2
+WALL_Y = (WALLS[:, 2] + WALLS[:, 3]) / 2
+WALL_HALF_WIDTH = (WALLS[:, 1] - WALLS[:, 0] + BALL_WIDTH) / 2
+WALL_HALF_HEIGHT = (WALLS[:, 3] - WALLS[:, 2] + BALL_WIDTH) / 2
+
+# Normals Ball.collides_with_player reflects off for each third of the
+# paddle
+LEFT_THIRD = (0.196, -0.981)
+RIGHT_THIRD = (-0.196, -0.981)
+
+# Sorts after every ball in play
+LAST = np.iinfo(np.int64).max
+
+# What a ball runs into first
+NOTHING = 0
+BRICK = 1
+WALL = 2
+PADDLE = 3
+
+
+class VecBrickBreakerEnv:
+    """A batch of independent games stepped together."""
+
+    def __init__(self, num_envs, level=1, max_episode_steps=MAX_EPISODE_STEPS,
+                 physics_hz=PHYSICS_HZ):
+        """Initialize the games. Call reset before stepping.
+
+        Arguments:
+            num_envs {int} -- Number of games
+            level {int} -- Level every game starts on
+            max_episode_steps {int} -- Steps before a game is truncated
+            physics_hz {int} -- Steps per second of game time
+        """
+        self.num_envs = num_envs
+        self.level = level
+        self.max_episode_steps = max_episode_steps
+        self.delta_time = 1 / physics_hz
+        self.random = np.random.default_rng()
+        self.spawned = 0
+
+        # Every level, padded to the biggest, indexed by level number
+        levels = open_levels()
+        numbers = sorted(levels.numbers())
+        maps = {number: levels.types(number) for number in numbers}
+        rows = max(types.shape[0] for types in maps.values())
+        cols = max(types.shape[1] for types in maps.values())
+        self.level_types = np.full((numbers[-1] + 1, rows, cols), EMPTY,
+                                   dtype=np.int8)
+        self.level_top_row = np.zeros(numbers[-1] + 1, dtype=np.int64)
+        self.next_level = np.ones(numbers[-1] + 1, dtype=np.int64)
+        for number, types in maps.items():
+            self.level_types[number, :types.shape[0], :types.shape[1]] = types
+            self.level_top_row[number] = max(len(types) - VISIBLE_ROWS, 0)
+            if number + 1 in levels:
+                self.next_level[number] = number + 1
+        level_alive = self.level_types != EMPTY
+        self.level_hit_points = (np.where(self.level_types == SILVER, 2, 1)
+                                 * level_alive).astype(np.int8)
+        self.level_breakable = (level_alive & (self.level_types != GOLD)
+                                ).sum(axis=(1, 2))
+
+        # The rows in sight of every level fit in a grid as big as the
+        # biggest of them
+        self.grid_shape = (min(rows, VISIBLE_ROWS), cols)
+
+        ball_end = PADDLE_FIELDS + BALL_FIELDS * MAX_BALLS
+        power_up_end = ball_end + POWER_UP_FIELDS * MAX_POWER_UPS
+        self.paddle = slice(0, PADDLE_FIELDS)
+        self.balls = slice(PADDLE_FIELDS, ball_end)
+        self.power_ups = slice(ball_end, power_up_end)
+        self.bricks = slice(power_up_end,
+                            power_up_end + self.grid_shape[0]
+                            * self.grid_shape[1])
+        self.observation_size = self.bricks.stop
+        self.observations = np.zeros((num_envs, self.observation_size),
+                                     dtype=np.float32)
+
+        n = num_envs
+        # Game
+        self.score = np.zeros(n, dtype=np.int64)
+        self.lives = np.zeros(n, dtype=np.int64)
+        self.level_number = np.zeros(n, dtype=np.int64)
+        self.steps = np.zeros(n, dtype=np.int64)
+        self.game_over = np.zeros(n, dtype=bool)
+        self.pup_counter = np.zeros(n, dtype=np.int64)
+        self.scroll_time = np.zeros(n)
+
+        # Paddle
+        self.paddle_x = np.zeros(n)
+        self.paddle_width = np.zeros(n)
+        self.paddle_power_up = np.zeros(n, dtype=np.int8)
+        self.break_out = np.zeros(n, dtype=bool)
+        self.break_out_time = np.zeros(n)
+        self.left_held = np.zeros(n, dtype=bool)
+        self.right_held = np.zeros(n, dtype=bool)
+
+        # Bricks
+        self.types = np.full((n, rows, cols), EMPTY, dtype=np.int8)
+        self.hit_points = np.zeros((n, rows, cols), dtype=np.int8)
+        self.alive = np.zeros((n, rows, cols), dtype=bool)
+        self.breakable = np.zeros(n, dtype=np.int64)
+        self.top_row = np.zeros(n, dtype=np.int64)
+        # Games whose bricks in sight changed since they were observed
+        self.bricks_changed = np.ones(n, dtype=bool)
+
+        # Balls, in the order they came into play
+        self.ball_x = np.zeros((n, MAX_BALLS))
+        self.ball_y = np.zeros((n, MAX_BALLS))
+        self.ball_change_x = np.zeros((n, MAX_BALLS))
+        self.ball_change_y = np.zeros((n, MAX_BALLS))
+        self.ball_mod = np.ones((n, MAX_BALLS))
+        self.ball_power_up = np.zeros((n, MAX_BALLS), dtype=np.int8)
+        self.ball_active = np.zeros((n, MAX_BALLS), dtype=bool)
+        self.ball_stuck = np.zeros((n, MAX_BALLS), dtype=bool)
+        self.ball_offset = np.zeros((n, MAX_BALLS))
+        self.ball_order = np.zeros((n, MAX_BALLS), dtype=np.int64)
+
+        # Falling power ups, type 0 for a free slot
+        self.pup_x = np.zeros((n, MAX_POWER_UPS))
+        self.pup_y = np.zeros((n, MAX_POWER_UPS))
+        self.pup_type = np.zeros((n, MAX_POWER_UPS), dtype=np.int8)
+
+        # Lasers
+        self.laser_x = np.zeros((n, MAX_LASERS))
+        self.laser_y = np.zeros((n, MAX_LASERS))
+        self.laser_active = np.zeros((n, MAX_LASERS), dtype=bool)
+        self.laser_order = np.zeros((n, MAX_LASERS), dtype=np.int64)
+
+    def reset(self, seed=None):
+        """Start every game over.
+
+        Arguments:
+            seed {int} -- Seed for every random choice the games make.
+                          Random if not given.
+
+        Returns:
+            (np.ndarray, dict) -- Observations and infos
+        """
+        self.random = np.random.default_rng(seed)
+        self.new_games(np.arange(self.num_envs))
+        self.observe()
+        return self.observations.copy(), {}
+
+    def step(self, actions):
+        """Apply one action to each game and step them all.
+
+        Arguments:
+            actions {np.ndarray} -- One of NOOP, LEFT, RIGHT or SHOOT per
+                                    game
+
+        Returns:
+            tuple -- observations, rewards, terminated and truncated, one
+                     row or value per game, and a dict of infos
+        """
+        score = self.score.copy()
+        self.act(np.asarray(actions))
+
+        self.steps += 1
+        self.move_paddles()
+        self.move_lasers()
+        self.move_balls()
+        self.move_power_ups()
+        self.scroll_bricks()
+        self.lose_balls()
+        self.finish_levels()
+        self.lose_lives()
+
+        rewards = (self.score - score).astype(np.float32)
+        terminated = self.game_over.copy()
+        truncated = (self.steps >= self.max_episode_steps) & ~terminated
+        self.observe()
+
+        infos = {}
+        done = terminated | truncated
+        if done.any():
+            infos['final_observation'] = self.observations.copy()
+            infos['_final_observation'] = done
+            infos['final_score'] = np.where(done, self.score, 0)
+            envs = np.flatnonzero(done)
+            self.new_games(envs)
+            self.observe(envs)
+        return self.observations.copy(), rewards, terminated, truncated, infos
+
+    def new_games(self, envs):
+        """Start games over from the first level.
+
+        Arguments:
+            envs {np.ndarray} -- Indices of the games
+        """
+        self.score[envs] = 0
+        self.lives[envs] = STARTING_LIVES
+        self.steps[envs] = 0
+        self.game_over[envs] = False
+        self.left_held[envs] = False
+        self.right_held[envs] = False
+        self.setup(envs, np.full(len(envs), self.level))
+
+    def setup(self, envs, levels):
+        """Get levels ready to play, as Simulation.setup does.
+
+        Arguments:
+            envs {np.ndarray} -- Indices of the games
+            levels {np.ndarray} -- Level number for each game
+        """
+        self.level_number[envs] = levels
+        self.pup_counter[envs] = FIRST_POWER_UP
+        self.scroll_time[envs] = 0.0
+
+        self.ball_active[envs] = False
+        self.pup_type[envs] = 0
+        self.laser_active[envs] = False
+
+        self.types[envs] = self.level_types[levels]
+        self.hit_points[envs] = self.level_hit_points[levels]
+        self.alive[envs] = self.level_types[levels] != EMPTY
+        self.breakable[envs] = self.level_breakable[levels]
+        self.top_row[envs] = self.level_top_row[levels]
+        self.bricks_changed[envs] = True
+
+        self.paddle_x[envs] = SCREEN_WIDTH / 2
+        self.clear_paddle_power_up(envs)
+        self.break_out[envs] = False
+        self.break_out_time[envs] = 0
+
+        self.serve(envs)
+
+    def serve(self, envs):
+        """Put a new ball at rest on each paddle, as Ball.reset does.
+
+        Arguments:
+            envs {np.ndarray} -- Indices of games with a free ball slot
+        """
+        slots = np.argmin(self.ball_active[envs], axis=1)
+        self.ball_x[envs, slots] = self.paddle_x[envs]
+        self.ball_y[envs, slots] = PADDLE_TOP + BALL_WIDTH / 2
+        self.ball_change_x[envs, slots] = 0
+        self.ball_change_y[envs, slots] = 0
+        self.ball_mod[envs, slots] = 1.0
+        self.ball_power_up[envs, slots] = 0
+        self.ball_stuck[envs, slots] = True
+        self.ball_offset[envs, slots] = self.paddle_width[envs] / 2
+        self.spawn_balls(envs, slots)
+
+    def spawn_balls(self, envs, slots):
+        self.ball_active[envs, slots] = True
+        self.ball_order[envs, slots] = self.spawned + np.arange(len(envs))
+        self.spawned += len(envs)
+
+    def first_balls(self, envs):
+        """Find the ball each game's list would hold first.
+
+        Arguments:
+            envs {np.ndarray} -- Indices of the games
+
+        Returns:
+            (np.ndarray, np.ndarray) -- The ball slot of each game, and
+                                        whether it has a ball at all
+        """
+        order = np.where(self.ball_active[envs], self.ball_order[envs],
+                         LAST)
+        slots = np.argmin(order, axis=1)
+        return slots, self.ball_active[envs, slots]
+
+    def clear_paddle_power_up(self, envs):
+        self.paddle_power_up[envs] = 0
+        self.paddle_width[envs] = PLAYER_WIDTH * SCALING
+
+    def act(self, actions):
+        """Hold the movement each action asks for, or shoot.
+
+        Shooting launches a game's first ball if it is stuck and, with
+        the LASER power up, fires a laser from each side of the paddle.
+
+        Arguments:
+            actions {np.ndarray} -- NOOP, LEFT, RIGHT or SHOOT per game
+        """
+        self.left_held = actions == LEFT
+        self.right_held = actions == RIGHT
+
+        envs = np.flatnonzero(actions == SHOOT)
+        if len(envs) == 0:
+            return
+        slots, found = self.first_balls(envs)
+        launch = found & self.ball_stuck[envs, slots]
+        self.ball_stuck[envs[launch], slots[launch]] = False
+        self.ball_change_y[envs[launch], slots[launch]] = BALL_SPEED
+
+        envs = envs[self.paddle_power_up[envs] == LASER]
+        width = self.paddle_width[envs]
+        for x in (self.paddle_x[envs] - width / 2 + width / 4,
+                  self.paddle_x[envs] + width / 2 - width / 4):
+            slots = np.argmin(self.laser_active[envs], axis=1)
+            free = ~self.laser_active[envs, slots]
+            self.laser_x[envs[free], slots[free]] = x[free]
+            self.laser_y[envs[free], slots[free]] = (PADDLE_BOTTOM
+                                                     + LASER_HEIGHT / 2)
+            self.laser_active[envs[free], slots[free]] = True
+            self.laser_order[envs[free], slots[free]] = self.spawned
+            self.spawned += 1
+
+    def move_paddles(self):
+        """Move every paddle as Player.on_update and update_animation do."""
+        direction = (self.right_held & ~self.left_held).astype(int)
+        direction -= self.left_held & ~self.right_held
+        x = self.paddle_x + direction * MOVEMENT_SPEED * self.delta_time
+
+        half = self.paddle_width / 2
+        right = SCREEN_WIDTH - WALL_WIDTH
+        x = np.where((x + half > right) & ~self.break_out, right - half, x)
+        x = np.where(x - half < WALL_WIDTH, WALL_WIDTH + half, x)
+        self.paddle_x = x
+
+        counting = self.break_out & (self.break_out_time > 0)
+        self.break_out_time -= np.where(counting, self.delta_time, 0)
+        self.break_out &= counting
+
+        self.paddle_width = np.where(self.paddle_power_up == ENLARGE,
+                                     PLAYER_ENLARGED_WIDTH,
+                                     PLAYER_WIDTH) * SCALING
+
+    def cells_in_box(self, envs, left, right, bottom, top):
+        """Find the live bricks in the cells boxes overlap.
+
+        The vectorised BrickField.in_box, one box per game index.
+
+        Arguments:
+            envs {np.ndarray} -- The game of each box
+            left, right, bottom, top {np.ndarray} -- Edges of the boxes
+
+        Returns:
+            (np.ndarray, np.ndarray, np.ndarray) -- Row and column of each
+                candidate cell, one row of them per box in BrickField
+                order, and whether the cell holds a live brick
+        """
+        field_rows, field_cols = self.alive.shape[1:]
+        top_row = self.top_row[envs]
+        first_row = np.floor((GRID_TOP - top) / BRICK_HEIGHT
+                             + top_row).astype(np.int64)
+        last_row = np.maximum(first_row, np.ceil(
+            (GRID_TOP - bottom) / BRICK_HEIGHT + top_row).astype(np.int64) - 1)
+        first_row = np.maximum(first_row, top_row)
+        first_col = np.floor((left - GRID_LEFT) / BRICK_WIDTH).astype(np.int64)
+        last_col = np.maximum(first_col, np.ceil(
+            (right - GRID_LEFT) / BRICK_WIDTH).astype(np.int64) - 1)
+        first_col = np.maximum(first_col, 0)
+
+        row_count = max(int((last_row - first_row).max(initial=0)) + 1, 1)
+        col_count = max(int((last_col - first_col).max(initial=0)) + 1, 1)
+        rows = first_row[:, None] + np.arange(row_count)
+        cols = first_col[:, None] + np.arange(col_count)
+        row_ok = (rows <= last_row[:, None]) & (rows < field_rows)
+        col_ok = (cols <= last_col[:, None]) & (cols < field_cols)
+
+        rows = np.broadcast_to(np.minimum(rows, field_rows - 1)[:, :, None],
+                               (len(envs), row_count, col_count))
+        cols = np.broadcast_to(np.minimum(cols, field_cols - 1)[:, None, :],
+                               (len(envs), row_count, col_count))
+        alive = (self.alive[envs[:, None, None], rows, cols]
+                 & row_ok[:, :, None] & col_ok[:, None, :])
+        shape = (len(envs), row_count * col_count)
+        return rows.reshape(shape), cols.reshape(shape), alive.reshape(shape)
+
+    def brick_centers(self, envs, rows, cols):
+        """Centers of bricks, as Brick.center_x and center_y give them."""
+        x = GRID_LEFT + BRICK_WIDTH * cols + Brick.width / 2
+        y = (GRID_TOP - BRICK_HEIGHT * (rows - self.top_row[envs][:, None])
+             - Brick.height / 2)
+        return x, y
+
+    def move_lasers(self):
+        """Move every laser, destroying it on the first brick it meets.
+
+        A laser that reaches a brick an earlier laser just broke carries
+        on past it, as it would in Simulation, which moves them in turn.
+        """
+        lasers = np.flatnonzero(self.laser_active)
+        dy = LASER_SPEED * self.delta_time
+        while len(lasers):
+            envs = lasers // MAX_LASERS
+            x = self.laser_x.ravel()[lasers]
+            y = self.laser_y.ravel()[lasers]
+            rows, cols, alive = self.cells_in_box(
+                envs, x - LASER_WIDTH / 2, x + LASER_WIDTH / 2,
+                y - LASER_HEIGHT / 2, y + LASER_HEIGHT / 2 + dy)
+            brick_x, brick_y = self.brick_centers(envs, rows, cols)
+            t, _, normal_y = times_of_impact(
+                x[:, None], y[:, None], 0.0, dy,
+                (LASER_WIDTH + Brick.width) / 2,
+                (LASER_HEIGHT + Brick.height) / 2, brick_x, brick_y)
+            t = np.where(alive & (normal_y * dy < 0), t, np.inf)
+            first = np.argmin(t, axis=1)
+            index = np.arange(len(lasers))
+            hit = np.isfinite(t[index, first])
+            rows, cols = rows[index, first], cols[index, first]
+
+            landed = hit.copy()
+            landed[hit] = self.standing(envs[hit], rows[hit], cols[hit],
+                                        self.laser_order.ravel()[lasers[hit]])
+            self.hit_bricks(envs[landed], rows[landed], cols[landed])
+            self.laser_active.ravel()[lasers[landed]] = False
+
+            clear = ~hit
+            y = y[clear] + dy
+            self.laser_y.ravel()[lasers[clear]] = y
+            self.laser_active.ravel()[lasers[clear]] = (
+                y + LASER_HEIGHT / 2 <= SCREEN_HEIGHT - TOP_WALL_WIDTH)
+            lasers = lasers[hit & ~landed]
+
+    def move_balls(self):
+        """Move every ball, as Simulation.move_balls does.
+
+        Stuck balls follow their paddle. Free balls are swept to their
+        first impact, bounced, and swept on with the time they have left,
+        every ball of every game at once, until none hit anything more.
+        A ball reaching a brick that a ball ahead of it in the game's list
+        broke in the same sweep goes again without it.
+        """
+        stuck = self.ball_active & self.ball_stuck
+        paddle_left = self.paddle_x - self.paddle_width / 2
+        self.ball_x = np.where(stuck, paddle_left[:, None] + self.ball_offset,
+                               self.ball_x)
+
+        balls = np.flatnonzero(self.ball_active & ~self.ball_stuck)
+        time_left = np.full(len(balls), self.delta_time)
+        impacts = np.zeros(len(balls), dtype=np.int64)
+        ball_x = self.ball_x.ravel()
+        ball_y = self.ball_y.ravel()
+        change_x = self.ball_change_x.ravel()
+        change_y = self.ball_change_y.ravel()
+        mod = self.ball_mod.ravel()
+
+        while len(balls):
+            envs = balls // MAX_BALLS
+            x = ball_x[balls]
+            y = ball_y[balls]
+            dx = change_x[balls] * time_left * mod[balls]
+            dy = change_y[balls] * time_left * mod[balls]
+            t, normal_x, kind, rows, cols = self.ball_impacts(envs, x, y,
+                                                              dx, dy)
+
+            bricks = np.flatnonzero(kind == BRICK)
+            landed = self.standing(envs[bricks], rows[bricks], cols[bricks],
+                                   self.ball_order.ravel()[balls[bricks]])
+            self.hit_bricks(envs[bricks[landed]], rows[bricks[landed]],
+                            cols[bricks[landed]])
+            retry = np.zeros(len(balls), dtype=bool)
+            retry[bricks[~landed]] = True
+
+            t = np.where(kind == NOTHING, 1.0, np.where(retry, 0.0, t))
+            ball_x[balls] = x + dx * t
+            ball_y[balls] = y + dy * t
+            time_left = time_left * (1 - t)
+
+            bounced = ((kind == BRICK) | (kind == WALL)) & ~retry
+            change_x[balls[bounced & (normal_x != 0)]] *= -1
+            change_y[balls[bounced & (normal_x == 0)]] *= -1
+            bricks = bricks[landed]
+            mod[balls[bricks]] = np.minimum(mod[balls[bricks]] + 0.05, 1.0)
+
+            paddle = kind == PADDLE
+            caught = self.bounce_off_paddles(balls[paddle])
+            impacts += (kind != NOTHING) & ~retry
+            keep = (kind != NOTHING) & (impacts < MAX_IMPACTS_PER_STEP)
+            keep[np.flatnonzero(paddle)[caught]] = False
+            balls = balls[keep]
+            time_left = time_left[keep]
+            impacts = impacts[keep]
+
+    def standing(self, envs, rows, cols, order):
+        """Find which hits reach their brick before it breaks.
+
+        Hits are taken in order. Each brick stands up to as many hits as
+        it has hit points, except gold, which stands them all.
+
+        Arguments:
+            envs {np.ndarray} -- The game of each hit
+            rows, cols {np.ndarray} -- The brick each hit lands on
+            order {np.ndarray} -- Where each hitter comes in its game's list
+
+        Returns:
+            np.ndarray -- Whether each hit finds its brick standing
+        """
+        cells = np.ravel_multi_index((envs, rows, cols), self.alive.shape)
+        by_cell = np.lexsort((order, cells))
+        sorted_cells = cells[by_cell]
+        starts = np.ones(len(cells), dtype=bool)
+        starts[1:] = sorted_cells[1:] != sorted_cells[:-1]
+        place = np.arange(len(cells))
+        rank = np.empty(len(cells), dtype=np.int64)
+        rank[by_cell] = place - np.maximum.accumulate(np.where(starts, place,
+                                                               0))
+        return ((self.types.ravel()[cells] == GOLD)
+                | (rank < self.hit_points.ravel()[cells]))
+
+    def ball_impacts(self, envs, x, y, dx, dy):
+        """Find the first thing each ball would hit along a displacement.
+
+        The vectorised Simulation.ball_impact. Bricks come before walls
+        and walls before the paddle when impacts tie.
+
+        Arguments:
+            envs {np.ndarray} -- The game of each ball
+            x, y {np.ndarray} -- Centers of the balls
+            dx, dy {np.ndarray} -- Displacements of the balls
+
+        Returns:
+            tuple -- Fraction of the displacement before each impact, the
+                     x of the normal hit, what was hit, NOTHING, BRICK,
+                     WALL or PADDLE, and the row and column of bricks hit
+        """
+        half = BALL_WIDTH / 2
+        rows, cols, alive = self.cells_in_box(
+            envs, x - half + np.minimum(dx, 0), x + half + np.maximum(dx, 0),
+            y - half + np.minimum(dy, 0), y + half + np.maximum(dy, 0))
+        # Every brick in reach, then the walls, then the paddle, swept
+        # against in one go
+        count = len(envs)
+        bricks = rows.shape[1]
+        brick_x, brick_y = self.brick_centers(envs, rows, cols)
+        walls = (count, len(WALLS))
+        t, normal_x, normal_y = times_of_impact(
+            x[:, None], y[:, None], dx[:, None], dy[:, None],
+            np.concatenate([
+                np.full(rows.shape, (BALL_WIDTH + Brick.width) / 2),
+                np.broadcast_to(WALL_HALF_WIDTH, walls),
+                (BALL_WIDTH + self.paddle_width[envs][:, None]) / 2], axis=1),
+            np.concatenate([
+                np.full(rows.shape, (BALL_WIDTH + Brick.height) / 2),
+                np.broadcast_to(WALL_HALF_HEIGHT, walls),
+                np.full((count, 1), (BALL_WIDTH + PADDLE_HEIGHT) / 2)],
+                axis=1),
+            np.concatenate([brick_x, np.broadcast_to(WALL_X, walls),
+                            self.paddle_x[envs][:, None]], axis=1),
+            np.concatenate([brick_y, np.broadcast_to(WALL_Y, walls),
+                            np.full((count, 1), PLAYER_Y)], axis=1))
+
+        # Bricks and walls only count when the ball moves into them. Any
+        # falling ball that touches a paddle bounces, whatever face.
+        facing = normal_x * dx[:, None] + normal_y * dy[:, None] < 0
+        facing[:, :bricks] &= alive
+        facing[:, -1] = dy < 0
+        t = np.where(facing, t, np.inf)
+
+        first = np.argmin(t, axis=1)
+        index = np.arange(count)
+        kind = np.where(first < bricks, BRICK,
+                        np.where(first < bricks + len(WALLS), WALL, PADDLE))
+        first_t = t[index, first]
+        kind = np.where(np.isfinite(first_t), kind, NOTHING)
+        brick = np.minimum(first, bricks - 1)
+        return (first_t, normal_x[index, first], kind, rows[index, brick],
+                cols[index, brick])
+
+    def bounce_off_paddles(self, balls):
+        """Return balls off their paddles, as Ball.collides_with_player.
+
+        A ball with the CATCH power up sticks to the paddle instead.
+
+        Arguments:
+            balls {np.ndarray} -- Flat indices of the balls
+
+        Returns:
+            np.ndarray -- Which of the balls were caught
+        """
+        envs = balls // MAX_BALLS
+        caught = self.ball_power_up.ravel()[balls] == CATCH
+        held = balls[caught]
+        paddle_left = self.paddle_x[envs] - self.paddle_width[envs] / 2
+        self.ball_stuck.ravel()[held] = True
+        self.ball_offset.ravel()[held] = (self.ball_x.ravel()[held]
+                                          - paddle_left[caught])
+        self.ball_y.ravel()[held] = PADDLE_TOP + BALL_WIDTH / 2
+
+        balls = balls[~caught]
+        envs = envs[~caught]
+        x = self.ball_x.ravel()[balls]
+        third = self.paddle_width[envs] / 3
+        left = self.paddle_x[envs] - self.paddle_width[envs] / 2
+        right = self.paddle_x[envs] + self.paddle_width[envs] / 2
+        on_left = (x > left) & (x < left + third)
+        on_right = ~on_left & (x < right) & (x > right - third)
+        normal_x = np.where(on_left, LEFT_THIRD[0],
+                            np.where(on_right, RIGHT_THIRD[0], 0.0))
+        normal_y = np.where(on_left, LEFT_THIRD[1],
+                            np.where(on_right, RIGHT_THIRD[1], 1.0))
+
+        change_x = self.ball_change_x.ravel()[balls]
+        change_y = self.ball_change_y.ravel()[balls]
+        dot = change_x * normal_x + change_y * normal_y
+        self.ball_change_x.ravel()[balls] = change_x - 2 * dot * normal_x
+        self.ball_change_y.ravel()[balls] = change_y - 2 * dot * normal_y
+        mod = self.ball_mod.ravel()
+        mod[balls] = np.minimum(mod[balls] + 0.05, 1.0)
+        return caught
+
+    def hit_bricks(self, envs, rows, cols):
+        """Damage bricks, scoring them and maybe dropping power ups.
+
+        The vectorised Simulation.hit_brick. Several hits on one brick
+        all count.
+
+        Arguments:
+            envs {np.ndarray} -- The game of each hit
+            rows, cols {np.ndarray} -- The brick each hit lands on
+        """
+        if len(envs) == 0:
+            return
+        damaged = self.types[envs, rows, cols] != GOLD
+        np.subtract.at(self.hit_points, (envs[damaged], rows[damaged],
+                                         cols[damaged]), 1)
+        self.bricks_changed[envs[damaged]] = True
+
+        cells = np.unique(np.ravel_multi_index((envs, rows, cols),
+                                               self.alive.shape))
+        cells = cells[self.alive.ravel()[cells]
+                      & (self.hit_points.ravel()[cells] <= 0)]
+        if len(cells) == 0:
+            return
+        envs, rows, cols = np.unravel_index(cells, self.alive.shape)
+        types = self.types.ravel()[cells]
+        self.remove_bricks(cells)
+        points = np.where(types == SILVER,
+                          POINTS[SILVER] * self.level_number[envs],
+                          POINTS[types])
+        np.add.at(self.score, envs, points)
+
+        # Each broken brick counts down to the next power up, and the
+        # first plain brick broken once the count is out drops it
+        games, starts, counts = np.unique(envs, return_index=True,
+                                          return_counts=True)
+        place = np.arange(len(cells)) - np.repeat(starts, counts)
+        plain = (types != SILVER) & (types != GOLD)
+        due = plain & (place >= self.pup_counter[envs])
+        self.pup_counter[games] -= counts
+        drops = np.unique(envs[due], return_index=True)[1]
+        drops = np.flatnonzero(due)[drops]
+        if len(drops) == 0:
+            return
+        games = envs[drops]
+        left_after = np.repeat(counts, counts)[drops] - place[drops] - 1
+        self.pup_counter[games] = (self.random.integers(3, 8, len(drops))
+                                   - left_after)
+        kinds = self.random.integers(1, len(PowerUpType) + 1, len(drops))
+        x, y = self.brick_centers(games, rows[drops, None], cols[drops, None])
+        slots = np.argmin(self.pup_type[games] > 0, axis=1)
+        free = self.pup_type[games, slots] == 0
+        games, slots = games[free], slots[free]
+        self.pup_x[games, slots] = x[free, 0]
+        self.pup_y[games, slots] = y[free, 0]
+        self.pup_type[games, slots] = kinds[free]
+
+    def remove_bricks(self, cells):
+        """Take bricks out of their fields, as BrickField.remove does.
+
+        Arguments:
+            cells {np.ndarray} -- Flat indices of live bricks
+        """
+        envs = cells // self.alive[0].size
+        gold = self.types.ravel()[cells] == GOLD
+        self.alive.ravel()[cells] = False
+        self.hit_points.ravel()[cells] = 0
+        np.subtract.at(self.breakable, envs[~gold], 1)
+        self.bricks_changed[envs] = True
+
+    def move_power_ups(self):
+        """Drop every power up, collecting the ones that reach a paddle."""
+        pups = np.flatnonzero(self.pup_type)
+        if len(pups) == 0:
+            return
+        envs = pups // MAX_POWER_UPS
+        x = self.pup_x.ravel()[pups]
+        y = self.pup_y.ravel()[pups]
+        t, _, _ = times_of_impact(
+            x, y, 0.0, -POWER_UP_SPEED * self.delta_time,
+            (POWER_UP_WIDTH * SCALING + self.paddle_width[envs]) / 2,
+            (POWER_UP_HEIGHT * SCALING + PADDLE_HEIGHT) / 2,
+            self.paddle_x[envs], PLAYER_Y)
+        caught = np.isfinite(t)
+        types = self.pup_type.ravel()[pups]
+
+        y = y - POWER_UP_SPEED * self.delta_time
+        self.pup_y.ravel()[pups[~caught]] = y[~caught]
+        gone = caught | (y + POWER_UP_HEIGHT * SCALING / 2 < 0)
+        self.pup_type.ravel()[pups[gone]] = 0
+
+        # A game can catch more than one at once, so take them in turns
+        envs = envs[caught]
+        types = types[caught]
+        while len(envs):
+            first = np.unique(envs, return_index=True)[1]
+            self.collect_power_ups(envs[first], types[first])
+            rest = np.ones(len(envs), dtype=bool)
+            rest[first] = False
+            envs = envs[rest]
+            types = types[rest]
+
+    def collect_power_ups(self, envs, types):
+        """Apply power ups caught by paddles, as Simulation does.
+
+        Arguments:
+            envs {np.ndarray} -- Indices of the games, each once
+            types {np.ndarray} -- The power up each game caught
+        """
+        balls, found = self.first_balls(envs)
+        envs, types, balls = envs[found], types[found], balls[found]
+
+        self.lives[envs[types == EXTRA]] += 1
+
+        disrupt = np.flatnonzero(types == DISRUPT)
+        games = envs[disrupt]
+        slots = np.argmin(self.ball_active[games], axis=1)
+        free = ~self.ball_active[games, slots]
+        games, slots, copies = games[free], slots[free], balls[disrupt][free]
+        self.ball_x[games, slots] = self.ball_x[games, copies]
+        self.ball_y[games, slots] = self.ball_y[games, copies]
+        self.ball_change_x[games, slots] = (self.ball_change_x[games, copies]
+                                            * 0.90)
+        self.ball_change_y[games, slots] = self.ball_change_y[games, copies]
+        self.ball_mod[games, slots] = 1.0
+        self.ball_power_up[games, slots] = 0
+        self.ball_stuck[games, slots] = False
+        self.spawn_balls(games, slots)
+
+        # PowerUp.on_collide
+        self.clear_paddle_power_up(envs)
+        self.ball_power_up[envs, balls] = 0
+        ball_pup = (types == CATCH) | (types == SLOW)
+        self.ball_power_up[envs[ball_pup], balls[ball_pup]] = types[ball_pup]
+        slow = types == SLOW
+        self.ball_mod[envs[slow], balls[slow]] *= 0.5
+        paddle_pup = np.isin(types, PLAYER_POWER_UPS)
+        self.paddle_power_up[envs[paddle_pup]] = types[paddle_pup]
+        self.break_out[envs[types == BREAK]] = True
+        self.break_out_time[envs[types == BREAK]] = 10
+
+    def scroll_bricks(self):
+        """Scroll levels taller than the screen, as Simulation does."""
+        envs = np.flatnonzero(self.top_row > 0)
+        if len(envs) == 0:
+            return
+        self.scroll_time[envs] += self.delta_time
+        envs = envs[self.scroll_time[envs] >= SCROLL_INTERVAL]
+        if len(envs) == 0:
+            return
+
+        # The lowest breakable brick in sight needs a row of room below
+        band = self.top_row[envs][:, None] + np.arange(VISIBLE_ROWS)
+        band = np.minimum(band, self.alive.shape[1] - 1)
+        breakable = (self.alive[envs[:, None], band]
+                     & (self.types[envs[:, None], band] != GOLD)).any(axis=2)
+        lowest = VISIBLE_ROWS - 1 - np.argmax(breakable[:, ::-1], axis=1)
+        bottom = GRID_TOP - BRICK_HEIGHT * lowest - Brick.height
+        blocked = breakable.any(axis=1) & (bottom - Brick.height
+                                           < FIELD_BOTTOM)
+
+        # Nor can a ball or laser sit just under a brick
+        for active, xs, ys, width, height, slots in (
+                (self.ball_active, self.ball_x, self.ball_y, BALL_WIDTH,
+                 BALL_WIDTH, MAX_BALLS),
+                (self.laser_active, self.laser_x, self.laser_y, LASER_WIDTH,
+                 LASER_HEIGHT, MAX_LASERS)):
+            bodies = np.flatnonzero(active[envs])
+            games = envs[bodies // slots]
+            x = xs[envs].ravel()[bodies]
+            y = ys[envs].ravel()[bodies]
+            _, _, alive = self.cells_in_box(
+                games, x - width / 2, x + width / 2, y - height / 2,
+                y + height / 2 + Brick.height)
+            under = np.zeros(self.num_envs, dtype=bool)
+            under[games[alive.any(axis=1)]] = True
+            blocked |= under[envs]
+
+        envs = envs[~blocked]
+        self.scroll_time[envs] = 0.0
+        bottom_row = self.top_row[envs] + VISIBLE_ROWS - 1
+        inside = bottom_row < self.alive.shape[1]
+        games, bottom_row = envs[inside], bottom_row[inside]
+        cells = np.flatnonzero(self.alive[games, bottom_row])
+        if len(cells):
+            cols = cells % self.alive.shape[2]
+            games = games[cells // self.alive.shape[2]]
+            rows = bottom_row[cells // self.alive.shape[2]]
+            self.remove_bricks(np.ravel_multi_index((games, rows, cols),
+                                                    self.alive.shape))
+        self.top_row[envs] -= 1
+        self.bricks_changed[envs] = True
+
+    def lose_balls(self):
+        """Take out balls below the screen or out through the gap."""
+        half = BALL_WIDTH / 2
+        self.ball_active &= ((self.ball_y + half > 0)
+                             & (self.ball_x - half < SCREEN_WIDTH))
+
+    def finish_levels(self):
+        """Move games that cleared or broke out of a level to the next."""
+        broke_out = ((self.paddle_x - self.paddle_width / 2 >= SCREEN_WIDTH)
+                     & self.break_out)
+        self.score += np.where(broke_out, 10000, 0)
+        envs = np.flatnonzero(broke_out | (self.breakable == 0))
+        if len(envs):
+            self.setup(envs, self.next_level[self.level_number[envs]])
+
+    def lose_lives(self):
+        """Serve a new ball to games that lost their last, or end them."""
+        envs = np.flatnonzero(~self.ball_active.any(axis=1))
+        if len(envs) == 0:
+            return
+        out = self.lives[envs] == 0
+        self.game_over[envs[out]] = True
+        envs = envs[~out]
+        self.lives[envs] -= 1
+        self.serve(envs)
+        self.clear_paddle_power_up(envs)
+
+    def observe(self, envs=None):
+        """Write games' states into their rows of the observations.
+
+        Arguments:
+            envs {np.ndarray} -- Indices of the games, all if not given
+        """
+        if envs is None:
+            envs = slice(None)
+            count = self.num_envs
+        else:
+            count = len(envs)
+        observations = self.observations
+        observations[envs, 0] = self.paddle_x[envs]
+        observations[envs, 1] = PLAYER_Y
+        observations[envs, 2] = self.paddle_width[envs]
+        observations[envs, 3] = self.paddle_power_up[envs]
+        observations[envs, 4] = self.lives[envs]
+
+        active = self.ball_active[envs]
+        balls = np.stack([self.ball_x[envs], self.ball_y[envs],
+                          self.ball_change_x[envs], self.ball_change_y[envs],
+                          active], axis=2)
+        balls[~active] = 0
+        observations[envs, self.balls] = balls.reshape(count, -1)
+
+        types = self.pup_type[envs]
+        power_ups = np.stack([self.pup_x[envs], self.pup_y[envs], types],
+                             axis=2)
+        power_ups[types == 0] = 0
+        observations[envs, self.power_ups] = power_ups.reshape(count, -1)
+
+        # Broken bricks have no hit points left, so the field's hit points
+        # are the observation as they are. Most steps break nothing, so
+        # only games whose bricks changed are written again.
+        envs = np.arange(self.num_envs)[envs]
+        envs = envs[self.bricks_changed[envs]]
+        if len(envs) == 0:
+            return
+        self.bricks_changed[envs] = False
+        band = self.top_row[envs][:, None] + np.arange(self.grid_shape[0])
+        bricks = self.hit_points[envs[:, None], band]
+        observations[envs, self.bricks] = bricks.reshape(len(envs), -1)
+
+    def close(self):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Time random play in a VecBrickBreakerEnv')
+    parser.add_argument('--envs', type=int, default=256,
+                        help='games stepped together')
+    parser.add_argument('--steps', type=int, default=2000,
+                        help='steps of the whole batch to time')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    env = VecBrickBreakerEnv(args.envs)
+    env.reset(seed=args.seed)
+    generator = np.random.default_rng(args.seed)
+    episodes = 0
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        actions = generator.integers(ACTION_COUNT, size=args.envs)
+        _, _, terminated, truncated, _ = env.step(actions)
+        episodes += int((terminated | truncated).sum())
+    elapsed = time.perf_counter() - start
+    print(f'{args.envs * args.steps:,} env steps in {elapsed:.2f}s, '
+          f'{args.envs * args.steps / elapsed:,.0f} a second, '
+          f'{episodes} episodes ended')
+
+
+if __name__ == "__main__":
+    main()